@@ -0,0 +1,70 @@
+import os
+import sqlite3
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "dane.db")
+
+CUTOFFS_TABLE = "parallel_cutoffs"
+
+# False - always use the hand-tuned dicts from utils.py
+USE_CALIBRATED_CUTOFFS = True
+
+# {(algorithm, cutoff): {cores: value}} - read once per process
+_calibrated_cutoffs = None
+
+
+def load_calibrated_cutoffs(db_path=DB_PATH):
+    cutoffs = {}
+
+    if not os.path.exists(db_path):
+        return cutoffs
+
+    try:
+        conn = sqlite3.connect(db_path)
+
+        try:
+            rows = conn.execute(f"SELECT algorithm, cutoff, cores, value FROM {CUTOFFS_TABLE}").fetchall()
+        finally:
+            conn.close()
+
+    except sqlite3.Error:
+        # no calibration yet
+        return cutoffs
+
+    for algorithm, cutoff, cores, value in rows:
+        cutoffs.setdefault((algorithm, cutoff), {})[cores] = value
+
+    return cutoffs
+
+
+def reset_calibrated_cutoffs():
+    global _calibrated_cutoffs
+    _calibrated_cutoffs = None
+
+
+# measured value for the core count, or for the nearest smaller calibrated one
+# None - not calibrated, the caller falls back to its dict
+def get_calibrated_cutoff(algorithm, cutoff, cores):
+    global _calibrated_cutoffs
+
+    if not USE_CALIBRATED_CUTOFFS:
+        return None
+
+    if _calibrated_cutoffs is None:
+        _calibrated_cutoffs = load_calibrated_cutoffs()
+
+    values = _calibrated_cutoffs.get((algorithm, cutoff))
+
+    if not values:
+        return None
+
+    if cores in values:
+        return values[cores]
+
+    smaller = [calibrated for calibrated in values if calibrated < cores]
+
+    if not smaller:
+        return None
+
+    return values[max(smaller)]
@@ -0,0 +1,61 @@
+import numpy as np
+
+from algorithms.shared_memory.radixsort.sequential import radix_sort_ndarray
+
+
+# leaf sorters for the buckets of bucket sort and sample sort
+# "python" - the family merge_sort, the rest work on np.ndarray
+LEAF_SORT_BACKENDS = ("python", "np_quicksort", "np_mergesort", "np_stable", "radix")
+
+# used when no leaf backend is given: lists keep merge_sort, np.ndarray segments keep np.sort(kind="stable")
+DEFAULT_LEAF_BACKEND = "python"
+NDARRAY_LEAF_BACKEND = "np_stable"
+
+RADIX_DIGIT_BITS = 16
+
+
+def get_leaf_sort_backend(leaf_backend):
+    if leaf_backend not in LEAF_SORT_BACKENDS:
+        raise ValueError(f"Nieznany backend sortowania liści: {leaf_backend}")
+
+    return leaf_backend
+
+
+def describe_leaf_backend(options=None):
+    options = options or {}
+
+    if options.get("leaf_backend"):
+        return options["leaf_backend"]
+
+    if options.get("backend") == "numpy":
+        return NDARRAY_LEAF_BACKEND
+
+    return DEFAULT_LEAF_BACKEND
+
+
+def sort_ndarray_in_place(arr, leaf_backend):
+    if leaf_backend == "radix":
+        radix_sort_ndarray(arr, RADIX_DIGIT_BITS)
+    elif leaf_backend == "np_quicksort":
+        arr.sort(kind="quicksort")
+    elif leaf_backend == "np_mergesort":
+        arr.sort(kind="mergesort")
+    else:
+        arr.sort(kind="stable")
+
+
+# sorts an np.ndarray in place or returns a sorted copy of a list
+def sort_leaf(values, leaf_backend):
+    get_leaf_sort_backend(leaf_backend)
+
+    if len(values) <= 1:
+        return values
+
+    if isinstance(values, np.ndarray):
+        sort_ndarray_in_place(values, leaf_backend)
+        return values
+
+    arr = np.asarray(values)
+    sort_ndarray_in_place(arr, leaf_backend)
+
+    return arr.tolist()
@@ -0,0 +1,24 @@
+# per-run algorithm metrics - filled by the sorts, read by the benchmark worker after the run
+_metrics = {}
+
+
+def reset_metrics():
+    _metrics.clear()
+
+
+def record_metric(name, value):
+    _metrics[name] = value
+
+
+def collect_metrics():
+    return dict(_metrics)
+
+
+# largest bucket / mean bucket over all parts - 1.0 means perfect balance
+def record_bucket_imbalance(bucket_sizes, parts):
+    total = sum(bucket_sizes)
+
+    if total == 0 or parts == 0:
+        return
+
+    record_metric("bucket_imbalance", max(bucket_sizes) / (total / parts))
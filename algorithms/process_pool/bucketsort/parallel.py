@@ -0,0 +1,41 @@
+from algorithms.process_pool.pool import run_on_pool
+from algorithms.leaf_sort import get_leaf_sort_backend
+from algorithms.process_pool.bucketsort.utils import (calculate_bucket_count, distribute_to_buckets, split_buckets, sort_bucket,
+                    should_run_parallel, get_group_size_cutoff)
+from .sequential import bucket_sort
+
+
+def sort_group(buckets, leaf_backend=None):
+    sorted_group = []
+
+    for bucket in buckets:
+        sorted_group.extend(sort_bucket(bucket, leaf_backend))
+
+    return sorted_group
+
+
+def run_bucket_groups(executor, bucket_groups, leaf_backend=None):
+    futures = [executor.submit(sort_group, group, leaf_backend) for group in bucket_groups if group]
+    sorted_array = []
+
+    for future in futures:
+        sorted_array.extend(future.result())
+
+    return sorted_array
+
+
+def parallel_bucket_sort(data, process_count, leaf_backend=None):
+    if len(data) <= 1:
+        return data
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    if not should_run_parallel(len(data), process_count) or (len(data) // process_count) < get_group_size_cutoff(process_count):
+        return bucket_sort(data, leaf_backend=leaf_backend)
+
+    bucket_count = calculate_bucket_count(len(data), process_count)
+    buckets = distribute_to_buckets(data, bucket_count)
+    bucket_groups = split_buckets(buckets, process_count)
+
+    return run_on_pool(process_count, lambda executor: run_bucket_groups(executor, bucket_groups, leaf_backend))
@@ -0,0 +1,48 @@
+from algorithms.process_pool.pool import run_on_pool
+from algorithms.process_pool.mergesort.utils import merge, calculate_min_size, split_data
+from algorithms.process_pool.mergesort.sequential import merge_sort
+
+
+def sort_task(chunk):
+    merge_sort(chunk)
+    return chunk
+
+
+def merge_task(left_part, right_part):
+    merged = left_part + right_part
+    merge(merged, 0, len(left_part) - 1, len(merged) - 1)
+    return merged
+
+
+def run_merge_tree(executor, chunks):
+    futures = [executor.submit(sort_task, chunk) for chunk in chunks]
+
+    # every level merges neighbouring runs pairwise until one run is left
+    while len(futures) > 1:
+        next_level = []
+
+        for i in range(0, len(futures) - 1, 2):
+            next_level.append(executor.submit(merge_task, futures[i].result(), futures[i + 1].result()))
+
+        if len(futures) % 2 == 1:
+            next_level.append(futures[-1])
+
+        futures = next_level
+
+    return futures[0].result()
+
+
+def parallel_merge_sort(data, max_depth):
+    if len(data) <= 1:
+        return data
+
+    min_size = calculate_min_size(len(data), max_depth)
+
+    if len(data) <= min_size:
+        return sort_task(list(data))
+
+    process_count = 1 << max_depth
+    parts = max(2, min(process_count, len(data) // min_size))
+    chunks = split_data(list(data), parts)
+
+    return run_on_pool(process_count, lambda executor: run_merge_tree(executor, chunks))
@@ -0,0 +1,81 @@
+from algorithms.cutoffs import get_calibrated_cutoff
+
+
+# {cores: próg_min_size}
+PARALLEL_CUTOFF = {
+    2: 50_000,
+    4: 100_000,
+    8: 300_000,
+    16: 600_000,
+    32: 1_200_000,
+    64: 2_400_000,
+    128: 4_800_000,
+}
+
+
+def get_parallel_cutoff(cores):
+    calibrated = get_calibrated_cutoff("mergesort", "parallel_cutoff", cores)
+
+    if calibrated is not None:
+        return calibrated
+
+    return PARALLEL_CUTOFF.get(cores)
+
+
+def merge(arr, left, mid, right):
+    temp = [None] * (right - left + 1)
+
+    i = left
+    j = mid + 1
+    k = 0
+
+    while i <= mid and j <= right:
+        if arr[i] <= arr[j]:
+            temp[k] = arr[i]
+            i += 1
+        else:
+            temp[k] = arr[j]
+            j += 1
+
+        k += 1
+
+    while i <= mid:
+        temp[k] = arr[i]
+        i += 1
+        k += 1
+
+    while j <= right:
+        temp[k] = arr[j]
+        j += 1
+        k += 1
+
+    arr[left:right + 1] = temp
+
+
+def calculate_min_size(data_size, max_depth):
+    cores = 1 << max_depth
+
+    cutoff = get_parallel_cutoff(cores)
+    fallback = max(5000, data_size // (cores * 8))
+
+    if cutoff is None:
+        return fallback
+
+    return cutoff
+
+
+def split_data(arr, parts):
+    chunk_size = len(arr) // parts
+    chunks = []
+
+    for i in range(parts):
+        start = i * chunk_size
+
+        if i == parts - 1:
+            end = len(arr)
+        else:
+            end = (i + 1) * chunk_size
+
+        chunks.append(arr[start:end])
+
+    return chunks
@@ -0,0 +1,61 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import psutil
+
+
+# {process_count: executor} - pools stay alive between calls, so repeated runs reuse started workers
+_executors = {}
+
+
+def get_executor(process_count):
+    executor = _executors.get(process_count)
+
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=process_count)
+        _executors[process_count] = executor
+
+    return executor
+
+
+def discard_executor(process_count):
+    executor = _executors.pop(process_count, None)
+
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_executors():
+    for executor in _executors.values():
+        executor.shutdown(wait=True)
+
+    _executors.clear()
+
+
+# the pool workers live as long as the executor, so they are never reaped during a run and
+# RUSAGE_CHILDREN does not see them - the benchmark adds this difference to the children CPU time
+def get_pool_cpu_time():
+    total = 0.0
+
+    for executor in _executors.values():
+        # _processes is None after shutdown
+        for pid in list(executor._processes or {}):
+            try:
+                cpu_times = psutil.Process(pid).cpu_times()
+            except psutil.NoSuchProcess:
+                continue
+
+            total += cpu_times.user + cpu_times.system
+
+    return total
+
+
+def run_on_pool(process_count, job):
+    executor = get_executor(process_count)
+
+    try:
+        return job(executor)
+    except BrokenProcessPool:
+        # a crashed worker breaks the whole pool - the next call gets a fresh one
+        discard_executor(process_count)
+        raise
@@ -0,0 +1,68 @@
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from algorithms.process_pool.pool import run_on_pool
+from algorithms.process_pool.quicksort.utils import partition, calculate_min_size
+from algorithms.process_pool.quicksort.sequential import quicksort
+
+
+def partition_task(chunk):
+    index = partition(chunk, 0, len(chunk) - 1)
+    return chunk[:index], chunk[index:]
+
+
+def sort_task(chunk):
+    quicksort(chunk)
+    return chunk
+
+
+def submit_part(executor, futures, results, key, part, depth, max_depth, min_size):
+    if len(part) <= 1:
+        results[key] = part
+    elif len(part) <= min_size or depth >= max_depth:
+        futures[executor.submit(sort_task, part)] = (key, depth, "sort")
+    else:
+        futures[executor.submit(partition_task, part)] = (key, depth, "partition")
+
+
+# partition tree as a task graph - a sub-range is submitted as soon as its parent partition finishes
+def run_partition_graph(executor, data, max_depth, min_size):
+    futures = {}
+    results = {}
+
+    submit_part(executor, futures, results, (), data, 0, max_depth, min_size)
+
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            key, depth, kind = futures.pop(future)
+
+            if kind == "sort":
+                results[key] = future.result()
+                continue
+
+            for side, part in enumerate(future.result()):
+                submit_part(executor, futures, results, key + (side,), part, depth + 1, max_depth, min_size)
+
+    # keys are paths in the partition tree, so lexicographic order is the order of the ranges
+    sorted_array = []
+
+    for key in sorted(results):
+        sorted_array.extend(results[key])
+
+    return sorted_array
+
+
+def parallel_quicksort(data, max_depth):
+    if len(data) <= 1:
+        return data
+
+    min_size = calculate_min_size(len(data), max_depth)
+
+    if len(data) <= min_size:
+        return sort_task(list(data))
+
+    return run_on_pool(
+        1 << max_depth,
+        lambda executor: run_partition_graph(executor, list(data), max_depth, min_size)
+    )
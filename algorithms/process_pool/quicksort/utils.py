@@ -1,6 +1,8 @@
 import ctypes
 from multiprocessing import shared_memory
 
+from algorithms.cutoffs import get_calibrated_cutoff
+
 
 # {cores: próg_min_size}
 PARALLEL_CUTOFF = {
@@ -15,6 +17,11 @@ PARALLEL_CUTOFF = {
 
 
 def get_parallel_cutoff(cores):
+    calibrated = get_calibrated_cutoff("quicksort", "parallel_cutoff", cores)
+
+    if calibrated is not None:
+        return calibrated
+
     return PARALLEL_CUTOFF.get(cores)
 
 
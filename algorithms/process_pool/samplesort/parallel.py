@@ -0,0 +1,72 @@
+from algorithms.process_pool.pool import run_on_pool
+from algorithms.leaf_sort import get_leaf_sort_backend
+from algorithms.metrics import record_metric, record_bucket_imbalance
+from .utils import (split_data, select_samples, choose_pivots, distribute_to_buckets, split_buckets, sort_bucket,
+                    merge_sorted_runs, get_oversampling, should_run_parallel, DEFAULT_OVERSAMPLING)
+from .sequential import sample_sort
+
+
+def local_sort_task(chunk, sample_count, leaf_backend=None):
+    sorted_chunk = sort_bucket(chunk, leaf_backend)
+    return sorted_chunk, select_samples(sorted_chunk, sample_count)
+
+
+# every bucket is a list of sorted runs, one per chunk
+def merge_group(bucket_runs):
+    sorted_group = []
+
+    for runs in bucket_runs:
+        sorted_group.extend(merge_sorted_runs(runs))
+
+    return sorted_group
+
+
+def run_sample_sort(executor, data, process_count, leaf_backend=None, oversampling=DEFAULT_OVERSAMPLING):
+    chunks = split_data(data, process_count)
+    futures = [executor.submit(local_sort_task, chunk, process_count * oversampling, leaf_backend) for chunk in chunks]
+
+    sorted_chunks = []
+    samples = []
+
+    for future in futures:
+        sorted_chunk, chunk_samples = future.result()
+        sorted_chunks.append(sorted_chunk)
+        samples.extend(chunk_samples)
+
+    pivots = choose_pivots(samples, process_count)
+    bucket_runs = [[] for _ in range(len(pivots) + 1)]
+
+    for chunk in sorted_chunks:
+        local_buckets = distribute_to_buckets(chunk, pivots)
+
+        for i in range(len(local_buckets)):
+            bucket_runs[i].append(local_buckets[i])
+
+    record_metric("oversampling", oversampling)
+    record_bucket_imbalance([sum(len(run) for run in runs) for runs in bucket_runs], process_count)
+
+    futures = [executor.submit(merge_group, group) for group in split_buckets(bucket_runs, process_count) if group]
+    sorted_array = []
+
+    for future in futures:
+        sorted_array.extend(future.result())
+
+    return sorted_array
+
+
+def parallel_sample_sort(data, process_count, leaf_backend=None, oversampling=DEFAULT_OVERSAMPLING):
+    if len(data) <= 1:
+        return data
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    get_oversampling(oversampling)
+
+    if not should_run_parallel(len(data), process_count):
+        return sample_sort(data, leaf_backend=leaf_backend, oversampling=oversampling)
+
+    return run_on_pool(
+        process_count,
+        lambda executor: run_sample_sort(executor, list(data), process_count, leaf_backend, oversampling)
+    )
@@ -0,0 +1,65 @@
+import numpy as np
+
+from algorithms.queue.channel import run_task_graph, to_array
+from algorithms.leaf_sort import get_leaf_sort_backend
+from algorithms.queue.bucketsort.utils import (calculate_bucket_count, distribute_to_bucket_array, split_bucket_batches, sort_bucket,
+                    should_run_parallel, get_group_size_cutoff)
+from .sequential import bucket_sort
+
+
+# batches per worker - smaller batches keep the pipes busy while other batches are being sorted
+BATCHES_PER_WORKER = 4
+
+
+def sort_batch_task(params, arr):
+    _, bounds, leaf_backend = params
+
+    # np leaf backends sort the received buffer segments in place
+    if leaf_backend is not None and leaf_backend != "python":
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end - start > 1:
+                sort_bucket(arr[start:end], leaf_backend)
+
+        return None, arr
+
+    local = arr.tolist()
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end - start > 1:
+            local[start:end] = sort_bucket(local[start:end], leaf_backend)
+
+    return None, np.asarray(local, dtype=arr.dtype)
+
+
+def parallel_bucket_sort(data, process_count, leaf_backend=None):
+    if len(data) <= 1:
+        return data
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    if not should_run_parallel(len(data), process_count) or (len(data) // process_count) < get_group_size_cutoff(process_count):
+        return bucket_sort(data, leaf_backend=leaf_backend)
+
+    bucket_count = calculate_bucket_count(len(data), process_count)
+    values, boundaries = distribute_to_bucket_array(to_array(data), bucket_count)
+
+    tasks = []
+
+    for batch_index, (first, last) in enumerate(split_bucket_batches(boundaries, process_count * BATCHES_PER_WORKER)):
+        start = boundaries[first]
+        end = boundaries[last]
+
+        if end - start == 0:
+            continue
+
+        tasks.append(((batch_index, (boundaries[first:last + 1] - start).tolist(), leaf_backend), values[start:end]))
+
+    sorted_batches = {}
+
+    def on_result(params, _, arr):
+        sorted_batches[params[0]] = arr
+
+    run_task_graph(tasks, process_count, sort_batch_task, on_result)
+
+    return np.concatenate([sorted_batches[key] for key in sorted(sorted_batches)]).tolist()
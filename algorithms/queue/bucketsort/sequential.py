@@ -0,0 +1,23 @@
+import math
+
+from algorithms.queue.bucketsort.utils import distribute_to_buckets, sort_bucket
+from algorithms.leaf_sort import get_leaf_sort_backend
+
+
+def bucket_sort(arr, bucket_count=None, leaf_backend=None):
+    if len(arr) <= 1:
+        return arr
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    if bucket_count is None:
+        bucket_count = int(math.sqrt(len(arr)))
+
+    buckets = distribute_to_buckets(arr, bucket_count)
+    sorted_array = []
+
+    for bucket in buckets:
+        sorted_array.extend(sort_bucket(bucket, leaf_backend))
+
+    return sorted_array
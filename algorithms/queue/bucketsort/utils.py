@@ -0,0 +1,142 @@
+import math
+import numpy as np
+
+from algorithms.queue.mergesort.sequential import merge_sort
+from algorithms.leaf_sort import sort_leaf
+from algorithms.cutoffs import get_calibrated_cutoff
+
+
+MIN_SIZE_FOR_PARALLEL = 5000
+MIN_GROUP_SIZE = 2000
+
+# {cores: próg}
+PARALLEL_SIZE_CUTOFF = {
+    2: 100_000,
+    4: 100_000,
+    8: 100_000,
+    16: 200_000,
+    32: 200_000,
+    64: 200_000,
+    128: 400_000,
+}
+
+GROUP_SIZE_CUTOFF = {
+    2: 2_000,
+    4: 2_000,
+    8: 2_000,
+    16: 4_000,
+    32: 4_000,
+    64: 4_000,
+    128: 8_000,
+}
+
+
+def get_parallel_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("bucketsort", "parallel_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
+    cutoff = PARALLEL_SIZE_CUTOFF.get(process_count)
+
+    if cutoff is None:
+        return MIN_SIZE_FOR_PARALLEL
+
+    return cutoff
+
+
+def get_group_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("bucketsort", "group_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
+    cutoff = GROUP_SIZE_CUTOFF.get(process_count)
+
+    if cutoff is None:
+        return MIN_GROUP_SIZE
+
+    return cutoff
+
+
+def should_run_parallel(data_size, process_count):
+    return data_size > get_parallel_size_cutoff(process_count)
+
+
+def distribute_to_buckets(arr, bucket_count):
+    if len(arr) == 0:
+        return []
+
+    arr_np = np.asarray(arr)
+    min_value = arr_np.min()
+    max_value = arr_np.max()
+
+    if min_value == max_value:
+        buckets = [[] for _ in range(bucket_count)]
+        buckets[0] = list(arr)
+        return buckets
+
+    bucket_range = (max_value - min_value) / bucket_count
+    indices = np.minimum(
+        bucket_count - 1,
+        ((arr_np - min_value) / bucket_range).astype(np.int64)
+    )
+
+    order = np.argsort(indices, kind='stable')
+    sorted_indices = indices[order]
+    sorted_values = arr_np[order]
+
+    buckets = [[] for _ in range(bucket_count)]
+    boundaries = np.searchsorted(sorted_indices, np.arange(bucket_count + 1))
+    for i in range(bucket_count):
+        buckets[i] = sorted_values[boundaries[i]:boundaries[i + 1]].tolist()
+
+    return buckets
+
+
+# same bucket assignment as distribute_to_buckets, but buckets stay as slices of one array
+def distribute_to_bucket_array(arr_np, bucket_count):
+    min_value = arr_np.min()
+    max_value = arr_np.max()
+
+    if min_value == max_value:
+        boundaries = np.zeros(bucket_count + 1, dtype=np.int64)
+        boundaries[1:] = len(arr_np)
+        return arr_np, boundaries
+
+    bucket_range = (max_value - min_value) / bucket_count
+    indices = np.minimum(
+        bucket_count - 1,
+        ((arr_np - min_value) / bucket_range).astype(np.int64)
+    )
+
+    order = np.argsort(indices, kind='stable')
+    boundaries = np.searchsorted(indices[order], np.arange(bucket_count + 1))
+
+    return arr_np[order], boundaries
+
+
+def split_bucket_batches(boundaries, batch_count):
+    bucket_count = len(boundaries) - 1
+    chunk_size = math.ceil(bucket_count / batch_count)
+
+    batches = []
+    for i in range(0, bucket_count, chunk_size):
+        batches.append((i, min(i + chunk_size, bucket_count)))
+
+    return batches
+
+
+def calculate_bucket_count(data_size, process_count):
+    return max(
+        int(math.sqrt(data_size)),
+        process_count * 8
+    )
+
+
+def sort_bucket(bucket, leaf_backend=None):
+    if leaf_backend is not None and leaf_backend != "python":
+        return sort_leaf(bucket, leaf_backend)
+
+    merge_sort(bucket)
+    return bucket
@@ -0,0 +1,178 @@
+import pickle
+import queue
+import threading
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+import numpy as np
+
+
+# batches sent to one worker before its first result has to come back
+MAX_IN_FLIGHT = 2
+
+
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def to_array(data):
+    return np.asarray(data, dtype=get_np_dtype(type(data[0])))
+
+
+# pickle protocol 5 - the array body goes as raw out-of-band buffers, only the small header is pickled
+def send_array(conn, tag, arr):
+    buffers = []
+    header = pickle.dumps(arr, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buffer.raw() for buffer in buffers]
+
+    conn.send((tag, header, [raw.nbytes for raw in raw_buffers]))
+
+    for raw in raw_buffers:
+        conn.send_bytes(raw)
+
+
+def recv_array(conn):
+    message = conn.recv()
+
+    if message is None:
+        return None, None
+
+    if message[0] == "error":
+        raise RuntimeError(f"Błąd w procesie roboczym:\n{message[1]}")
+
+    tag, header, sizes = message
+    buffers = []
+
+    for size in sizes:
+        buffer = bytearray(size)
+
+        if size > 0:
+            conn.recv_bytes_into(buffer)
+        else:
+            conn.recv_bytes()
+
+        buffers.append(buffer)
+
+    return tag, pickle.loads(header, buffers=buffers)
+
+
+def channel_worker(task_conn, result_conn, task_function):
+    try:
+        while True:
+            tag, arr = recv_array(task_conn)
+
+            if tag is None:
+                break
+
+            task_id, params = tag
+            info, result = task_function(params, arr)
+            send_array(result_conn, (task_id, info), result)
+
+    except Exception:
+        result_conn.send(("error", traceback.format_exc()))
+
+    finally:
+        result_conn.close()
+
+
+def feed_worker(task_conn, pending, slots):
+    try:
+        while True:
+            slots.acquire()
+            task = pending.get()
+
+            if task is None:
+                break
+
+            task_id, params, arr = task
+            send_array(task_conn, (task_id, params), arr)
+
+        task_conn.send(None)
+
+    except (BrokenPipeError, EOFError, OSError):
+        # the worker is gone - the main thread reports it when reading results
+        pass
+
+
+# initial_tasks: [(params, arr)], on_result(params, info, arr) -> new [(params, arr)] for the same workers
+def run_task_graph(initial_tasks, process_count, task_function, on_result, max_in_flight=MAX_IN_FLIGHT):
+    pending = queue.Queue()
+    task_params = {}
+    next_task_id = 0
+
+    def enqueue(tasks):
+        nonlocal next_task_id
+
+        for params, arr in tasks:
+            task_params[next_task_id] = params
+            pending.put((next_task_id, params, arr))
+            next_task_id += 1
+
+    enqueue(initial_tasks)
+
+    if not task_params:
+        return
+
+    workers = []
+    feeders = []
+    result_conns = {}
+
+    for _ in range(process_count):
+        task_reader, task_writer = mp.Pipe(duplex=False)
+        result_reader, result_writer = mp.Pipe(duplex=False)
+
+        process = mp.Process(target=channel_worker, args=(task_reader, result_writer, task_function))
+        process.start()
+
+        task_reader.close()
+        result_writer.close()
+
+        slots = threading.BoundedSemaphore(max_in_flight)
+        feeder = threading.Thread(target=feed_worker, args=(task_writer, pending, slots), daemon=True)
+        feeder.start()
+
+        workers.append((process, task_writer))
+        feeders.append(feeder)
+        result_conns[result_reader] = slots
+
+    try:
+        while task_params:
+            for conn in wait(list(result_conns)):
+                try:
+                    (task_id, info), result = recv_array(conn)
+                except EOFError:
+                    raise RuntimeError("Proces roboczy zakończył się nieoczekiwanie")
+
+                result_conns[conn].release()
+                enqueue(on_result(task_params.pop(task_id), info, result) or [])
+
+    except BaseException:
+        for process, _ in workers:
+            process.terminate()
+        raise
+
+    finally:
+        for _ in feeders:
+            pending.put(None)
+
+        for slots in result_conns.values():
+            try:
+                slots.release()
+            except ValueError:
+                pass
+
+        for feeder in feeders:
+            feeder.join()
+
+        for process, task_writer in workers:
+            process.join()
+            task_writer.close()
+
+        for conn in result_conns:
+            conn.close()
@@ -0,0 +1,70 @@
+import numpy as np
+
+from algorithms.queue.channel import run_task_graph, to_array
+from algorithms.queue.mergesort.utils import merge, calculate_min_size, split_data
+from algorithms.queue.mergesort.sequential import merge_sort
+
+
+def mergesort_task(params, arr):
+    kind, _, mid = params
+    local = arr.tolist()
+
+    if kind == "sort":
+        merge_sort(local)
+    else:
+        merge(local, 0, mid - 1, len(local) - 1)
+
+    return None, np.asarray(local, dtype=arr.dtype)
+
+
+def parallel_merge_sort(data, max_depth):
+    if len(data) <= 1:
+        return data
+
+    min_size = calculate_min_size(len(data), max_depth)
+
+    if len(data) <= min_size:
+        local = list(data)
+        merge_sort(local)
+        return local
+
+    process_count = 1 << max_depth
+    parts = max(2, min(process_count, len(data) // min_size))
+    chunks = split_data(to_array(data), parts)
+
+    # runs[(level, index)] - sorted run waiting for its sibling
+    runs = {}
+    result = []
+
+    def on_result(params, _, arr):
+        _, (level, index), _ = params
+        run_count = (parts + (1 << level) - 1) >> level
+
+        if run_count == 1:
+            result.append(arr)
+            return []
+
+        sibling = index ^ 1
+
+        if sibling >= run_count:
+            # odd run at the end of the level is promoted without merging
+            return on_result(("merge", (level + 1, index >> 1), 0), None, arr)
+
+        if (level, sibling) not in runs:
+            runs[(level, index)] = arr
+            return []
+
+        other = runs.pop((level, sibling))
+        left_run, right_run = (arr, other) if index < sibling else (other, arr)
+        merged_input = np.concatenate([left_run, right_run])
+
+        return [(("merge", (level + 1, index >> 1), len(left_run)), merged_input)]
+
+    run_task_graph(
+        [(("sort", (0, i), 0), chunk) for i, chunk in enumerate(chunks)],
+        process_count,
+        mergesort_task,
+        on_result
+    )
+
+    return result[0].tolist()
@@ -0,0 +1,64 @@
+import numpy as np
+
+from algorithms.queue.channel import run_task_graph, to_array
+from algorithms.queue.quicksort.utils import partition, calculate_min_size
+from algorithms.queue.quicksort.sequential import quicksort
+
+
+def quicksort_task(params, arr):
+    kind, _, _ = params
+    local = arr.tolist()
+
+    if kind == "sort":
+        quicksort(local)
+        return None, np.asarray(local, dtype=arr.dtype)
+
+    index = partition(local, 0, len(local) - 1)
+    return index, np.asarray(local, dtype=arr.dtype)
+
+
+def make_task(key, part, depth, max_depth, min_size, results):
+    if len(part) <= 1:
+        results[key] = part
+        return []
+
+    if len(part) <= min_size or depth >= max_depth:
+        return [(("sort", key, depth), part)]
+
+    return [(("partition", key, depth), part)]
+
+
+def parallel_quicksort(data, max_depth):
+    if len(data) <= 1:
+        return data
+
+    min_size = calculate_min_size(len(data), max_depth)
+
+    if len(data) <= min_size:
+        local = list(data)
+        quicksort(local)
+        return local
+
+    results = {}
+
+    def on_result(params, index, arr):
+        kind, key, depth = params
+
+        if kind == "sort":
+            results[key] = arr
+            return []
+
+        # both halves are views of the received buffer - they go back to the workers without a copy
+        tasks = []
+        tasks.extend(make_task(key + (0,), arr[:index], depth + 1, max_depth, min_size, results))
+        tasks.extend(make_task(key + (1,), arr[index:], depth + 1, max_depth, min_size, results))
+        return tasks
+
+    run_task_graph(
+        make_task((), to_array(data), 0, max_depth, min_size, results),
+        1 << max_depth,
+        quicksort_task,
+        on_result
+    )
+
+    return np.concatenate([results[key] for key in sorted(results)]).tolist()
@@ -0,0 +1,53 @@
+from algorithms.cutoffs import get_calibrated_cutoff
+
+
+# {cores: próg_min_size}
+PARALLEL_CUTOFF = {
+    2: 50_000,
+    4: 100_000,
+    8: 300_000,
+    16: 600_000,
+    32: 1_200_000,
+    64: 2_400_000,
+    128: 4_800_000,
+}
+
+
+def get_parallel_cutoff(cores):
+    calibrated = get_calibrated_cutoff("quicksort", "parallel_cutoff", cores)
+
+    if calibrated is not None:
+        return calibrated
+
+    return PARALLEL_CUTOFF.get(cores)
+
+
+def partition(arr, low, high):
+    pivot = arr[(low + high) // 2]
+
+    i = low
+    j = high
+
+    while i <= j:
+        while arr[i] < pivot:
+            i += 1
+        while arr[j] > pivot:
+            j -= 1
+        if i <= j:
+            arr[i], arr[j] = arr[j], arr[i]
+            i += 1
+            j -= 1
+
+    return i
+
+
+def calculate_min_size(data_size, max_depth):
+    cores = 1 << max_depth
+
+    cutoff = get_parallel_cutoff(cores)
+    fallback = max(5000, data_size // (cores * 8))
+
+    if cutoff is None:
+        return fallback
+
+    return cutoff
@@ -0,0 +1,88 @@
+import numpy as np
+
+from algorithms.queue.channel import run_task_graph, to_array
+from algorithms.leaf_sort import get_leaf_sort_backend
+from algorithms.metrics import record_metric, record_bucket_imbalance
+from .utils import (split_data, select_samples, choose_pivots, sort_bucket, merge_sorted_runs_ndarray, get_oversampling,
+                    should_run_parallel, DEFAULT_OVERSAMPLING)
+from .sequential import sample_sort
+
+
+def sample_sort_task(params, arr):
+    phase, _, sample_count, leaf_backend = params
+
+    # a bucket is a concatenation of sorted pieces - merge them instead of sorting again
+    if phase == "bucket":
+        return None, merge_sorted_runs_ndarray(arr)
+
+    if leaf_backend is not None and leaf_backend != "python":
+        local = sort_bucket(arr, leaf_backend)
+    else:
+        local = np.asarray(sort_bucket(arr.tolist()), dtype=arr.dtype)
+
+    return select_samples(local, sample_count).tolist(), local
+
+
+def parallel_sample_sort(data, process_count, leaf_backend=None, oversampling=DEFAULT_OVERSAMPLING):
+    if len(data) <= 1:
+        return data
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    get_oversampling(oversampling)
+
+    if not should_run_parallel(len(data), process_count):
+        return sample_sort(data, leaf_backend=leaf_backend, oversampling=oversampling)
+
+    chunks = split_data(to_array(data), process_count)
+
+    sorted_chunks = {}
+    samples = []
+    sorted_buckets = {}
+
+    def on_result(params, info, arr):
+        phase, index, _, _ = params
+
+        if phase == "bucket":
+            sorted_buckets[index] = arr
+            return []
+
+        sorted_chunks[index] = arr
+        samples.extend(info)
+
+        if len(sorted_chunks) < len(chunks):
+            return []
+
+        # every chunk is sorted - split points come from searchsorted, no per-element distribution
+        pivots = np.asarray(choose_pivots(samples, process_count))
+        pieces = [[] for _ in range(len(pivots) + 1)]
+
+        for key in sorted(sorted_chunks):
+            chunk = sorted_chunks[key]
+            split_points = np.concatenate([[0], np.searchsorted(chunk, pivots, side='right'), [len(chunk)]])
+
+            for i in range(len(pieces)):
+                pieces[i].append(chunk[split_points[i]:split_points[i + 1]])
+
+        record_metric("oversampling", oversampling)
+        record_bucket_imbalance([sum(len(piece) for piece in bucket_pieces) for bucket_pieces in pieces], process_count)
+
+        tasks = []
+
+        for i, bucket_pieces in enumerate(pieces):
+            bucket = np.concatenate(bucket_pieces)
+
+            if len(bucket) > 0:
+                tasks.append((("bucket", i, 0, leaf_backend), bucket))
+
+        return tasks
+
+    run_task_graph(
+        [(("chunk", i, process_count * oversampling, leaf_backend), chunk) for i, chunk in enumerate(chunks)],
+        process_count,
+        sample_sort_task,
+        on_result
+    )
+
+    return np.concatenate([sorted_buckets[key] for key in sorted(sorted_buckets)]).tolist()
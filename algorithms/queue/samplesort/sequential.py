@@ -0,0 +1,47 @@
+from .utils import (split_data, select_samples, choose_pivots, distribute_to_buckets, sort_bucket, merge_sorted_runs,
+                    get_oversampling, calculate_parts, DEFAULT_OVERSAMPLING)
+from algorithms.leaf_sort import get_leaf_sort_backend
+from algorithms.metrics import record_metric, record_bucket_imbalance
+
+
+def sample_sort(arr, parts=None, leaf_backend=None, oversampling=DEFAULT_OVERSAMPLING):
+    if len(arr) <= 1:
+        return arr
+
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    get_oversampling(oversampling)
+
+    if parts is None:
+        parts = calculate_parts(len(arr))
+
+    chunks = split_data(arr, parts)
+
+    sorted_chunks = []
+    samples = []
+
+    for chunk in chunks:
+        sorted_chunk = sort_bucket(chunk, leaf_backend)
+        sorted_chunks.append(sorted_chunk)
+        samples.extend( select_samples(sorted_chunk, parts * oversampling) )
+
+    pivots = choose_pivots(samples, parts)
+    # every bucket is made of one sorted run per chunk
+    bucket_runs = [[] for _ in range(len(pivots) + 1)]
+
+    for chunk in sorted_chunks:
+        local_buckets = distribute_to_buckets(chunk, pivots)
+
+        for i in range(len(local_buckets)):
+            bucket_runs[i].append(local_buckets[i])
+
+    record_metric("oversampling", oversampling)
+    record_bucket_imbalance([sum(len(run) for run in runs) for runs in bucket_runs], parts)
+
+    sorted_array = []
+
+    for runs in bucket_runs:
+        sorted_array.extend(merge_sorted_runs(runs))
+
+    return sorted_array
\ No newline at end of file
@@ -0,0 +1,201 @@
+import os
+import heapq
+import math
+import numpy as np
+
+from algorithms.queue.mergesort.sequential import merge_sort
+from algorithms.leaf_sort import sort_leaf
+from algorithms.cutoffs import get_calibrated_cutoff
+
+
+MIN_SIZE_PER_CORE = 50_000
+MIN_GROUP_SIZE = 5000
+
+# samples taken from every chunk = process_count * oversampling
+DEFAULT_OVERSAMPLING = 1
+
+# {cores: próg}
+PARALLEL_SIZE_CUTOFF = {
+    2: 100_000,
+    4: 100_000,
+    8: 100_000,
+    16: 200_000,
+    32: 200_000,
+    64: 200_000,
+    128: 400_000,
+}
+GROUP_SIZE_CUTOFF = {
+    2: 50_000,
+    4: 50_000,
+    8: 50_000,
+    16: 100_000,
+    32: 100_000,
+    64: 100_000,
+    128: 200_000,
+}
+
+
+def get_parallel_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("samplesort", "parallel_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
+    cutoff = PARALLEL_SIZE_CUTOFF.get(process_count)
+
+    if cutoff is None:
+        return MIN_SIZE_PER_CORE
+
+    return cutoff
+
+
+def get_group_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("samplesort", "group_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
+    cutoff = GROUP_SIZE_CUTOFF.get(process_count)
+
+    if cutoff is None:
+        return MIN_GROUP_SIZE
+
+    return cutoff
+
+
+def should_run_parallel(data_size, process_count):
+    if data_size < process_count * get_parallel_size_cutoff(process_count):
+        return False
+    if (data_size // process_count) < get_group_size_cutoff(process_count):
+        return False
+
+    return True
+
+
+def get_oversampling(oversampling):
+    if not isinstance(oversampling, int) or oversampling < 1:
+        raise ValueError(f"Niepoprawny współczynnik nadpróbkowania: {oversampling}")
+
+    return oversampling
+
+
+def select_samples(sorted_chunk, sample_count):
+    if len(sorted_chunk) == 0:
+        return []
+
+    step = max(1, len(sorted_chunk) // sample_count)
+
+    return sorted_chunk[::step][:sample_count]
+
+
+def choose_pivots(samples, process_count):
+    samples.sort()
+
+    if len(samples) == 0:
+        return []
+
+    pivots = []
+
+    if len(samples) < process_count:
+        step = max(1, len(samples) // process_count)
+    else:
+        step = len(samples) // process_count
+
+    for i in range(1, process_count):
+        idx = i * step
+        if idx >= len(samples):
+            break
+        pivots.append(samples[idx])
+
+    deduped = []
+    for p in pivots:
+        if not deduped or p != deduped[-1]:
+            deduped.append(p)
+
+    return deduped
+
+
+def distribute_to_buckets(data, pivots):
+    if not pivots:
+        return [list(data)]
+
+    arr = np.asarray(data)
+    pivots_arr = np.asarray(pivots)
+
+    indices = np.searchsorted(pivots_arr, arr, side='right')
+
+    order = np.argsort(indices, kind='stable')
+    sorted_indices = indices[order]
+    sorted_values = arr[order]
+    boundaries = np.searchsorted(sorted_indices, np.arange(len(pivots) + 2))
+
+    buckets = []
+    for i in range(len(pivots) + 1):
+        buckets.append(sorted_values[boundaries[i]:boundaries[i + 1]].tolist())
+
+    return buckets
+
+
+def split_data(arr, parts):
+    chunk_size = len(arr) // parts
+    chunks = []
+
+    for i in range(parts):
+        start = i * chunk_size
+
+        if i == parts - 1:
+            end = len(arr)
+        else:
+            end = (i + 1) * chunk_size
+
+        chunks.append(arr[start:end])
+
+    return chunks
+
+
+def calculate_parts(data_size, process_count=None):
+    if data_size <= 1:
+        return 1
+
+    if process_count is None:
+        process_count = os.cpu_count() or 8
+
+    return min(process_count, data_size)
+
+
+def sort_bucket(bucket, leaf_backend=None):
+    if leaf_backend is not None and leaf_backend != "python":
+        return sort_leaf(bucket, leaf_backend)
+
+    merge_sort(bucket)
+    return bucket
+
+
+def split_buckets(buckets, process_count):
+    n = len(buckets)
+    chunk_size = math.ceil(n / process_count)
+    groups = []
+
+    for i in range(0, n, chunk_size):
+        groups.append(buckets[i:i + chunk_size])
+
+    return groups
+
+
+# k-way merge of sorted runs with a heap - O(m log k) instead of sorting the whole bucket again
+def merge_sorted_runs(runs):
+    runs = [run for run in runs if len(run) > 0]
+
+    if not runs:
+        return []
+
+    if len(runs) == 1:
+        return list(runs[0])
+
+    return list(heapq.merge(*runs))
+
+
+# version with NumPy - timsort behind kind="stable" finds the presorted runs and only merges them
+def merge_sorted_runs_ndarray(values):
+    values.sort(kind="stable")
+    return values
@@ -1,41 +1,196 @@
 import multiprocessing as mp
+import numpy as np
 
-from algorithms.shared_memory.bucketsort.utils import (attach_shared_array, create_shared_array, destroy_shared_memory,
-                    calculate_bucket_count, distribute_to_buckets, flatten_buckets, split_bucket_ranges, sort_bucket,
-                    should_run_parallel, should_spawn_for_group, get_group_size_cutoff)
+from multiprocessing import shared_memory
+
+from algorithms.shared_memory.bucketsort.utils import (destroy_shared_memory, calculate_bucket_count, compute_bucket_indices,
+                    compute_quantile_bucket_indices, choose_splitters, build_bucket_layout, scatter_to_shared_segment, scatter_chunk, split_bucket_layout, split_ranges,
+                    sort_bucket, should_run_parallel, should_spawn_for_group, get_group_size_cutoff, get_shared_array_backend,
+                    get_distribution_mode, get_bucket_range_mode, get_grouping_mode, create_shared_ndarray, create_shared_segment, view_shared_segment,
+                    shared_array_to_result)
+from algorithms.leaf_sort import get_leaf_sort_backend, NDARRAY_LEAF_BACKEND
+from algorithms.tracing import (trace_phase, trace_worker_phase, create_worker_phases, collect_worker_phases,
+                                destroy_worker_phases)
 from .sequential import bucket_sort
 
-# version with min group size
-def sort_group(arr, bucket_ranges):
-    if not bucket_ranges:
+
+WORKER_POLL_INTERVAL = 1.0
+
+# phases timed inside distribution_worker when tracing is on
+DISTRIBUTION_WORKER_PHASES = ("min_max", "histogram", "scatter", "barrier", "leaf_sort")
+
+# version with min group size - buckets of a group are given as (offsets, lengths)
+def sort_group(arr, offsets, lengths, variant="recursive", leaf_backend=None):
+    if not offsets:
         return
 
-    group_start = bucket_ranges[0][0]
-    group_end = bucket_ranges[-1][1]
+    if isinstance(arr, np.ndarray):
+        for offset, bucket_length in zip(offsets, lengths):
+            if bucket_length > 1:
+                sort_bucket(arr[offset:offset + bucket_length], variant, leaf_backend or NDARRAY_LEAF_BACKEND)
+        return
+
+    group_start = offsets[0]
+    group_end = offsets[-1] + lengths[-1]
 
-    local = arr[group_start:group_end + 1]
+    local = arr[group_start:group_end]
 
-    for start, end in bucket_ranges:
-        if start > end:
+    for offset, bucket_length in zip(offsets, lengths):
+        if bucket_length < 2:
             continue
-        rel_start = start - group_start
-        rel_end = end - group_start
-        local[rel_start:rel_end + 1] = sort_bucket(local[rel_start:rel_end + 1])
+        rel_start = offset - group_start
+        local[rel_start:rel_start + bucket_length] = sort_bucket(local[rel_start:rel_start + bucket_length], variant,
+                                                                  leaf_backend)
 
-    arr[group_start:group_end + 1] = local
+    arr[group_start:group_end] = local
 
 
-def bucket_worker(shm_name, length, dtype, bucket_ranges):
+def bucket_worker(shm_name, length, dtype, offsets, lengths, backend="ctypes", variant="recursive", leaf_backend=None):
+    _, attach_shared_array = get_shared_array_backend(backend)
     shm, arr = attach_shared_array(shm_name, length, dtype)
     try:
-        sort_group(arr, bucket_ranges)
+        sort_group(arr, offsets, lengths, variant, leaf_backend)
     finally:
         del arr
         shm.close()
 
 
-def bucket_worker_inline(arr, bucket_ranges):
-    sort_group(arr, bucket_ranges)
+def bucket_worker_inline(arr, offsets, lengths, variant="recursive", leaf_backend=None):
+    sort_group(arr, offsets, lengths, variant, leaf_backend)
+# end
+
+# version with parallel distribution - every worker owns one chunk of the input
+# local min/max -> barrier -> histogram -> barrier -> scatter into the output -> barrier -> sort one group of buckets
+# with splitters (quantile ranges) the min/max step is skipped
+def distribution_worker(input_name, output_name, stats_name, hist_name, length, dtype, bucket_count, worker_index,
+                        process_count, barrier, backend="ctypes", variant="recursive", leaf_backend=None,
+                        splitters=None, grouping="buckets", phase_handle=None):
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    hist_shm = shared_memory.SharedMemory(name=hist_name)
+
+    values = view_shared_segment(input_shm, length, dtype)
+    output = view_shared_segment(output_shm, length, dtype)
+    stats = view_shared_segment(stats_shm, 2 * process_count, dtype)
+    histograms = view_shared_segment(hist_shm, process_count * bucket_count, int).reshape(process_count, bucket_count)
+    chunk = None
+    arr = None
+
+    try:
+        start, end = split_ranges(length, process_count)[worker_index]
+        chunk = values[start:end]
+
+        if splitters is None:
+            with trace_worker_phase(phase_handle, worker_index, "min_max"):
+                stats[2 * worker_index] = chunk.min()
+                stats[2 * worker_index + 1] = chunk.max()
+
+            with trace_worker_phase(phase_handle, worker_index, "barrier"):
+                barrier.wait()
+
+        with trace_worker_phase(phase_handle, worker_index, "histogram"):
+            if splitters is None:
+                indices = compute_bucket_indices(chunk, bucket_count, stats[0::2].min(), stats[1::2].max())
+            else:
+                indices = compute_quantile_bucket_indices(chunk, splitters)
+
+            histograms[worker_index] = np.bincount(indices, minlength=bucket_count)
+
+        with trace_worker_phase(phase_handle, worker_index, "barrier"):
+            barrier.wait()
+
+        with trace_worker_phase(phase_handle, worker_index, "scatter"):
+            totals = histograms.sum(axis=0)
+            bucket_offsets = np.cumsum(totals) - totals
+            scatter_chunk(chunk, indices, output, bucket_offsets + histograms[:worker_index].sum(axis=0))
+
+        # every chunk is scattered before anybody sorts a bucket
+        with trace_worker_phase(phase_handle, worker_index, "barrier"):
+            barrier.wait()
+
+        groups = split_bucket_layout(bucket_offsets, totals, process_count, grouping)
+
+        if worker_index < len(groups):
+            with trace_worker_phase(phase_handle, worker_index, "leaf_sort"):
+                group_offsets, group_lengths = groups[worker_index]
+                arr = output if backend == "numpy" else view_shared_segment(output_shm, length, dtype, backend)
+                sort_group(arr, group_offsets, group_lengths, variant, leaf_backend)
+
+    finally:
+        del values, output, stats, histograms, chunk, arr
+        input_shm.close()
+        output_shm.close()
+        stats_shm.close()
+        hist_shm.close()
+
+
+def run_distribution_workers(processes, barrier):
+    with trace_phase("spawn"):
+        for process in processes:
+            process.start()
+
+    try:
+        while True:
+            for process in processes:
+                process.join(WORKER_POLL_INTERVAL)
+
+                # a dead worker would leave the others waiting on the barrier forever
+                if process.exitcode not in (None, 0):
+                    barrier.abort()
+                    raise RuntimeError(f"Proces roboczy bucket sort zakończył się kodem {process.exitcode}")
+
+            if not any(process.is_alive() for process in processes):
+                break
+    finally:
+        for process in processes:
+            process.join()
+
+
+def parallel_distribution_bucket_sort(data, process_count, bucket_count, backend="ctypes", variant="recursive",
+                                      leaf_backend=None, splitters=None, grouping="buckets"):
+    dtype = type(data[0])
+    length = len(data)
+
+    with trace_phase("shm_create"):
+        input_shm, values = create_shared_ndarray(data, dtype)
+        del values
+        output_shm = create_shared_segment(length, dtype)
+        stats_shm = create_shared_segment(2 * process_count, dtype)
+        hist_shm = create_shared_segment(process_count * bucket_count, int)
+
+    phases_shm, phase_handle = create_worker_phases(process_count, DISTRIBUTION_WORKER_PHASES)
+    arr = None
+
+    try:
+        barrier = mp.Barrier(process_count)
+
+        processes = [
+            mp.Process(
+                target=distribution_worker,
+                args=(input_shm.name, output_shm.name, stats_shm.name, hist_shm.name, length, dtype, bucket_count,
+                      worker_index, process_count, barrier, backend, variant, leaf_backend, splitters, grouping,
+                      phase_handle)
+            )
+            for worker_index in range(process_count)
+        ]
+
+        with trace_phase("workers"):
+            run_distribution_workers(processes, barrier)
+
+        collect_worker_phases(phases_shm, phase_handle)
+
+        with trace_phase("result_copy"):
+            arr = view_shared_segment(output_shm, length, dtype, backend)
+            return shared_array_to_result(arr)
+
+    finally:
+        del arr
+        destroy_worker_phases(phases_shm)
+        destroy_shared_memory(input_shm)
+        destroy_shared_memory(output_shm)
+        destroy_shared_memory(stats_shm)
+        destroy_shared_memory(hist_shm)
 # end
 
 # version without min group size - less optimized
@@ -65,10 +220,18 @@ def bucket_worker_inline(arr, bucket_ranges):
 #         shm.close()
 
 
-def parallel_bucket_sort(data, process_count):
+def parallel_bucket_sort(data, process_count, backend="ctypes", variant="recursive", leaf_backend=None,
+                         distribution="parallel", bucket_ranges="equal_width", grouping="buckets"):
     if len(data) <= 1:
         return data
 
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    get_distribution_mode(distribution)
+    get_bucket_range_mode(bucket_ranges)
+    get_grouping_mode(grouping)
+
     # version with min group size - more optimized
     # if len(data) <= MIN_SIZE_FOR_PARALLEL or (len(data) // process_count) < MIN_GROUP_SIZE:
     #     return sort_bucket(data)
@@ -79,22 +242,43 @@ def parallel_bucket_sort(data, process_count):
 
     # the newest attempt
     if not should_run_parallel(len(data), process_count) or (len(data) // process_count) < get_group_size_cutoff(process_count):
-        return  bucket_sort(data)
+        return  bucket_sort(data, variant=variant, leaf_backend=leaf_backend, bucket_ranges=bucket_ranges)
     # ex
 
     dtype = type(data[0])
+    get_shared_array_backend(backend)
     bucket_count = calculate_bucket_count(len(data), process_count)
-    buckets = distribute_to_buckets(data, bucket_count)
-    flat_data, bucket_ranges = flatten_buckets(buckets)
-    shm, arr = create_shared_array(flat_data, dtype)
+    splitters = None
+
+    if bucket_ranges == "quantile":
+        with trace_phase("splitters"):
+            splitters = choose_splitters(data, bucket_count)
+        bucket_count = len(splitters) + 1
+
+    if distribution == "parallel":
+        return parallel_distribution_bucket_sort(data, process_count, bucket_count, backend, variant, leaf_backend,
+                                                 splitters, grouping)
+
+    # version with counting scatter - histogram offsets + rank inside the bucket (utils.compute_bucket_ranks),
+    # no per-bucket lists and no flatten copy
+    with trace_phase("distribution"):
+        values = np.asarray(data)
+
+        if splitters is None:
+            indices = compute_bucket_indices(values, bucket_count)
+        else:
+            indices = compute_quantile_bucket_indices(values, splitters)
+        offsets, lengths = build_bucket_layout(indices, bucket_count)
+        shm, arr = scatter_to_shared_segment(values, indices, dtype, backend)
+        del values, indices
 
     try:
-        bucket_groups = split_bucket_ranges(bucket_ranges, process_count)
+        bucket_groups = split_bucket_layout(offsets, lengths, process_count, grouping)
         processes = []
         sequential_groups = [] # version with min group size - more optimized
 
         for group in bucket_groups:
-            if not group:
+            if not group[0]:
                 continue
 
             # old version without min group size - less optimized
@@ -113,23 +297,33 @@ def parallel_bucket_sort(data, process_count):
             # end old version without min group size - less optimized
 
             # version without min group size - more optimized
-            group_size = group[-1][1] - group[0][0] + 1
+            group_offsets, group_lengths = group
+            group_size = sum(group_lengths)
 
             if should_spawn_for_group(group_size, process_count):
-                process = mp.Process(target=bucket_worker, args=(shm.name, len(arr), dtype, group))
-                process.start()
+                process = mp.Process(
+                    target=bucket_worker,
+                    args=(shm.name, len(arr), dtype, group_offsets, group_lengths, backend, variant, leaf_backend)
+                )
+
+                with trace_phase("spawn"):
+                    process.start()
+
                 processes.append(process)
             else:
                 sequential_groups.append(group)
 
-        for group in sequential_groups:
-            bucket_worker_inline(arr, group)
+        with trace_phase("inline_sort"):
+            for group_offsets, group_lengths in sequential_groups:
+                bucket_worker_inline(arr, group_offsets, group_lengths, variant, leaf_backend)
         # end version without min group size - more optimized
 
-        for process in processes:
-            process.join()
+        with trace_phase("join"):
+            for process in processes:
+                process.join()
 
-        return list(arr)
+        with trace_phase("result_copy"):
+            return shared_array_to_result(arr)
 
     finally:
         del arr
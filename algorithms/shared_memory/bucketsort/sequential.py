@@ -1,19 +1,26 @@
 import math
 
-from algorithms.shared_memory.bucketsort.utils import distribute_to_buckets, sort_bucket
+from algorithms.shared_memory.bucketsort.utils import distribute_to_buckets, choose_splitters, get_bucket_range_mode, sort_bucket
+from algorithms.leaf_sort import get_leaf_sort_backend
 
 
-def bucket_sort(arr, bucket_count=None):
+def bucket_sort(arr, bucket_count=None, variant="recursive", leaf_backend=None, bucket_ranges="equal_width"):
     if len(arr) <= 1:
         return arr
 
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
     if bucket_count is None:
         bucket_count = int(math.sqrt(len(arr)))
 
-    buckets = distribute_to_buckets(arr, bucket_count)
+    get_bucket_range_mode(bucket_ranges)
+    splitters = choose_splitters(arr, bucket_count) if bucket_ranges == "quantile" else None
+
+    buckets = distribute_to_buckets(arr, bucket_count, splitters)
     sorted_array = []
 
     for bucket in buckets:
-        sorted_array.extend(sort_bucket(bucket))
+        sorted_array.extend(sort_bucket(bucket, variant, leaf_backend))
 
     return sorted_array
\ No newline at end of file
@@ -1,14 +1,27 @@
 import ctypes
 import math
+import random
 import numpy as np
 from multiprocessing import shared_memory
 
 from algorithms.shared_memory.mergesort.sequential import merge_sort
+from algorithms.leaf_sort import sort_leaf
+from algorithms.cutoffs import get_calibrated_cutoff
 
 
 MIN_SIZE_FOR_PARALLEL = 5000
 MIN_GROUP_SIZE = 2000
 
+# "serial" - the parent distributes the data before spawning, "parallel" - workers histogram and scatter their chunks
+DISTRIBUTION_MODES = ("serial", "parallel")
+
+# "equal_width" - (max - min) / bucket_count, "quantile" - boundaries from sampled quantiles
+BUCKET_RANGE_MODES = ("equal_width", "quantile")
+QUANTILE_OVERSAMPLING = 16
+
+# "buckets" - the same number of buckets per worker, "count" - greedy, about the same number of elements per worker
+GROUPING_MODES = ("buckets", "count")
+
 # {cores: próg}
 PARALLEL_SIZE_CUTOFF = {
     2: 100_000,
@@ -32,6 +45,11 @@ GROUP_SIZE_CUTOFF = {
 
 
 def get_parallel_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("bucketsort", "parallel_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
     cutoff = PARALLEL_SIZE_CUTOFF.get(process_count)
 
     if cutoff is None:
@@ -41,6 +59,11 @@ def get_parallel_size_cutoff(process_count):
 
 
 def get_group_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("bucketsort", "group_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
     cutoff = GROUP_SIZE_CUTOFF.get(process_count)
 
     if cutoff is None:
@@ -57,6 +80,27 @@ def should_spawn_for_group(group_size, process_count):
     return group_size > get_group_size_cutoff(process_count)
 
 
+def get_distribution_mode(distribution):
+    if distribution not in DISTRIBUTION_MODES:
+        raise ValueError(f"Nieznany tryb rozdziału do kubełków: {distribution}")
+
+    return distribution
+
+
+def get_bucket_range_mode(bucket_ranges):
+    if bucket_ranges not in BUCKET_RANGE_MODES:
+        raise ValueError(f"Nieznany tryb zakresów kubełków: {bucket_ranges}")
+
+    return bucket_ranges
+
+
+def get_grouping_mode(grouping):
+    if grouping not in GROUPING_MODES:
+        raise ValueError(f"Nieznany tryb grupowania kubełków: {grouping}")
+
+    return grouping
+
+
 def get_ctype(dtype):
     if dtype is int:
         return ctypes.c_longlong
@@ -89,6 +133,59 @@ def attach_shared_array(name, length, dtype):
     return shm, shared_array
 
 
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def create_shared_ndarray(data, dtype):
+    np_dtype = np.dtype(get_np_dtype(dtype))
+
+    shm = shared_memory.SharedMemory(
+        create=True,
+        size=len(data) * np_dtype.itemsize
+    )
+
+    shared_array = np.ndarray((len(data),), dtype=np_dtype, buffer=shm.buf)
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_ndarray(name, length, dtype):
+    np_dtype = get_np_dtype(dtype)
+
+    shm = shared_memory.SharedMemory(name=name)
+    shared_array = np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    return shm, shared_array
+
+
+# "ctypes" - the segment is a ctypes array, "numpy" - zero-copy np.ndarray view over the segment
+SHARED_ARRAY_BACKENDS = {
+    "ctypes": (create_shared_array, attach_shared_array),
+    "numpy": (create_shared_ndarray, attach_shared_ndarray),
+}
+
+
+def get_shared_array_backend(backend):
+    if backend not in SHARED_ARRAY_BACKENDS:
+        raise ValueError(f"Nieznany backend pamięci współdzielonej: {backend}")
+
+    return SHARED_ARRAY_BACKENDS[backend]
+
+
+def shared_array_to_result(arr):
+    if isinstance(arr, np.ndarray):
+        return arr.copy()
+
+    return list(arr)
+
+
 def close_shared_memory(shm):
     shm.close()
 
@@ -97,6 +194,35 @@ def destroy_shared_memory(shm):
     shm.close()
     shm.unlink()
 
+
+# empty segment for the output, the min/max table and the histograms
+def create_shared_segment(length, dtype):
+    return shared_memory.SharedMemory(
+        create=True,
+        size=max(1, length * np.dtype(get_np_dtype(dtype)).itemsize)
+    )
+
+
+def view_shared_segment(shm, length, dtype, backend="numpy"):
+    if backend == "numpy":
+        return np.ndarray((length,), dtype=get_np_dtype(dtype), buffer=shm.buf)
+
+    return (get_ctype(dtype) * length).from_buffer(shm.buf)
+
+
+# equal chunks, the first length % parts chunks are one element longer
+def split_ranges(length, parts):
+    base, extra = divmod(length, parts)
+    ranges = []
+    start = 0
+
+    for i in range(parts):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
 # version without NumPy
 # def distribute_to_buckets(arr, bucket_count):
 #     if len(arr) == 0:
@@ -126,11 +252,20 @@ def destroy_shared_memory(shm):
 #     return buckets
 
 # version with NumPy - more optimized
-def distribute_to_buckets(arr, bucket_count):
+def distribute_to_buckets(arr, bucket_count, splitters=None):
     if len(arr) == 0:
         return []
 
     arr_np = np.asarray(arr)
+
+    if splitters is not None:
+        indices = compute_quantile_bucket_indices(arr_np, splitters)
+        order = argsort_bucket_ids(indices, len(splitters) + 1)
+        sorted_values = arr_np[order]
+        boundaries = np.searchsorted(indices[order], np.arange(len(splitters) + 2))
+
+        return [sorted_values[boundaries[i]:boundaries[i + 1]].tolist() for i in range(len(splitters) + 1)]
+
     min_value = arr_np.min()
     max_value = arr_np.max()
 
@@ -145,7 +280,7 @@ def distribute_to_buckets(arr, bucket_count):
         ((arr_np - min_value) / bucket_range).astype(np.int64)
     )
 
-    order = np.argsort(indices, kind='stable')
+    order = argsort_bucket_ids(indices, bucket_count)
     sorted_indices = indices[order]
     sorted_values = arr_np[order]
 
@@ -157,6 +292,175 @@ def distribute_to_buckets(arr, bucket_count):
     return buckets
 
 
+# bucket index of every value, same formula as distribute_to_buckets
+# min_value / max_value are given when values is only a chunk of the whole array
+def compute_bucket_indices(values, bucket_count, min_value=None, max_value=None):
+    if min_value is None:
+        min_value = values.min()
+    if max_value is None:
+        max_value = values.max()
+
+    if min_value == max_value:
+        return np.zeros(len(values), dtype=np.int64)
+
+    bucket_range = (max_value - min_value) / bucket_count
+
+    return np.minimum(
+        bucket_count - 1,
+        ((values - min_value) / bucket_range).astype(np.int64)
+    )
+
+
+# bucket_count - 1 boundaries from a random sample, repeated ones are merged
+# so a heavy value ends up in one bucket instead of a run of empty ones
+def choose_splitters(arr, bucket_count, oversampling=QUANTILE_OVERSAMPLING):
+    sample_size = min(len(arr), bucket_count * oversampling)
+    sample = np.sort(np.asarray([arr[random.randrange(len(arr))] for _ in range(sample_size)]))
+
+    positions = (np.arange(1, bucket_count) * sample_size) // bucket_count
+
+    return np.unique(sample[positions])
+
+
+# bucket i holds splitters[i - 1] <= value < splitters[i]
+def compute_quantile_bucket_indices(values, splitters):
+    return np.searchsorted(splitters, values, side="right")
+
+
+# narrowest type for the bucket ids - numpy sorts uint8 / uint16 stably with a radix (counting) sort, O(n)
+def get_bucket_id_dtype(bucket_count):
+    if bucket_count <= 1 << 8:
+        return np.uint8
+
+    if bucket_count <= 1 << 16:
+        return np.uint16
+
+    # more buckets than calculate_bucket_count gives below 4 * 10^9 values - timsort, O(n log n)
+    return np.int64
+
+
+def argsort_bucket_ids(indices, bucket_count):
+    return np.argsort(indices.astype(get_bucket_id_dtype(bucket_count), copy=False), kind="stable")
+
+
+# running rank of every value inside its bucket, in input order
+def compute_bucket_ranks(indices, bucket_count):
+    order = argsort_bucket_ids(indices, bucket_count)
+    counts = np.bincount(indices, minlength=bucket_count)
+    starts = np.cumsum(counts) - counts
+
+    ranks = np.empty(len(indices), dtype=np.int64)
+    ranks[order] = np.arange(len(indices)) - starts[indices[order]]
+
+    return ranks
+
+
+# histogram of bucket indices -> (offset, length) of every bucket in the flat segment
+def build_bucket_layout(indices, bucket_count):
+    lengths = np.bincount(indices, minlength=bucket_count)
+    offsets = np.cumsum(lengths) - lengths
+
+    return offsets, lengths
+
+
+# version without list-of-lists: bucket contents are written straight into a new shared segment
+def scatter_to_shared_segment(values, indices, dtype, backend="ctypes"):
+    np_dtype = np.dtype(get_np_dtype(dtype))
+
+    shm = shared_memory.SharedMemory(
+        create=True,
+        size=max(1, len(values) * np_dtype.itemsize)
+    )
+
+    target = np.ndarray((len(values),), dtype=np_dtype, buffer=shm.buf)
+
+    if len(values):
+        bucket_count = int(indices.max()) + 1
+        offsets, _ = build_bucket_layout(indices, bucket_count)
+        # counting scatter - destination = bucket offset + rank inside the bucket
+        target[offsets[indices] + compute_bucket_ranks(indices, bucket_count)] = values
+
+    del target
+
+    return shm, view_shared_segment(shm, len(values), dtype, backend)
+
+
+# stable scatter of one chunk - offsets[b] is where the first value of bucket b from this chunk goes
+def scatter_chunk(chunk, indices, target, offsets):
+    target[offsets[indices] + compute_bucket_ranks(indices, len(offsets))] = chunk
+
+
+def split_bucket_layout(offsets, lengths, process_count, grouping="buckets"):
+    if grouping == "count":
+        return split_bucket_layout_by_count(offsets, lengths, process_count)
+
+    n = len(offsets)
+    chunk_size = math.ceil(n / process_count)
+
+    groups = []
+    for i in range(0, n, chunk_size):
+        groups.append((offsets[i:i + chunk_size].tolist(), lengths[i:i + chunk_size].tolist()))
+
+    return groups
+
+
+# greedy - a group is closed once it holds its share of the elements that are still left
+def split_bucket_layout_by_count(offsets, lengths, process_count):
+    groups = []
+    remaining = int(np.sum(lengths))
+
+    group_offsets = []
+    group_lengths = []
+    group_size = 0
+
+    for offset, bucket_length in zip(np.asarray(offsets).tolist(), np.asarray(lengths).tolist()):
+        group_offsets.append(offset)
+        group_lengths.append(bucket_length)
+        group_size += bucket_length
+
+        groups_left = process_count - len(groups)
+
+        if groups_left > 1 and group_size >= remaining / groups_left:
+            groups.append((group_offsets, group_lengths))
+            remaining -= group_size
+
+            group_offsets = []
+            group_lengths = []
+            group_size = 0
+
+    if group_offsets:
+        groups.append((group_offsets, group_lengths))
+
+    return groups
+
+
+# largest group / ideal share of one worker - 1.0 means perfect balance
+def calculate_group_balance(groups, process_count):
+    sizes = [sum(group_lengths) for _, group_lengths in groups]
+    total = sum(sizes)
+
+    if total == 0:
+        return 1.0
+
+    return max(sizes) / (total / process_count)
+
+
+def measure_group_balance(data, process_count, bucket_ranges="equal_width", grouping="buckets"):
+    values = np.asarray(data)
+    bucket_count = calculate_bucket_count(len(values), process_count)
+
+    if bucket_ranges == "quantile":
+        splitters = choose_splitters(values, bucket_count)
+        indices = compute_quantile_bucket_indices(values, splitters)
+        bucket_count = len(splitters) + 1
+    else:
+        indices = compute_bucket_indices(values, bucket_count)
+
+    offsets, lengths = build_bucket_layout(indices, bucket_count)
+
+    return calculate_group_balance(split_bucket_layout(offsets, lengths, process_count, grouping), process_count)
+
+
 def flatten_buckets(buckets):
     flat_data = []
     bucket_ranges = []
@@ -192,6 +496,9 @@ def split_bucket_ranges(bucket_ranges, process_count):
     return groups
 
 
-def sort_bucket(bucket):
-    merge_sort(bucket)
+def sort_bucket(bucket, variant="recursive", leaf_backend=None):
+    if leaf_backend is not None and leaf_backend != "python":
+        return sort_leaf(bucket, leaf_backend)
+
+    merge_sort(bucket, variant=variant)
     return bucket
\ No newline at end of file
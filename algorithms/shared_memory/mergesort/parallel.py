@@ -1,24 +1,46 @@
+import heapq
 import multiprocessing as mp
+import numpy as np
 
-from algorithms.shared_memory.mergesort.utils import merge, create_shared_array, attach_shared_array, destroy_shared_memory, calculate_min_size
-from algorithms.shared_memory.mergesort.sequential import merge_sort
+from algorithms.shared_memory.mergesort.utils import (merge, merge_ndarray, destroy_shared_memory, calculate_min_size,
+                    get_shared_array_backend, shared_array_to_result, allocate_shared_array, split_runs, split_runs_by_rank)
+from algorithms.shared_memory.mergesort.sequential import merge_sort, get_merge_sort_variant
 
 
-def sort_in_place_on_shared(arr, left, right):
+PARALLEL_MODES = ("recursive", "kway")
+
+
+def sort_in_place_on_shared(arr, left, right, variant="recursive"):
+    if isinstance(arr, np.ndarray):
+        arr[left:right + 1].sort(kind="stable")
+        return
+
     size = right - left + 1
     local = arr[left:right + 1]
-    merge_sort(local, 0, size - 1)
+    merge_sort(local, 0, size - 1, variant)
     arr[left:right + 1] = local
 
 
-def parallel_mergesort_recursive(arr, shm_name, length, dtype, left, right, depth, max_depth, min_size,):
+def merge_on_shared(arr, left, mid, right):
+    if isinstance(arr, np.ndarray):
+        merge_ndarray(arr, left, mid, right)
+        return
+
+    size = right - left + 1
+    local = arr[left:right + 1]
+    merge(local, 0, mid - left, size - 1)
+    arr[left:right + 1] = local
+
+
+def parallel_mergesort_recursive(arr, shm_name, length, dtype, left, right, depth, max_depth, min_size, backend="ctypes",
+                                 variant="recursive"):
     size = right - left + 1
 
     if size <= 1:
         return
 
     if size <= min_size or depth >= max_depth:
-        sort_in_place_on_shared(arr, left, right)
+        sort_in_place_on_shared(arr, left, right, variant)
         return
 
     mid = (left + right) // 2
@@ -30,22 +52,22 @@ def parallel_mergesort_recursive(arr, shm_name, length, dtype, left, right, dept
         if part_size > min_size:
             p = mp.Process(
                 target=parallel_mergesort_worker,
-                args=(shm_name, length, dtype, part_left, part_right, depth + 1, max_depth, min_size)
+                args=(shm_name, length, dtype, part_left, part_right, depth + 1, max_depth, min_size, backend, variant)
             )
             p.start()
             processes.append(p)
         else:
-            sort_in_place_on_shared(arr, part_left, part_right)
+            sort_in_place_on_shared(arr, part_left, part_right, variant)
 
     for process in processes:
         process.join()
 
-    local = arr[left:right + 1]
-    merge(local, 0, mid - left, size - 1)
-    arr[left:right + 1] = local
+    merge_on_shared(arr, left, mid, right)
 
 
-def parallel_mergesort_worker(shm_name, length, dtype, left, right, depth, max_depth, min_size):
+def parallel_mergesort_worker(shm_name, length, dtype, left, right, depth, max_depth, min_size, backend="ctypes",
+                              variant="recursive"):
+    _, attach_shared_array = get_shared_array_backend(backend)
     shm, arr = attach_shared_array(
         shm_name,
         length,
@@ -63,17 +85,119 @@ def parallel_mergesort_worker(shm_name, length, dtype, left, right, depth, max_d
             depth,
             max_depth,
             min_size,
+            backend,
+            variant,
         )
     finally:
         del arr
         shm.close()
 
 
-def parallel_merge_sort(data, max_depth):
+# version with one k-way merge pass - leaf runs are sorted in place, then every worker merges
+# a disjoint output slice (cut at exact output ranks) straight into a second shared buffer
+def leaf_sort_worker(shm_name, length, dtype, left, right, backend="ctypes", variant="recursive"):
+    _, attach_shared_array = get_shared_array_backend(backend)
+    shm, arr = attach_shared_array(shm_name, length, dtype)
+
+    try:
+        sort_in_place_on_shared(arr, left, right, variant)
+    finally:
+        del arr
+        shm.close()
+
+
+def merge_slice(arr, out, segments, offset):
+    if isinstance(arr, np.ndarray):
+        merged = np.concatenate([arr[start:end] for start, end in segments])
+        # timsort behind kind="stable" merges the presorted runs
+        merged.sort(kind="stable")
+        out[offset:offset + len(merged)] = merged
+        return
+
+    runs = [arr[start:end] for start, end in segments if start < end]
+    merged = list(heapq.merge(*runs))
+    out[offset:offset + len(merged)] = merged
+
+
+def kway_merge_worker(shm_name, out_shm_name, length, dtype, segments, offset, backend="ctypes"):
+    _, attach_shared_array = get_shared_array_backend(backend)
+    shm, arr = attach_shared_array(shm_name, length, dtype)
+    out_shm, out = attach_shared_array(out_shm_name, length, dtype)
+
+    try:
+        merge_slice(arr, out, segments, offset)
+    finally:
+        del arr
+        del out
+        shm.close()
+        out_shm.close()
+
+
+def run_processes(processes):
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    for process in processes:
+        if process.exitcode != 0:
+            raise RuntimeError(f"Proces roboczy mergesort zakończył się kodem {process.exitcode}")
+
+
+def parallel_mergesort_kway(arr, shm_name, length, dtype, process_count, min_size, backend="ctypes", variant="recursive"):
+    if length <= min_size:
+        sort_in_place_on_shared(arr, 0, length - 1, variant)
+        return None, None
+
+    parts = max(2, min(process_count, length // min_size))
+    runs = split_runs(length, parts)
+
+    run_processes([
+        mp.Process(target=leaf_sort_worker, args=(shm_name, length, dtype, left, right, backend, variant))
+        for left, right in runs
+    ])
+
+    bounds = split_runs_by_rank(arr, runs, parts)
+
+    out_shm, out = allocate_shared_array(length, dtype, backend)
+    processes = []
+    offset = 0
+
+    for w in range(parts):
+        segments = [(run_bounds[w], run_bounds[w + 1]) for run_bounds in bounds]
+        slice_size = sum(end - start for start, end in segments)
+
+        if slice_size > 0:
+            processes.append(mp.Process(
+                target=kway_merge_worker,
+                args=(shm_name, out_shm.name, length, dtype, segments, offset, backend)
+            ))
+
+        offset += slice_size
+
+    try:
+        run_processes(processes)
+    except BaseException:
+        del out
+        destroy_shared_memory(out_shm)
+        raise
+
+    return out_shm, out
+# end
+
+
+def parallel_merge_sort(data, max_depth, mode="recursive", backend="ctypes", variant="recursive"):
     if len(data) <= 1:
         return data
 
+    if mode not in PARALLEL_MODES:
+        raise ValueError(f"Nieznany tryb mergesort: {mode}")
+
+    get_merge_sort_variant(variant)
+
     dtype = type(data[0])
+    create_shared_array, _ = get_shared_array_backend(backend)
 
     min_size = calculate_min_size(
         len(data),
@@ -86,6 +210,19 @@ def parallel_merge_sort(data, max_depth):
     )
 
     try:
+        if mode == "kway":
+            out_shm, out = parallel_mergesort_kway(arr, shm.name, len(arr), dtype, 1 << max_depth, min_size, backend,
+                                                    variant)
+
+            if out_shm is None:
+                return shared_array_to_result(arr)
+
+            try:
+                return shared_array_to_result(out)
+            finally:
+                del out
+                destroy_shared_memory(out_shm)
+
         parallel_mergesort_recursive(
             arr,
             shm.name,
@@ -96,9 +233,11 @@ def parallel_merge_sort(data, max_depth):
             0,
             max_depth,
             min_size,
+            backend,
+            variant,
         )
 
-        return list(arr)
+        return shared_array_to_result(arr)
 
     finally:
         del arr
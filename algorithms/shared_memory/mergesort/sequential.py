@@ -1,7 +1,11 @@
-from algorithms.shared_memory.mergesort.utils import merge
+from algorithms.shared_memory.mergesort.utils import (merge, merge_into, insertion_sort, compute_min_run, count_run,
+                    binary_insertion_sort, merge_runs, INSERTION_SORT_THRESHOLD)
 
 
-def merge_sort(arr, left=0, right=None):
+def merge_sort(arr, left=0, right=None, variant="recursive"):
+    if variant != "recursive":
+        return get_merge_sort_variant(variant)(arr, left, right)
+
     if right is None:
         right = len(arr) - 1
 
@@ -13,4 +17,105 @@ def merge_sort(arr, left=0, right=None):
     merge_sort(arr, left, mid)
     merge_sort(arr, mid + 1, right)
 
-    merge(arr, left, mid, right)
\ No newline at end of file
+    merge(arr, left, mid, right)
+
+
+# version with one auxiliary buffer - bottom-up passes alternate source and destination
+def merge_sort_pingpong(arr, left=0, right=None):
+    if right is None:
+        right = len(arr) - 1
+
+    if left >= right:
+        return
+
+    for start in range(left, right + 1, INSERTION_SORT_THRESHOLD):
+        insertion_sort(arr, start, min(start + INSERTION_SORT_THRESHOLD - 1, right))
+
+    src = arr
+    dst = [None] * len(arr)
+    width = INSERTION_SORT_THRESHOLD
+
+    while width < right - left + 1:
+        for start in range(left, right + 1, 2 * width):
+            mid = min(start + width - 1, right)
+            end = min(start + 2 * width - 1, right)
+
+            if mid >= end:
+                dst[start:end + 1] = src[start:end + 1]
+            else:
+                merge_into(src, dst, start, mid, end)
+
+        src, dst = dst, src
+        width *= 2
+
+    if src is not arr:
+        arr[left:right + 1] = src[left:right + 1]
+
+
+# version with natural runs (Timsort-style) - presorted data ends up in few long runs
+def merge_sort_natural(arr, left=0, right=None):
+    if right is None:
+        right = len(arr) - 1
+
+    if left >= right:
+        return
+
+    high = right + 1
+    min_run = compute_min_run(high - left)
+    runs = []
+    low = left
+
+    while low < high:
+        run_size = count_run(arr, low, high)
+
+        # short runs are extended to min_run with binary insertion
+        if run_size < min_run:
+            forced_size = min(min_run, high - low)
+            binary_insertion_sort(arr, low, low + forced_size, low + run_size)
+            run_size = forced_size
+
+        runs.append((low, run_size))
+        merge_collapse(arr, runs)
+        low += run_size
+
+    while len(runs) > 1:
+        merge_at(arr, runs, len(runs) - 2)
+
+
+def merge_at(arr, runs, index):
+    start, size = runs[index]
+    next_start, next_size = runs[index + 1]
+
+    merge_runs(arr, start, next_start, next_start + next_size)
+
+    runs[index] = (start, size + next_size)
+    del runs[index + 1]
+
+
+# keeps the run stack balanced: every run is longer than the sum of the two above it
+def merge_collapse(arr, runs):
+    while len(runs) > 1:
+        n = len(runs) - 2
+
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+
+        merge_at(arr, runs, n)
+
+
+MERGE_SORT_VARIANTS = {
+    "recursive": merge_sort,
+    "pingpong": merge_sort_pingpong,
+    "natural": merge_sort_natural,
+}
+
+
+def get_merge_sort_variant(variant):
+    if variant not in MERGE_SORT_VARIANTS:
+        raise ValueError(f"Nieznany wariant mergesort: {variant}")
+
+    return MERGE_SORT_VARIANTS[variant]
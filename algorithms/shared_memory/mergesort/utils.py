@@ -1,6 +1,10 @@
+import bisect
 import ctypes
+import numpy as np
 from multiprocessing import shared_memory
 
+from algorithms.cutoffs import get_calibrated_cutoff
+
 
 # {cores: próg_min_size}
 PARALLEL_CUTOFF = {
@@ -20,9 +24,20 @@ PARALLEL_CUTOFF = {
     # 64: 2_500_000,
     # 128: 5_000_000,
 }
+# runs up to this size are sorted by insertion sort before the ping-pong merge passes
+INSERTION_SORT_THRESHOLD = 32
+# natural merge sort: arrays shorter than this are one binary insertion sort run
+MIN_MERGE = 64
+# natural merge sort: wins in a row before a merge switches to galloping
+MIN_GALLOP = 7
 
 
 def get_parallel_cutoff(cores):
+    calibrated = get_calibrated_cutoff("mergesort", "parallel_cutoff", cores)
+
+    if calibrated is not None:
+        return calibrated
+
     return PARALLEL_CUTOFF.get(cores)
 
 
@@ -56,6 +71,165 @@ def merge(arr, left, mid, right):
     arr[left:right + 1] = temp
 
 
+def insertion_sort(arr, left, right):
+    for i in range(left + 1, right + 1):
+        value = arr[i]
+        j = i - 1
+
+        while j >= left and arr[j] > value:
+            arr[j + 1] = arr[j]
+            j -= 1
+
+        arr[j + 1] = value
+
+
+# merge of src[left..mid] and src[mid+1..right] written to dst - no temporary list
+def merge_into(src, dst, left, mid, right):
+    i = left
+    j = mid + 1
+    k = left
+
+    while i <= mid and j <= right:
+        if src[i] <= src[j]:
+            dst[k] = src[i]
+            i += 1
+        else:
+            dst[k] = src[j]
+            j += 1
+
+        k += 1
+
+    if i <= mid:
+        dst[k:right + 1] = src[i:mid + 1]
+    else:
+        dst[k:right + 1] = src[j:right + 1]
+
+
+def compute_min_run(length):
+    extra = 0
+
+    while length >= MIN_MERGE:
+        extra |= length & 1
+        length >>= 1
+
+    return length + extra
+
+
+# length of the run starting at low (high exclusive), a strictly descending run is reversed in place
+def count_run(arr, low, high):
+    end = low + 1
+
+    if end == high:
+        return 1
+
+    if arr[end] < arr[low]:
+        while end < high and arr[end] < arr[end - 1]:
+            end += 1
+
+        arr[low:end] = arr[low:end][::-1]
+    else:
+        while end < high and not arr[end] < arr[end - 1]:
+            end += 1
+
+    return end - low
+
+
+# [low, start) is already sorted, the rest of [low, high) is inserted by binary search
+def binary_insertion_sort(arr, low, high, start):
+    for i in range(max(start, low + 1), high):
+        value = arr[i]
+        position = bisect.bisect_right(arr, value, low, i)
+
+        if position < i:
+            arr[position + 1:i + 1] = arr[position:i]
+            arr[position] = value
+
+
+# exponential search followed by binary search - first index in [low, high) with arr[index] >= key
+def gallop_left(arr, key, low, high):
+    offset = 1
+
+    while low + offset < high and arr[low + offset - 1] < key:
+        offset *= 2
+
+    return bisect.bisect_left(arr, key, low + offset // 2, min(low + offset, high))
+
+
+# first index in [low, high) with arr[index] > key
+def gallop_right(arr, key, low, high):
+    offset = 1
+
+    while low + offset < high and not key < arr[low + offset - 1]:
+        offset *= 2
+
+    return bisect.bisect_right(arr, key, low + offset // 2, min(low + offset, high))
+
+
+# merge of adjacent runs [low, mid) and [mid, high) with galloping
+def merge_runs(arr, low, mid, high):
+    # the head of the left run and the tail of the right run are already in place
+    low = bisect.bisect_right(arr, arr[mid], low, mid)
+
+    if low == mid:
+        return
+
+    high = bisect.bisect_left(arr, arr[mid - 1], mid, high)
+
+    left = arr[low:mid]
+    left_size = len(left)
+
+    i = 0
+    j = mid
+    k = low
+    left_wins = 0
+    right_wins = 0
+
+    while i < left_size and j < high:
+        if arr[j] < left[i]:
+            arr[k] = arr[j]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+
+            if right_wins >= MIN_GALLOP:
+                end = gallop_left(arr, left[i], j, high)
+                arr[k:k + end - j] = arr[j:end]
+                k += end - j
+                j = end
+                right_wins = 0
+        else:
+            arr[k] = left[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+
+            if left_wins >= MIN_GALLOP:
+                end = gallop_right(left, arr[j], i, left_size)
+                arr[k:k + end - i] = left[i:end]
+                k += end - i
+                i = end
+                left_wins = 0
+
+    # what is left of the right run already sits at its final place
+    if i < left_size:
+        arr[k:k + left_size - i] = left[i:]
+
+
+# vectorized stable merge of two sorted np.ndarray ranges, final position of every element comes from searchsorted
+def merge_ndarray(arr, left, mid, right):
+    left_part = arr[left:mid + 1].copy()
+    right_part = arr[mid + 1:right + 1].copy()
+
+    left_positions = np.arange(len(left_part)) + np.searchsorted(right_part, left_part, side="left")
+    right_positions = np.arange(len(right_part)) + np.searchsorted(left_part, right_part, side="right")
+
+    segment = arr[left:right + 1]
+    segment[left_positions] = left_part
+    segment[right_positions] = right_part
+
+
 def get_ctype(dtype):
     if dtype is int:
         return ctypes.c_longlong
@@ -88,6 +262,71 @@ def attach_shared_array(name, length, dtype):
     return shm, shared_array
 
 
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def create_shared_ndarray(data, dtype):
+    np_dtype = np.dtype(get_np_dtype(dtype))
+
+    shm = shared_memory.SharedMemory(
+        create=True,
+        size=len(data) * np_dtype.itemsize
+    )
+
+    shared_array = np.ndarray((len(data),), dtype=np_dtype, buffer=shm.buf)
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_ndarray(name, length, dtype):
+    np_dtype = get_np_dtype(dtype)
+
+    shm = shared_memory.SharedMemory(name=name)
+    shared_array = np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    return shm, shared_array
+
+
+# "ctypes" - the segment is a ctypes array, "numpy" - zero-copy np.ndarray view over the segment
+SHARED_ARRAY_BACKENDS = {
+    "ctypes": (create_shared_array, attach_shared_array),
+    "numpy": (create_shared_ndarray, attach_shared_ndarray),
+}
+
+
+def get_shared_array_backend(backend):
+    if backend not in SHARED_ARRAY_BACKENDS:
+        raise ValueError(f"Nieznany backend pamięci współdzielonej: {backend}")
+
+    return SHARED_ARRAY_BACKENDS[backend]
+
+
+def allocate_shared_array(length, dtype, backend="ctypes"):
+    if backend == "numpy":
+        np_dtype = np.dtype(get_np_dtype(dtype))
+        shm = shared_memory.SharedMemory(create=True, size=length * np_dtype.itemsize)
+        return shm, np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    c_type = get_ctype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=length * ctypes.sizeof(c_type))
+
+    return shm, (c_type * length).from_buffer(shm.buf)
+
+
+def shared_array_to_result(arr):
+    if isinstance(arr, np.ndarray):
+        return arr.copy()
+
+    return list(arr)
+
+
 def calculate_min_size(data_size, max_depth):
     cores = 1 << max_depth
 
@@ -99,6 +338,85 @@ def calculate_min_size(data_size, max_depth):
 
     return cutoff
 
+def split_runs(length, parts):
+    chunk_size = length // parts
+    runs = []
+
+    for i in range(parts):
+        left = i * chunk_size
+        right = length - 1 if i == parts - 1 else (i + 1) * chunk_size - 1
+        runs.append((left, right))
+
+    return runs
+
+
+# run positions of the first element >= value / > value
+def position_of_less(arr, run, value):
+    left, right = run
+
+    if isinstance(arr, np.ndarray):
+        return left + int(np.searchsorted(arr[left:right + 1], value, side="left"))
+
+    return bisect.bisect_left(arr, value, left, right + 1)
+
+
+def position_of_less_or_equal(arr, run, value):
+    left, right = run
+
+    if isinstance(arr, np.ndarray):
+        return left + int(np.searchsorted(arr[left:right + 1], value, side="right"))
+
+    return bisect.bisect_right(arr, value, left, right + 1)
+
+
+def count_before(runs, positions):
+    return sum(position - left for (left, _), position in zip(runs, positions))
+
+
+# co-ranking - run positions whose counts sum to rank, equal values are cut by rank too
+# (earlier runs first, so the merge stays stable and duplicate-heavy inputs get even slices)
+def find_rank_bounds(arr, runs, rank):
+    windows = [[left, right + 1] for left, right in runs]
+
+    while True:
+        # pivot from the middle of the widest window - that window at least halves every step
+        low, high = max(windows, key=lambda window: window[1] - window[0])
+        pivot = arr[(low + high) // 2]
+
+        less = [position_of_less(arr, run, pivot) for run in runs]
+        less_or_equal = [position_of_less_or_equal(arr, run, pivot) for run in runs]
+
+        if rank < count_before(runs, less):
+            for window, position in zip(windows, less):
+                window[1] = min(window[1], position)
+        elif rank >= count_before(runs, less_or_equal):
+            for window, position in zip(windows, less_or_equal):
+                window[0] = max(window[0], position)
+        else:
+            break
+
+    positions = []
+    remaining = rank - count_before(runs, less)
+
+    for start, end in zip(less, less_or_equal):
+        taken = min(remaining, end - start)
+        positions.append(start + taken)
+        remaining -= taken
+
+    return positions
+
+
+# bounds[run] = [left, cut_1, ..., cut_parts-1, right + 1] - output slice w is the same size for every w
+def split_runs_by_rank(arr, runs, parts):
+    length = sum(right - left + 1 for left, right in runs)
+    cuts = [find_rank_bounds(arr, runs, length * w // parts) for w in range(1, parts)]
+
+    return [
+        [left] + [positions[i] for positions in cuts] + [right + 1]
+        for i, (left, right) in enumerate(runs)
+    ]
+
+
 def close_shared_memory(shm):
     shm.close()
 
@@ -1,37 +1,72 @@
 import multiprocessing as mp
+import numpy as np
 
-from algorithms.shared_memory.quicksort.utils import partition, create_shared_array, attach_shared_array, destroy_shared_memory, calculate_min_size
-from algorithms.shared_memory.quicksort.sequential import quicksort
+from algorithms.shared_memory.quicksort.utils import (partition, partition_ndarray, partition_three_way,
+                    partition_three_way_ndarray, get_partition_scheme, destroy_shared_memory, calculate_min_size,
+                    get_shared_array_backend, shared_array_to_result, choose_pivots, scatter_to_buckets,
+                    get_ndarray_leaf_variant, sort_three_way_ndarray)
+from algorithms.shared_memory.quicksort.sequential import quicksort, get_quicksort_variant
 
 
-def sort_in_place_on_shared(arr, low, high):
+PARALLEL_MODES = ("recursive", "pool", "multi_pivot")
+POOL_POLL_INTERVAL = 1.0
+
+
+def sort_in_place_on_shared(arr, low, high, partition_scheme="two_way", variant="recursive"):
+    if isinstance(arr, np.ndarray):
+        if partition_scheme == "three_way":
+            sort_three_way_ndarray(arr, low, high)
+        else:
+            arr[low:high + 1].sort(kind="quicksort")
+        return
+
     size = high - low + 1
     local = arr[low:high + 1]
-    quicksort(local, 0, size - 1)
+    quicksort(local, 0, size - 1, partition_scheme, variant)
     arr[low:high + 1] = local
 
 
-def parallel_quicksort_recursive(arr, shm_name, length, dtype, low, high, depth, max_depth, min_size):
+# returns the ranges left to sort after partitioning [low, high]
+def partition_on_shared(arr, low, high, partition_scheme="two_way"):
+    if partition_scheme == "three_way":
+        if isinstance(arr, np.ndarray):
+            lt, gt = partition_three_way_ndarray(arr, low, high)
+        else:
+            local = arr[low:high + 1]
+            lt, gt = partition_three_way(local, 0, high - low)
+            arr[low:high + 1] = local
+            lt += low
+            gt += low
+
+        return [(low, lt - 1), (gt + 1, high)]
+
+    if isinstance(arr, np.ndarray):
+        index = partition_ndarray(arr, low, high)
+    else:
+        size = high - low + 1
+        local = arr[low:high + 1]
+        index = low + partition(local, 0, size - 1)
+        arr[low:high + 1] = local
+
+    return [(low, index - 1), (index, high)]
+
+
+def parallel_quicksort_recursive(arr, shm_name, length, dtype, low, high, depth, max_depth, min_size, backend="ctypes",
+                                 partition_scheme="two_way", variant="recursive"):
     size = high - low + 1
 
     if size <= 1:
         return
 
     if size <= min_size or depth >= max_depth:
-        sort_in_place_on_shared(arr, low, high)
+        sort_in_place_on_shared(arr, low, high, partition_scheme, variant)
         return
 
-    local = arr[low:high + 1]
-    local_index = partition(local, 0, size - 1)
-    arr[low:high + 1] = local
-    index = low + local_index
-
-    left = (low, index - 1)
-    right = (index, high)
+    parts = partition_on_shared(arr, low, high, partition_scheme)
 
     processes = []
 
-    for part in [left, right]:
+    for part in parts:
         p_low, p_high = part
 
         if p_low >= p_high:
@@ -43,18 +78,21 @@ def parallel_quicksort_recursive(arr, shm_name, length, dtype, low, high, depth,
         if part_size > min_size:
             p = mp.Process(
                 target=parallel_quicksort_worker,
-                args=(shm_name, length, dtype, p_low, p_high, depth + 1, max_depth, min_size)
+                args=(shm_name, length, dtype, p_low, p_high, depth + 1, max_depth, min_size, backend, partition_scheme,
+                      variant)
             )
             p.start()
             processes.append(p)
         else:
-            sort_in_place_on_shared(arr, p_low, p_high)
+            sort_in_place_on_shared(arr, p_low, p_high, partition_scheme, variant)
 
     for p in processes:
         p.join()
 
 
-def parallel_quicksort_worker(shm_name, length, dtype, low, high, depth, max_depth, min_size):
+def parallel_quicksort_worker(shm_name, length, dtype, low, high, depth, max_depth, min_size, backend="ctypes",
+                              partition_scheme="two_way", variant="recursive"):
+    _, attach_shared_array = get_shared_array_backend(backend)
     shm, arr = attach_shared_array(shm_name, length, dtype)
 
     try:
@@ -67,7 +105,10 @@ def parallel_quicksort_worker(shm_name, length, dtype, low, high, depth, max_dep
             high,
             depth,
             max_depth,
-            min_size
+            min_size,
+            backend,
+            partition_scheme,
+            variant
         )
 
     finally:
@@ -75,29 +116,221 @@ def parallel_quicksort_worker(shm_name, length, dtype, low, high, depth, max_dep
         shm.close()
 
 
-def parallel_quicksort(data, max_depth):
+# version with persistent worker pool - every worker attaches the segment once
+# and takes (low, high) ranges from a shared task queue
+def push_range_task(task_queue, pending, part):
+    # counted before it is queued, so pending cannot drop to zero while work is still outstanding
+    with pending.get_lock():
+        pending.value += 1
+
+    task_queue.put(part)
+
+
+def finish_range_task(pending, done_event):
+    with pending.get_lock():
+        pending.value -= 1
+
+        if pending.value == 0:
+            done_event.set()
+
+
+def process_range_task(arr, low, high, min_size, task_queue, pending, partition_scheme="two_way", variant="recursive"):
+    while True:
+        size = high - low + 1
+
+        if size <= min_size:
+            sort_in_place_on_shared(arr, low, high, partition_scheme, variant)
+            return
+
+        parts = []
+
+        for p_low, p_high in partition_on_shared(arr, low, high, partition_scheme):
+            if p_low >= p_high:
+                continue
+
+            if p_high - p_low + 1 > min_size:
+                parts.append((p_low, p_high))
+            else:
+                sort_in_place_on_shared(arr, p_low, p_high, partition_scheme, variant)
+
+        if not parts:
+            return
+
+        # the smaller range goes to the queue, the worker keeps the larger one
+        parts.sort(key=lambda part: part[1] - part[0])
+
+        for part in parts[:-1]:
+            push_range_task(task_queue, pending, part)
+
+        low, high = parts[-1]
+
+
+def quicksort_pool_worker(shm_name, length, dtype, task_queue, pending, done_event, min_size, backend="ctypes",
+                          partition_scheme="two_way", variant="recursive"):
+    _, attach_shared_array = get_shared_array_backend(backend)
+    shm, arr = attach_shared_array(shm_name, length, dtype)
+
+    try:
+        while True:
+            task = task_queue.get()
+
+            if task is None:
+                break
+
+            low, high = task
+            process_range_task(arr, low, high, min_size, task_queue, pending, partition_scheme, variant)
+            finish_range_task(pending, done_event)
+
+    finally:
+        del arr
+        shm.close()
+
+
+def parallel_quicksort_pool(arr, shm_name, length, dtype, process_count, min_size, backend="ctypes",
+                            partition_scheme="two_way", variant="recursive"):
+    if length <= min_size:
+        sort_in_place_on_shared(arr, 0, length - 1, partition_scheme, variant)
+        return
+
+    task_queue = mp.Queue()
+    pending = mp.Value("q", 0)
+    done_event = mp.Event()
+
+    workers = [
+        mp.Process(
+            target=quicksort_pool_worker,
+            args=(shm_name, length, dtype, task_queue, pending, done_event, min_size, backend, partition_scheme, variant)
+        )
+        for _ in range(process_count)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    try:
+        push_range_task(task_queue, pending, (0, length - 1))
+
+        while not done_event.wait(POOL_POLL_INTERVAL):
+            if not all(worker.is_alive() for worker in workers):
+                raise RuntimeError("Proces roboczy quicksort zakończył się nieoczekiwanie")
+
+    finally:
+        # one sentinel per worker - any live worker may take any sentinel
+        for _ in workers:
+            task_queue.put(None)
+
+        for worker in workers:
+            worker.join()
+# end
+
+
+# version with sample-based multi-pivot split - process_count - 1 splitters, one scatter pass
+# into process_count buckets, every bucket sorted by its own process (any process_count)
+def bucket_range_worker(shm_name, length, dtype, low, high, backend="ctypes", partition_scheme="two_way",
+                        variant="recursive"):
+    _, attach_shared_array = get_shared_array_backend(backend)
+    shm, arr = attach_shared_array(shm_name, length, dtype)
+
+    try:
+        sort_in_place_on_shared(arr, low, high, partition_scheme, variant)
+    finally:
+        del arr
+        shm.close()
+
+
+def parallel_quicksort_multi_pivot(arr, shm_name, length, dtype, process_count, min_size, backend="ctypes",
+                                   partition_scheme="two_way", variant="recursive"):
+    if length <= min_size or process_count < 2:
+        sort_in_place_on_shared(arr, 0, length - 1, partition_scheme, variant)
+        return
+
+    pivots = choose_pivots(arr, process_count)
+    bounds = scatter_to_buckets(arr, pivots)
+
+    processes = [
+        mp.Process(
+            target=bucket_range_worker,
+            args=(shm_name, length, dtype, low, high, backend, partition_scheme, variant)
+        )
+        for low, high in bounds
+        if low < high
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    for process in processes:
+        if process.exitcode != 0:
+            raise RuntimeError(f"Proces roboczy quicksort zakończył się kodem {process.exitcode}")
+# end
+
+
+def parallel_quicksort(data, max_depth, mode="recursive", backend="ctypes", partition_scheme="two_way",
+                       variant="recursive", process_count=None):
     if len(data) <= 1:
         return data
 
+    if mode not in PARALLEL_MODES:
+        raise ValueError(f"Nieznany tryb quicksort: {mode}")
+
+    get_partition_scheme(partition_scheme)
+    get_quicksort_variant(variant)
+    get_ndarray_leaf_variant(backend, variant)
+
     dtype = type(data[0])
+    create_shared_array, _ = get_shared_array_backend(backend)
+
+    if process_count is None:
+        process_count = 1 << max_depth
 
     min_size = calculate_min_size(len(data), max_depth)
     shm, arr = create_shared_array(data, dtype)
 
     try:
-        parallel_quicksort_recursive(
-            arr,
-            shm.name,
-            len(arr),
-            dtype,
-            0,
-            len(arr)-1,
-            0,
-            max_depth,
-            min_size
-        )
+        if mode == "multi_pivot":
+            parallel_quicksort_multi_pivot(
+                arr,
+                shm.name,
+                len(arr),
+                dtype,
+                process_count,
+                min_size,
+                backend,
+                partition_scheme,
+                variant
+            )
+        elif mode == "pool":
+            parallel_quicksort_pool(
+                arr,
+                shm.name,
+                len(arr),
+                dtype,
+                process_count,
+                min_size,
+                backend,
+                partition_scheme,
+                variant
+            )
+        else:
+            parallel_quicksort_recursive(
+                arr,
+                shm.name,
+                len(arr),
+                dtype,
+                0,
+                len(arr)-1,
+                0,
+                max_depth,
+                min_size,
+                backend,
+                partition_scheme,
+                variant
+            )
 
-        return list(arr)
+        return shared_array_to_result(arr)
 
     finally:
         del arr
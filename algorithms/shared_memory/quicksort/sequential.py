@@ -1,14 +1,81 @@
-from algorithms.shared_memory.quicksort.utils import partition
+import math
 
+from algorithms.shared_memory.quicksort.utils import (partition, partition_three_way, get_partition_scheme, insertion_sort,
+                    heapsort, select_pivot_index, INTROSORT_INSERTION_THRESHOLD)
+
+
+def quicksort(arr, low=0, high=None, partition_scheme="two_way", variant="recursive"):
+    if variant != "recursive":
+        return get_quicksort_variant(variant)(arr, low, high, partition_scheme)
 
-def quicksort(arr, low=0, high=None):
     if high is None:
         high = len(arr) - 1
+        get_partition_scheme(partition_scheme)
 
     if low >= high:
         return
 
+    if partition_scheme == "three_way":
+        lt, gt = partition_three_way(arr, low, high)
+
+        quicksort(arr, low, lt - 1, partition_scheme)
+        quicksort(arr, gt + 1, high, partition_scheme)
+        return
+
     index = partition(arr, low, high)
 
     quicksort(arr, low, index - 1)
-    quicksort(arr, index, high)
\ No newline at end of file
+    quicksort(arr, index, high)
+
+
+# version with explicit stack, ninther pivot and heapsort once depth passes 2 * log2(n)
+def introsort(arr, low=0, high=None, partition_scheme="two_way"):
+    if high is None:
+        high = len(arr) - 1
+        get_partition_scheme(partition_scheme)
+
+    if low >= high:
+        return
+
+    stack = [(low, high, 2 * int(math.log2(high - low + 1)))]
+
+    while stack:
+        low, high, depth = stack.pop()
+
+        while high - low + 1 > INTROSORT_INSERTION_THRESHOLD and depth > 0:
+            depth -= 1
+
+            # partition() and partition_three_way() take the middle element as pivot
+            mid = (low + high) // 2
+            pivot_index = select_pivot_index(arr, low, high)
+            arr[mid], arr[pivot_index] = arr[pivot_index], arr[mid]
+
+            if partition_scheme == "three_way":
+                lt, gt = partition_three_way(arr, low, high)
+                parts = [(low, lt - 1), (gt + 1, high)]
+            else:
+                index = partition(arr, low, high)
+                parts = [(low, index - 1), (index, high)]
+
+            # the larger range waits on the stack, the smaller one is sorted next - stack stays O(log n)
+            parts.sort(key=lambda part: part[1] - part[0])
+            stack.append((*parts[1], depth))
+            low, high = parts[0]
+
+        if high - low + 1 <= INTROSORT_INSERTION_THRESHOLD:
+            insertion_sort(arr, low, high)
+        else:
+            heapsort(arr, low, high)
+
+
+QUICKSORT_VARIANTS = {
+    "recursive": quicksort,
+    "introsort": introsort,
+}
+
+
+def get_quicksort_variant(variant):
+    if variant not in QUICKSORT_VARIANTS:
+        raise ValueError(f"Nieznany wariant quicksort: {variant}")
+
+    return QUICKSORT_VARIANTS[variant]
@@ -1,6 +1,11 @@
+import bisect
 import ctypes
+import random
+import numpy as np
 from multiprocessing import shared_memory
 
+from algorithms.cutoffs import get_calibrated_cutoff
+
 
 # {cores: próg_min_size}
 PARALLEL_CUTOFF = {
@@ -23,8 +28,29 @@ PARALLEL_CUTOFF = {
 
 
 def get_parallel_cutoff(cores):
+    calibrated = get_calibrated_cutoff("quicksort", "parallel_cutoff", cores)
+
+    if calibrated is not None:
+        return calibrated
+
     return PARALLEL_CUTOFF.get(cores)
 
+PARTITION_SCHEMES = ("two_way", "three_way")
+
+# numpy backend - leaf ranges are sorted by ndarray.sort, only the default variant applies to them
+NDARRAY_LEAF_VARIANTS = ("recursive",)
+# numpy backend, three_way: leaf ranges are partitioned down to this size before ndarray.sort
+NDARRAY_THREE_WAY_CUTOFF = 4096
+
+# multi_pivot: random sample size per bucket used to choose the splitters
+MULTI_PIVOT_OVERSAMPLING = 32
+
+# introsort: ranges up to this size go to insertion sort
+INTROSORT_INSERTION_THRESHOLD = 16
+# introsort: ranges above this size take the ninther instead of the median of three
+NINTHER_THRESHOLD = 128
+
+
 def partition(arr, low, high):
     pivot = arr[(low + high) // 2]
 
@@ -44,6 +70,166 @@ def partition(arr, low, high):
     return i
 
 
+# vectorized partition of an np.ndarray range, same contract as partition():
+# [low, index - 1] <= pivot <= [index, high]
+def partition_ndarray(arr, low, high):
+    segment = arr[low:high + 1]
+    pivot = segment[(high - low) // 2]
+
+    less = segment[segment < pivot]
+    equal = segment[segment == pivot]
+    greater = segment[segment > pivot]
+
+    segment[:len(less)] = less
+    segment[len(less):len(less) + len(equal)] = equal
+    segment[len(less) + len(equal):] = greater
+
+    index = low + len(less) + len(equal) // 2
+
+    return max(index, low + 1)
+
+
+# version with Dutch flag partition: [low, lt - 1] < pivot == [lt, gt] < [gt + 1, high]
+# the block equal to the pivot is left out of the recursion
+def partition_three_way(arr, low, high):
+    pivot = arr[(low + high) // 2]
+
+    lt = low
+    i = low
+    gt = high
+
+    while i <= gt:
+        if arr[i] < pivot:
+            arr[lt], arr[i] = arr[i], arr[lt]
+            lt += 1
+            i += 1
+        elif arr[i] > pivot:
+            arr[i], arr[gt] = arr[gt], arr[i]
+            gt -= 1
+        else:
+            i += 1
+
+    return lt, gt
+
+
+def partition_three_way_ndarray(arr, low, high):
+    segment = arr[low:high + 1]
+    pivot = segment[(high - low) // 2]
+
+    less = segment[segment < pivot]
+    equal = segment[segment == pivot]
+    greater = segment[segment > pivot]
+
+    segment[:len(less)] = less
+    segment[len(less):len(less) + len(equal)] = equal
+    segment[len(less) + len(equal):] = greater
+
+    return low + len(less), low + len(less) + len(equal) - 1
+
+
+def insertion_sort(arr, low, high):
+    for i in range(low + 1, high + 1):
+        value = arr[i]
+        j = i - 1
+
+        while j >= low and arr[j] > value:
+            arr[j + 1] = arr[j]
+            j -= 1
+
+        arr[j + 1] = value
+
+
+def median_of_three(arr, a, b, c):
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+
+# median of three for small ranges, Tukey's ninther for large ones
+def select_pivot_index(arr, low, high):
+    mid = (low + high) // 2
+    size = high - low + 1
+
+    if size <= NINTHER_THRESHOLD:
+        return median_of_three(arr, low, mid, high)
+
+    step = size // 8
+
+    return median_of_three(
+        arr,
+        median_of_three(arr, low, low + step, low + 2 * step),
+        median_of_three(arr, mid - step, mid, mid + step),
+        median_of_three(arr, high - 2 * step, high - step, high),
+    )
+
+
+def sift_down(arr, low, root, end):
+    value = arr[low + root]
+
+    while True:
+        child = 2 * root + 1
+
+        if child >= end:
+            break
+
+        if child + 1 < end and arr[low + child] < arr[low + child + 1]:
+            child += 1
+
+        if not value < arr[low + child]:
+            break
+
+        arr[low + root] = arr[low + child]
+        root = child
+
+    arr[low + root] = value
+
+
+def heapsort(arr, low, high):
+    size = high - low + 1
+
+    for root in range(size // 2 - 1, -1, -1):
+        sift_down(arr, low, root, size)
+
+    for end in range(size - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        sift_down(arr, low, 0, end)
+
+
+def get_ndarray_leaf_variant(backend, variant):
+    if backend == "numpy" and variant not in NDARRAY_LEAF_VARIANTS:
+        raise ValueError(f"Wariant quicksort {variant} nie jest obsługiwany z backendem numpy")
+
+    return variant
+
+
+# the equal block of every partition is left out, like the list version of three_way
+def sort_three_way_ndarray(arr, low, high):
+    stack = [(low, high)]
+
+    while stack:
+        low, high = stack.pop()
+
+        if high - low + 1 <= NDARRAY_THREE_WAY_CUTOFF:
+            arr[low:high + 1].sort(kind="quicksort")
+            continue
+
+        lt, gt = partition_three_way_ndarray(arr, low, high)
+        stack.append((low, lt - 1))
+        stack.append((gt + 1, high))
+
+
+def get_partition_scheme(partition_scheme):
+    if partition_scheme not in PARTITION_SCHEMES:
+        raise ValueError(f"Nieznany schemat podziału quicksort: {partition_scheme}")
+
+    return partition_scheme
+
+
 def get_ctype(dtype):
     if dtype is int:
         return ctypes.c_longlong
@@ -76,6 +262,59 @@ def attach_shared_array(name, length, dtype):
     return shm, shared_array
 
 
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def create_shared_ndarray(data, dtype):
+    np_dtype = np.dtype(get_np_dtype(dtype))
+
+    shm = shared_memory.SharedMemory(
+        create=True,
+        size=len(data) * np_dtype.itemsize
+    )
+
+    shared_array = np.ndarray((len(data),), dtype=np_dtype, buffer=shm.buf)
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_ndarray(name, length, dtype):
+    np_dtype = get_np_dtype(dtype)
+
+    shm = shared_memory.SharedMemory(name=name)
+    shared_array = np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    return shm, shared_array
+
+
+# "ctypes" - the segment is a ctypes array, "numpy" - zero-copy np.ndarray view over the segment
+SHARED_ARRAY_BACKENDS = {
+    "ctypes": (create_shared_array, attach_shared_array),
+    "numpy": (create_shared_ndarray, attach_shared_ndarray),
+}
+
+
+def get_shared_array_backend(backend):
+    if backend not in SHARED_ARRAY_BACKENDS:
+        raise ValueError(f"Nieznany backend pamięci współdzielonej: {backend}")
+
+    return SHARED_ARRAY_BACKENDS[backend]
+
+
+def shared_array_to_result(arr):
+    if isinstance(arr, np.ndarray):
+        return arr.copy()
+
+    return list(arr)
+
+
 def calculate_min_size(data_size, max_depth):
     cores = 1 << max_depth
 
@@ -87,6 +326,54 @@ def calculate_min_size(data_size, max_depth):
 
     return cutoff
 
+
+# parts - 1 splitters taken at regular positions of a sorted random sample
+def choose_pivots(arr, parts, oversampling=MULTI_PIVOT_OVERSAMPLING):
+    length = len(arr)
+    sample_size = min(length, parts * oversampling)
+    sample = sorted(arr[i] for i in random.sample(range(length), sample_size))
+
+    return [sample[(i * sample_size) // parts] for i in range(1, parts)]
+
+
+# one-pass scatter of the whole array into len(pivots) + 1 buckets,
+# returns the (low, high) range of every bucket
+def scatter_to_buckets(arr, pivots):
+    if isinstance(arr, np.ndarray):
+        bucket_ids = np.searchsorted(np.asarray(pivots, dtype=arr.dtype), arr, side="right")
+        counts = np.bincount(bucket_ids, minlength=len(pivots) + 1).tolist()
+        arr[:] = arr[np.argsort(bucket_ids, kind="stable")]
+    else:
+        local = arr[:]
+        bucket_ids = [bisect.bisect_right(pivots, value) for value in local]
+
+        counts = [0] * (len(pivots) + 1)
+        for bucket_id in bucket_ids:
+            counts[bucket_id] += 1
+
+        positions = []
+        start = 0
+        for count in counts:
+            positions.append(start)
+            start += count
+
+        result = [None] * len(local)
+        for value, bucket_id in zip(local, bucket_ids):
+            result[positions[bucket_id]] = value
+            positions[bucket_id] += 1
+
+        arr[:] = result
+
+    bounds = []
+    start = 0
+
+    for count in counts:
+        bounds.append((start, start + count - 1))
+        start += count
+
+    return bounds
+
+
 def close_shared_memory(shm):
     shm.close()
 
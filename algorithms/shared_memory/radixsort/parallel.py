@@ -0,0 +1,191 @@
+import multiprocessing as mp
+import numpy as np
+
+from algorithms.shared_memory.radixsort.utils import (to_key, from_key, to_keys_ndarray, from_keys_ndarray,
+                    get_digits_ndarray, get_digit_bits, get_digit_shifts, get_shared_array_backend, shared_array_to_result,
+                    create_shared_segment, attach_shared_buffer, destroy_shared_memory, split_ranges, should_run_parallel,
+                    KEY_CTYPE, KEY_NP_DTYPE, COUNT_CTYPE, COUNT_NP_DTYPE)
+from algorithms.shared_memory.radixsort.sequential import radix_sort
+
+
+WORKER_POLL_INTERVAL = 1.0
+
+
+def write_keys(data, keys, start, end, dtype):
+    if isinstance(data, np.ndarray):
+        keys[start:end] = to_keys_ndarray(data[start:end])
+    else:
+        keys[start:end] = [to_key(value, dtype) for value in data[start:end]]
+
+
+def write_values(keys, data, start, end, dtype):
+    if isinstance(data, np.ndarray):
+        data[start:end] = from_keys_ndarray(keys[start:end], data.dtype)
+    else:
+        data[start:end] = [from_key(key, dtype) for key in keys[start:end]]
+
+
+def count_digits(src, start, end, shift, digit_bits):
+    if isinstance(src, np.ndarray):
+        return np.bincount(get_digits_ndarray(src[start:end], shift, digit_bits), minlength=1 << digit_bits)
+
+    mask = (1 << digit_bits) - 1
+    counts = [0] * (1 << digit_bits)
+
+    for key in src[start:end]:
+        counts[(key >> shift) & mask] += 1
+
+    return counts
+
+
+# global prefix sum over all histograms - where this worker writes its first key of every digit
+# None when the whole array has one digit value and the pass can be skipped
+def calculate_offsets(histograms, worker_index, process_count, radix, length):
+    if isinstance(histograms, np.ndarray):
+        table = histograms.reshape(process_count, radix)
+        totals = table.sum(axis=0)
+
+        if totals.max() == length:
+            return None
+
+        return np.cumsum(totals) - totals + table[:worker_index].sum(axis=0)
+
+    table = histograms[:]
+    totals = [sum(table[p * radix + digit] for p in range(process_count)) for digit in range(radix)]
+
+    if max(totals) == length:
+        return None
+
+    offsets = []
+    total = 0
+
+    for digit in range(radix):
+        offsets.append(total + sum(table[p * radix + digit] for p in range(worker_index)))
+        total += totals[digit]
+
+    return offsets
+
+
+def scatter_keys(src, dst, start, end, shift, digit_bits, offsets):
+    if isinstance(src, np.ndarray):
+        chunk = src[start:end]
+        digits = get_digits_ndarray(chunk, shift, digit_bits)
+        order = np.argsort(digits, kind="stable")
+        sorted_digits = digits[order]
+
+        local_counts = np.bincount(sorted_digits, minlength=1 << digit_bits)
+        local_starts = np.cumsum(local_counts) - local_counts
+        positions = offsets[sorted_digits] + np.arange(len(chunk)) - local_starts[sorted_digits]
+
+        dst[positions] = chunk[order]
+        return
+
+    mask = (1 << digit_bits) - 1
+
+    for key in src[start:end]:
+        digit = (key >> shift) & mask
+        dst[offsets[digit]] = key
+        offsets[digit] += 1
+
+
+# every worker owns one chunk; per digit: histogram -> barrier -> prefix sum + scatter -> barrier
+def radix_worker(data_name, keys_names, hist_name, length, dtype, worker_index, process_count, digit_bits, barrier,
+                 backend="ctypes"):
+    _, attach_shared_array = get_shared_array_backend(backend)
+    radix = 1 << digit_bits
+
+    data_shm, data = attach_shared_array(data_name, length, dtype)
+    src_shm, src = attach_shared_buffer(keys_names[0], length, KEY_CTYPE, KEY_NP_DTYPE, backend)
+    dst_shm, dst = attach_shared_buffer(keys_names[1], length, KEY_CTYPE, KEY_NP_DTYPE, backend)
+    hist_shm, histograms = attach_shared_buffer(hist_name, process_count * radix, COUNT_CTYPE, COUNT_NP_DTYPE, backend)
+
+    try:
+        start, end = split_ranges(length, process_count)[worker_index]
+        write_keys(data, src, start, end, dtype)
+
+        for shift in get_digit_shifts(digit_bits):
+            histograms[worker_index * radix:(worker_index + 1) * radix] = count_digits(src, start, end, shift, digit_bits)
+            barrier.wait()
+
+            offsets = calculate_offsets(histograms, worker_index, process_count, radix, length)
+
+            if offsets is not None:
+                scatter_keys(src, dst, start, end, shift, digit_bits, offsets)
+
+            # histograms are read and dst is complete before anybody starts the next digit
+            barrier.wait()
+
+            if offsets is not None:
+                src, dst = dst, src
+
+        write_values(src, data, start, end, dtype)
+
+    finally:
+        del data, src, dst, histograms
+        data_shm.close()
+        src_shm.close()
+        dst_shm.close()
+        hist_shm.close()
+
+
+def run_radix_workers(processes, barrier):
+    for process in processes:
+        process.start()
+
+    try:
+        while True:
+            for process in processes:
+                process.join(WORKER_POLL_INTERVAL)
+
+                # a dead worker would leave the others waiting on the barrier forever
+                if process.exitcode not in (None, 0):
+                    barrier.abort()
+                    raise RuntimeError(f"Proces roboczy radix sort zakończył się kodem {process.exitcode}")
+
+            if not any(process.is_alive() for process in processes):
+                break
+    finally:
+        for process in processes:
+            process.join()
+
+
+def parallel_radix_sort(data, process_count, digit_bits=8, backend="ctypes"):
+    if len(data) <= 1:
+        return data
+
+    get_digit_bits(digit_bits)
+
+    if not should_run_parallel(len(data), process_count):
+        return radix_sort(list(data), digit_bits)
+
+    dtype = type(data[0])
+    length = len(data)
+    create_shared_array, _ = get_shared_array_backend(backend)
+
+    shm, arr = create_shared_array(data, dtype)
+    keys_shms = [create_shared_segment(length, KEY_CTYPE) for _ in range(2)]
+    hist_shm = create_shared_segment(process_count * (1 << digit_bits), COUNT_CTYPE)
+
+    try:
+        barrier = mp.Barrier(process_count)
+
+        processes = [
+            mp.Process(
+                target=radix_worker,
+                args=(shm.name, [keys_shm.name for keys_shm in keys_shms], hist_shm.name, length, dtype, worker_index,
+                      process_count, digit_bits, barrier, backend)
+            )
+            for worker_index in range(process_count)
+        ]
+
+        run_radix_workers(processes, barrier)
+
+        return shared_array_to_result(arr)
+
+    finally:
+        del arr
+        destroy_shared_memory(shm)
+        destroy_shared_memory(hist_shm)
+
+        for keys_shm in keys_shms:
+            destroy_shared_memory(keys_shm)
@@ -0,0 +1,64 @@
+import numpy as np
+
+from algorithms.shared_memory.radixsort.utils import (to_key, from_key, to_keys_ndarray, from_keys_ndarray,
+                    get_digits_ndarray, get_digit_bits, get_digit_shifts)
+
+
+# LSD radix sort - one stable counting pass per digit, lowest digit first
+def radix_sort(arr, digit_bits=8):
+    get_digit_bits(digit_bits)
+
+    if len(arr) <= 1:
+        return arr
+
+    if isinstance(arr, np.ndarray):
+        radix_sort_ndarray(arr, digit_bits)
+        return arr
+
+    dtype = type(arr[0])
+    keys = [to_key(value, dtype) for value in arr]
+    radix = 1 << digit_bits
+    mask = radix - 1
+
+    for shift in get_digit_shifts(digit_bits):
+        counts = [0] * radix
+
+        for key in keys:
+            counts[(key >> shift) & mask] += 1
+
+        # every key has the same digit - the pass would not move anything
+        if max(counts) == len(keys):
+            continue
+
+        positions = []
+        total = 0
+
+        for count in counts:
+            positions.append(total)
+            total += count
+
+        result = [0] * len(keys)
+
+        for key in keys:
+            digit = (key >> shift) & mask
+            result[positions[digit]] = key
+            positions[digit] += 1
+
+        keys = result
+
+    return [from_key(key, dtype) for key in keys]
+
+
+# version with NumPy - sorts the array in place
+def radix_sort_ndarray(arr, digit_bits=16):
+    keys = to_keys_ndarray(arr)
+
+    for shift in get_digit_shifts(digit_bits):
+        digits = get_digits_ndarray(keys, shift, digit_bits)
+
+        if digits.min() == digits.max():
+            continue
+
+        keys = keys[np.argsort(digits, kind="stable")]
+
+    arr[:] = from_keys_ndarray(keys, arr.dtype)
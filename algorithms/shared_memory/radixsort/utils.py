@@ -0,0 +1,228 @@
+import ctypes
+import struct
+import numpy as np
+from multiprocessing import shared_memory
+
+from algorithms.cutoffs import get_calibrated_cutoff
+
+
+MIN_SIZE_FOR_PARALLEL = 5000
+
+# {cores: próg}
+PARALLEL_SIZE_CUTOFF = {
+    2: 100_000,
+    4: 100_000,
+    8: 200_000,
+    16: 200_000,
+    32: 400_000,
+    64: 400_000,
+    128: 800_000,
+}
+
+DIGIT_BITS = (8, 11, 16)
+KEY_BITS = 64
+
+SIGN_BIT = 1 << 63
+KEY_MASK = (1 << 64) - 1
+
+KEY_CTYPE = ctypes.c_uint64
+KEY_NP_DTYPE = np.uint64
+COUNT_CTYPE = ctypes.c_longlong
+COUNT_NP_DTYPE = np.int64
+
+
+def get_parallel_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("radixsort", "parallel_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
+    cutoff = PARALLEL_SIZE_CUTOFF.get(process_count)
+
+    if cutoff is None:
+        return MIN_SIZE_FOR_PARALLEL
+
+    return cutoff
+
+
+def should_run_parallel(data_size, process_count):
+    return process_count > 1 and data_size > get_parallel_size_cutoff(process_count)
+
+
+def get_digit_bits(digit_bits):
+    if digit_bits not in DIGIT_BITS:
+        raise ValueError(f"Nieobsługiwana szerokość cyfry radix: {digit_bits}")
+
+    return digit_bits
+
+
+def get_digit_shifts(digit_bits):
+    return list(range(0, KEY_BITS, digit_bits))
+
+
+# int64 / float64 <-> uint64 key with the same order
+# float: negative numbers get all bits flipped, positive ones only the sign bit
+def to_key(value, dtype):
+    if dtype is float:
+        bits = struct.unpack("<Q", struct.pack("<d", value))[0]
+
+        if bits & SIGN_BIT:
+            return bits ^ KEY_MASK
+
+        return bits | SIGN_BIT
+
+    return (value + SIGN_BIT) & KEY_MASK
+
+
+def from_key(key, dtype):
+    if dtype is float:
+        if key & SIGN_BIT:
+            bits = key ^ SIGN_BIT
+        else:
+            bits = key ^ KEY_MASK
+
+        return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+    return key - SIGN_BIT
+
+
+def to_keys_ndarray(arr):
+    bits = arr.view(np.uint64)
+
+    if arr.dtype.kind == "f":
+        return np.where(bits & np.uint64(SIGN_BIT), ~bits, bits | np.uint64(SIGN_BIT))
+
+    return bits ^ np.uint64(SIGN_BIT)
+
+
+def from_keys_ndarray(keys, np_dtype):
+    sign = np.uint64(SIGN_BIT)
+
+    if np.dtype(np_dtype).kind == "f":
+        bits = np.where(keys & sign, keys ^ sign, ~keys)
+    else:
+        bits = keys ^ sign
+
+    return bits.view(np_dtype)
+
+
+# numpy argsorts uint8 / uint16 with kind="stable" by a radix (counting) pass - int64 digits would go to timsort
+def get_digit_dtype(digit_bits):
+    return np.uint8 if digit_bits <= 8 else np.uint16
+
+
+def get_digits_ndarray(keys, shift, digit_bits):
+    mask = np.uint64((1 << digit_bits) - 1)
+
+    return ((keys >> np.uint64(shift)) & mask).astype(get_digit_dtype(digit_bits))
+
+
+def get_ctype(dtype):
+    if dtype is int:
+        return ctypes.c_longlong
+    elif dtype is float:
+        return ctypes.c_double
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def create_shared_array(data, dtype):
+    shm, shared_array = allocate_shared_buffer(len(data), get_ctype(dtype), get_np_dtype(dtype))
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_array(name, length, dtype):
+    return attach_shared_buffer(name, length, get_ctype(dtype), get_np_dtype(dtype))
+
+
+def create_shared_ndarray(data, dtype):
+    shm, shared_array = allocate_shared_buffer(len(data), get_ctype(dtype), get_np_dtype(dtype), "numpy")
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_ndarray(name, length, dtype):
+    return attach_shared_buffer(name, length, get_ctype(dtype), get_np_dtype(dtype), "numpy")
+
+
+# "ctypes" - the segment is a ctypes array, "numpy" - zero-copy np.ndarray view over the segment
+SHARED_ARRAY_BACKENDS = {
+    "ctypes": (create_shared_array, attach_shared_array),
+    "numpy": (create_shared_ndarray, attach_shared_ndarray),
+}
+
+
+def get_shared_array_backend(backend):
+    if backend not in SHARED_ARRAY_BACKENDS:
+        raise ValueError(f"Nieznany backend pamięci współdzielonej: {backend}")
+
+    return SHARED_ARRAY_BACKENDS[backend]
+
+
+def view_shared_buffer(shm, length, c_type, np_dtype, backend="ctypes"):
+    if backend == "numpy":
+        return np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    return (c_type * length).from_buffer(shm.buf)
+
+
+# empty segment for keys and histograms
+def create_shared_segment(length, c_type):
+    return shared_memory.SharedMemory(
+        create=True,
+        size=max(1, length * ctypes.sizeof(c_type))
+    )
+
+
+def allocate_shared_buffer(length, c_type, np_dtype, backend="ctypes"):
+    shm = create_shared_segment(length, c_type)
+
+    return shm, view_shared_buffer(shm, length, c_type, np_dtype, backend)
+
+
+def attach_shared_buffer(name, length, c_type, np_dtype, backend="ctypes"):
+    shm = shared_memory.SharedMemory(name=name)
+
+    return shm, view_shared_buffer(shm, length, c_type, np_dtype, backend)
+
+
+def shared_array_to_result(arr):
+    if isinstance(arr, np.ndarray):
+        return arr.copy()
+
+    return list(arr)
+
+
+# equal chunks, the first length % parts chunks are one element longer
+def split_ranges(length, parts):
+    base, extra = divmod(length, parts)
+    ranges = []
+    start = 0
+
+    for i in range(parts):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def close_shared_memory(shm):
+    shm.close()
+
+
+def destroy_shared_memory(shm):
+    shm.close()
+    shm.unlink()
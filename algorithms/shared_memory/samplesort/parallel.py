@@ -1,25 +1,44 @@
 import multiprocessing as mp
-
-from .utils import (attach_shared_array, create_shared_array, destroy_shared_memory, split_ranges, select_samples, choose_pivots,
-                    distribute_to_buckets, flatten_buckets, split_bucket_ranges, sort_bucket, should_run_parallel, get_group_size_cutoff)
+import numpy as np
+from multiprocessing import shared_memory
+
+from .utils import (destroy_shared_memory, split_ranges, select_samples, choose_pivots, distribute_to_buckets, flatten_buckets,
+                    split_bucket_ranges, sort_bucket, should_run_parallel, get_group_size_cutoff, get_shared_array_backend,
+                    merge_sorted_runs, merge_sorted_runs_ndarray, get_exchange_mode, get_oversampling, DEFAULT_OVERSAMPLING, create_shared_ndarray, create_shared_segment, view_shared_segment,
+                    shared_array_to_result)
+from algorithms.leaf_sort import get_leaf_sort_backend, NDARRAY_LEAF_BACKEND
+from algorithms.metrics import record_metric, record_bucket_imbalance
 from .sequential import sample_sort
 
 
-def local_sort_worker(shm_name, length, dtype, start, end):
+WORKER_POLL_INTERVAL = 1.0
+
+
+def local_sort_worker(shm_name, length, dtype, start, end, backend="ctypes", variant="recursive", leaf_backend=None):
+    _, attach_shared_array = get_shared_array_backend(backend)
     shm, arr = attach_shared_array(shm_name, length, dtype)
     try:
-        local = list(arr[start:end])
-        local = sort_bucket(local)
-        arr[start:end] = local
+        if isinstance(arr, np.ndarray):
+            sort_bucket(arr[start:end], variant, leaf_backend or NDARRAY_LEAF_BACKEND)
+        else:
+            local = list(arr[start:end])
+            local = sort_bucket(local, variant, leaf_backend)
+            arr[start:end] = local
     finally:
         del arr
         shm.close()
 
 
-def sort_group(arr, bucket_ranges):
+def sort_group(arr, bucket_ranges, variant="recursive", leaf_backend=None):
     if not bucket_ranges:
         return
 
+    if isinstance(arr, np.ndarray):
+        for start, end in bucket_ranges:
+            if start < end:
+                sort_bucket(arr[start:end + 1], variant, leaf_backend or NDARRAY_LEAF_BACKEND)
+        return
+
     group_start = bucket_ranges[0][0]
     group_end = bucket_ranges[-1][1]
     local = list(arr[group_start:group_end + 1])
@@ -29,31 +48,190 @@ def sort_group(arr, bucket_ranges):
             continue
         rel_start = start - group_start
         rel_end = end - group_start
-        local[rel_start:rel_end + 1] = sort_bucket(local[rel_start:rel_end + 1])
+        local[rel_start:rel_end + 1] = sort_bucket(local[rel_start:rel_end + 1], variant, leaf_backend)
 
     arr[group_start:group_end + 1] = local
 
 
-def bucket_worker(shm_name, length, dtype, bucket_ranges):
+def bucket_worker(shm_name, length, dtype, bucket_ranges, backend="ctypes", variant="recursive", leaf_backend=None):
     if not bucket_ranges:
         return
 
+    _, attach_shared_array = get_shared_array_backend(backend)
     shm, arr = attach_shared_array(shm_name, length, dtype)
     try:
-        sort_group(arr, bucket_ranges)
+        sort_group(arr, bucket_ranges, variant, leaf_backend)
     finally:
         del arr
         shm.close()
 
 
-def parallel_sample_sort(data, process_count):
+# values is an np.ndarray view over a segment; the ctypes backend keeps sorting on lists
+def sort_segment(values, backend="ctypes", variant="recursive", leaf_backend=None):
+    if len(values) <= 1:
+        return
+
+    if backend == "numpy":
+        sort_bucket(values, variant, leaf_backend or NDARRAY_LEAF_BACKEND)
+    else:
+        values[:] = sort_bucket(values.tolist(), variant, leaf_backend)
+
+
+# bucket made of sorted runs with the given lengths, merged in place
+def merge_segment(values, run_lengths, backend="ctypes"):
+    if len(values) <= 1:
+        return
+
+    if backend == "numpy":
+        merge_sorted_runs_ndarray(values)
+        return
+
+    bounds = np.concatenate(([0], np.cumsum(run_lengths)))
+    local = values.tolist()
+    values[:] = merge_sorted_runs([local[bounds[i]:bounds[i + 1]] for i in range(len(run_lengths))])
+
+
+# version with PSRS inside shared memory - every worker owns one chunk of the input
+# local sort + samples -> barrier -> pivots + split counts -> barrier -> copy to the exchange buffer -> barrier -> merge one bucket
+# the sample and count tables have process_count^2 entries, so every worker computes pivots and offsets by itself
+def psrs_worker(input_name, output_name, samples_name, counts_name, length, dtype, worker_index, process_count, barrier,
+                sample_count, backend="ctypes", variant="recursive", leaf_backend=None):
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    samples_shm = shared_memory.SharedMemory(name=samples_name)
+    counts_shm = shared_memory.SharedMemory(name=counts_name)
+
+    values = view_shared_segment(input_shm, length, dtype)
+    output = view_shared_segment(output_shm, length, dtype)
+    samples = view_shared_segment(samples_shm, process_count * sample_count, dtype)
+    counts = view_shared_segment(counts_shm, process_count * process_count, int).reshape(process_count, process_count)
+    chunk = None
+
+    try:
+        start, end = split_ranges(length, process_count)[worker_index]
+        chunk = values[start:end]
+
+        sort_segment(chunk, backend, variant, leaf_backend)
+        samples[worker_index * sample_count:(worker_index + 1) * sample_count] = select_samples(chunk, sample_count)
+        barrier.wait()
+
+        pivots = np.asarray(choose_pivots(samples.tolist(), process_count), dtype=chunk.dtype)
+        bounds = np.concatenate(([0], np.searchsorted(chunk, pivots, side="right"), [len(chunk)]))
+        counts[worker_index] = 0
+        counts[worker_index, :len(pivots) + 1] = np.diff(bounds)
+        barrier.wait()
+
+        totals = counts.sum(axis=0)
+        bucket_starts = np.cumsum(totals) - totals
+        offsets = bucket_starts + counts[:worker_index].sum(axis=0)
+
+        for bucket in range(len(pivots) + 1):
+            output[offsets[bucket]:offsets[bucket] + bounds[bucket + 1] - bounds[bucket]] = chunk[bounds[bucket]:bounds[bucket + 1]]
+
+        # the exchange is complete before anybody sorts a bucket
+        barrier.wait()
+
+        # bucket w holds one sorted run from every worker
+        if worker_index <= len(pivots):
+            bucket_start = bucket_starts[worker_index]
+            merge_segment(output[bucket_start:bucket_start + totals[worker_index]], counts[:, worker_index], backend)
+
+    finally:
+        del values, output, samples, counts, chunk
+        input_shm.close()
+        output_shm.close()
+        samples_shm.close()
+        counts_shm.close()
+
+
+def run_psrs_workers(processes, barrier):
+    for process in processes:
+        process.start()
+
+    try:
+        while True:
+            for process in processes:
+                process.join(WORKER_POLL_INTERVAL)
+
+                # a dead worker would leave the others waiting on the barrier forever
+                if process.exitcode not in (None, 0):
+                    barrier.abort()
+                    raise RuntimeError(f"Proces roboczy sample sort zakończył się kodem {process.exitcode}")
+
+            if not any(process.is_alive() for process in processes):
+                break
+    finally:
+        for process in processes:
+            process.join()
+
+
+def psrs_sample_sort(data, process_count, backend="ctypes", variant="recursive", leaf_backend=None,
+                     oversampling=DEFAULT_OVERSAMPLING):
+    dtype = type(data[0])
+    length = len(data)
+    # every chunk has to fill its whole row of the sample table
+    sample_count = min(process_count * oversampling, length // process_count)
+
+    input_shm, values = create_shared_ndarray(data, dtype)
+    del values
+    output_shm = create_shared_segment(length, dtype)
+    samples_shm = create_shared_segment(process_count * sample_count, dtype)
+    counts_shm = create_shared_segment(process_count * process_count, int)
+    arr = None
+    counts = None
+
+    try:
+        barrier = mp.Barrier(process_count)
+
+        processes = [
+            mp.Process(
+                target=psrs_worker,
+                args=(input_shm.name, output_shm.name, samples_shm.name, counts_shm.name, length, dtype, worker_index,
+                      process_count, barrier, sample_count, backend, variant, leaf_backend)
+            )
+            for worker_index in range(process_count)
+        ]
+
+        run_psrs_workers(processes, barrier)
+
+        counts = view_shared_segment(counts_shm, process_count * process_count, int).reshape(process_count, process_count)
+        record_metric("oversampling", oversampling)
+        record_bucket_imbalance(counts.sum(axis=0).tolist(), process_count)
+
+        arr = view_shared_segment(output_shm, length, dtype, backend)
+
+        return shared_array_to_result(arr)
+
+    finally:
+        del arr, counts
+        destroy_shared_memory(input_shm)
+        destroy_shared_memory(output_shm)
+        destroy_shared_memory(samples_shm)
+        destroy_shared_memory(counts_shm)
+# end
+
+
+def parallel_sample_sort(data, process_count, backend="ctypes", variant="recursive", leaf_backend=None, exchange="psrs",
+                         oversampling=DEFAULT_OVERSAMPLING):
     if len(data) <= 1:
         return data
 
+    if leaf_backend is not None:
+        get_leaf_sort_backend(leaf_backend)
+
+    get_exchange_mode(exchange)
+    get_oversampling(oversampling)
+    get_shared_array_backend(backend)
+
     if not should_run_parallel(len(data), process_count):
-        return sample_sort(data)
+        return sample_sort(data, variant=variant, leaf_backend=leaf_backend, oversampling=oversampling)
+
+    if exchange == "psrs":
+        return psrs_sample_sort(data, process_count, backend, variant, leaf_backend, oversampling)
 
+    # version with the parent-side gather - buckets are collected and copied into a second segment
     dtype = type(data[0])
+    create_shared_array, _ = get_shared_array_backend(backend)
     shm, arr = create_shared_array(data, dtype)
 
     try:
@@ -63,7 +241,7 @@ def parallel_sample_sort(data, process_count):
         for start, end in ranges:
             process = mp.Process(
                 target=local_sort_worker,
-                args=(shm.name, len(arr), dtype, start, end)
+                args=(shm.name, len(arr), dtype, start, end, backend, variant, leaf_backend)
             )
             process.start()
             processes.append(process)
@@ -74,7 +252,7 @@ def parallel_sample_sort(data, process_count):
         samples = []
 
         for start, end in ranges:
-            samples.extend(select_samples(arr[start:end], process_count))
+            samples.extend(select_samples(arr[start:end], process_count * oversampling))
 
         pivots = choose_pivots(samples, process_count)
 
@@ -86,6 +264,9 @@ def parallel_sample_sort(data, process_count):
             for i in range(len(local_buckets)):
                 buckets[i].extend(local_buckets[i])
 
+        record_metric("oversampling", oversampling)
+        record_bucket_imbalance([len(bucket) for bucket in buckets], process_count)
+
     finally:
         del arr
         destroy_shared_memory(shm)
@@ -108,7 +289,7 @@ def parallel_sample_sort(data, process_count):
             if group_size > min_group_size:
                 process = mp.Process(
                     target=bucket_worker,
-                    args=(shm.name, len(arr), dtype, group)
+                    args=(shm.name, len(arr), dtype, group, backend, variant, leaf_backend)
                 )
                 process.start()
                 processes.append(process)
@@ -116,12 +297,12 @@ def parallel_sample_sort(data, process_count):
                 sequential_groups.append(group)
 
         for group in sequential_groups:
-            sort_group(arr, group)
+            sort_group(arr, group, variant, leaf_backend)
 
         for process in processes:
             process.join()
 
-        return list(arr)
+        return shared_array_to_result(arr)
 
     finally:
         del arr
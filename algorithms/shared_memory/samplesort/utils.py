@@ -1,15 +1,24 @@
 import ctypes
 import os
+import heapq
 import math
 import numpy as np
 from multiprocessing import shared_memory
 
 from algorithms.shared_memory.mergesort.sequential import merge_sort
+from algorithms.leaf_sort import sort_leaf
+from algorithms.cutoffs import get_calibrated_cutoff
 
 
 MIN_SIZE_PER_CORE = 50_000
 MIN_GROUP_SIZE = 5000
 
+# samples taken from every chunk = process_count * oversampling
+DEFAULT_OVERSAMPLING = 1
+
+# "psrs" - workers sample, split and exchange inside shared memory, "gather" - the parent collects the buckets
+EXCHANGE_MODES = ("psrs", "gather")
+
 # {cores: próg}
 PARALLEL_SIZE_CUTOFF = {
     2: 100_000,
@@ -32,6 +41,11 @@ GROUP_SIZE_CUTOFF = {
 
 
 def get_parallel_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("samplesort", "parallel_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
     cutoff = PARALLEL_SIZE_CUTOFF.get(process_count)
 
     if cutoff is None:
@@ -41,6 +55,11 @@ def get_parallel_size_cutoff(process_count):
 
 
 def get_group_size_cutoff(process_count):
+    cutoff = get_calibrated_cutoff("samplesort", "group_size", process_count)
+
+    if cutoff is not None:
+        return cutoff
+
     cutoff = GROUP_SIZE_CUTOFF.get(process_count)
 
     if cutoff is None:
@@ -88,6 +107,59 @@ def attach_shared_array(name, length, dtype):
     return shm, shared_array
 
 
+def get_np_dtype(dtype):
+    if dtype is int:
+        return np.int64
+    elif dtype is float:
+        return np.float64
+
+    raise ValueError("dtype musi być int lub float")
+
+
+def create_shared_ndarray(data, dtype):
+    np_dtype = np.dtype(get_np_dtype(dtype))
+
+    shm = shared_memory.SharedMemory(
+        create=True,
+        size=len(data) * np_dtype.itemsize
+    )
+
+    shared_array = np.ndarray((len(data),), dtype=np_dtype, buffer=shm.buf)
+    shared_array[:] = data
+
+    return shm, shared_array
+
+
+def attach_shared_ndarray(name, length, dtype):
+    np_dtype = get_np_dtype(dtype)
+
+    shm = shared_memory.SharedMemory(name=name)
+    shared_array = np.ndarray((length,), dtype=np_dtype, buffer=shm.buf)
+
+    return shm, shared_array
+
+
+# "ctypes" - the segment is a ctypes array, "numpy" - zero-copy np.ndarray view over the segment
+SHARED_ARRAY_BACKENDS = {
+    "ctypes": (create_shared_array, attach_shared_array),
+    "numpy": (create_shared_ndarray, attach_shared_ndarray),
+}
+
+
+def get_shared_array_backend(backend):
+    if backend not in SHARED_ARRAY_BACKENDS:
+        raise ValueError(f"Nieznany backend pamięci współdzielonej: {backend}")
+
+    return SHARED_ARRAY_BACKENDS[backend]
+
+
+def shared_array_to_result(arr):
+    if isinstance(arr, np.ndarray):
+        return arr.copy()
+
+    return list(arr)
+
+
 def close_shared_memory(shm):
     shm.close()
 
@@ -97,6 +169,28 @@ def destroy_shared_memory(shm):
     shm.unlink()
 
 
+def get_exchange_mode(exchange):
+    if exchange not in EXCHANGE_MODES:
+        raise ValueError(f"Nieznany tryb wymiany kubełków: {exchange}")
+
+    return exchange
+
+
+# empty segment for the exchange buffer, the sample table and the split counts
+def create_shared_segment(length, dtype):
+    return shared_memory.SharedMemory(
+        create=True,
+        size=max(1, length * np.dtype(get_np_dtype(dtype)).itemsize)
+    )
+
+
+def view_shared_segment(shm, length, dtype, backend="numpy"):
+    if backend == "numpy":
+        return np.ndarray((length,), dtype=get_np_dtype(dtype), buffer=shm.buf)
+
+    return (get_ctype(dtype) * length).from_buffer(shm.buf)
+
+
 def split_ranges(length, process_count):
     chunk_size = length // process_count
     ranges = []
@@ -114,6 +208,13 @@ def split_ranges(length, process_count):
     return ranges
 
 
+def get_oversampling(oversampling):
+    if not isinstance(oversampling, int) or oversampling < 1:
+        raise ValueError(f"Niepoprawny współczynnik nadpróbkowania: {oversampling}")
+
+    return oversampling
+
+
 def select_samples(sorted_chunk, sample_count):
     if len(sorted_chunk) == 0:
         return []
@@ -223,6 +324,28 @@ def calculate_parts(data_size, process_count=None):
     return min(process_count, data_size)
 
 
-def sort_bucket(bucket):
-    merge_sort(bucket)
-    return bucket
\ No newline at end of file
+def sort_bucket(bucket, variant="recursive", leaf_backend=None):
+    if leaf_backend is not None and leaf_backend != "python":
+        return sort_leaf(bucket, leaf_backend)
+
+    merge_sort(bucket, variant=variant)
+    return bucket
+
+
+# k-way merge of sorted runs with a heap - O(m log k) instead of sorting the whole bucket again
+def merge_sorted_runs(runs):
+    runs = [run for run in runs if len(run) > 0]
+
+    if not runs:
+        return []
+
+    if len(runs) == 1:
+        return list(runs[0])
+
+    return list(heapq.merge(*runs))
+
+
+# version with NumPy - timsort behind kind="stable" finds the presorted runs and only merges them
+def merge_sorted_runs_ndarray(values):
+    values.sort(kind="stable")
+    return values
@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager, nullcontext
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# per-run phase times - filled by the sorts, read by the benchmark worker after the run (like metrics.py)
+# off by default - trace_phase then returns one shared no-op context manager
+_enabled = False
+_phases = {}
+
+_DISABLED = nullcontext()
+
+
+def enable_tracing(enabled=True):
+    global _enabled
+
+    _enabled = enabled
+
+
+def is_tracing_enabled():
+    return _enabled
+
+
+def reset_phases():
+    _phases.clear()
+
+
+def record_phase(name, elapsed):
+    _phases[name] = _phases.get(name, 0.0) + elapsed
+
+
+def collect_phases():
+    return dict(_phases)
+
+
+@contextmanager
+def _phase_span(name):
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def trace_phase(name):
+    if not _enabled:
+        return _DISABLED
+
+    return _phase_span(name)
+
+
+# workers - one row of phase times per worker in a shared segment, each worker writes only its own row
+# handle = (segment name, worker count, phase names) or None when tracing is off
+
+def create_worker_phases(worker_count, names):
+    if not _enabled:
+        return None, None
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, worker_count * len(names)) * 8)
+    table = np.ndarray((worker_count, len(names)), dtype=np.float64, buffer=shm.buf)
+    table[:] = 0
+    del table
+
+    return shm, (shm.name, worker_count, tuple(names))
+
+
+@contextmanager
+def _worker_phase_span(handle, worker_index, name):
+    shm_name, worker_count, names = handle
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+
+        shm = shared_memory.SharedMemory(name=shm_name)
+        table = np.ndarray((worker_count, len(names)), dtype=np.float64, buffer=shm.buf)
+        table[worker_index, names.index(name)] += elapsed
+        del table
+        shm.close()
+
+
+def trace_worker_phase(handle, worker_index, name):
+    if handle is None:
+        return _DISABLED
+
+    return _worker_phase_span(handle, worker_index, name)
+
+
+# the slowest worker of every phase is what the parent waits for
+def collect_worker_phases(shm, handle):
+    if handle is None:
+        return
+
+    _, worker_count, names = handle
+    table = np.ndarray((worker_count, len(names)), dtype=np.float64, buffer=shm.buf)
+
+    for column, name in enumerate(names):
+        record_phase(f"worker_{name}", float(table[:, column].max()))
+
+    del table
+
+
+def destroy_worker_phases(shm):
+    if shm is None:
+        return
+
+    shm.close()
+    shm.unlink()
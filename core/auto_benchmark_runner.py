@@ -1,9 +1,10 @@
 import math
 
 from core.database import get_data_from_db
-from core.benchmark import profile_function
+from core.benchmark import profile_function, bind_options, bind_process_count, get_dataset_fingerprint
 from core.menu import print_separator
-from core.config import ALGORITHMS, DATA_TABLES, DATA_SIZES
+from core.config import ALGORITHMS, DATA_TABLES, DATA_SIZES, LEAF_SORT_ALGORITHMS, describe_implementation
+from algorithms.leaf_sort import describe_leaf_backend
 from core.hardware import get_system_info, get_available_cores
 from core.results_database import create_results_table, create_system_info_table, save_system_info, save_benchmark_result
 
@@ -53,6 +54,7 @@ def run_auto_benchmarks():
                 print(f"Rozmiar danych: {data_size}")
 
                 data = get_data_from_db(table_name, data_size)
+                fingerprint = get_dataset_fingerprint(table_name, data_size, data)
                 # sx
                 sample_interval = get_sample_interval(len(data))
                 # ex
@@ -71,7 +73,8 @@ def run_auto_benchmarks():
                     algorithm["sequential"],
                     data,
                     label=f"{algorithm['name']} - Sequential",
-                    sample_interval=sample_interval # tests sx
+                    sample_interval=sample_interval, # tests sx
+                    fingerprint=fingerprint
                 )
 
                 save_benchmark_result(
@@ -80,7 +83,9 @@ def run_auto_benchmarks():
                     dataset=table_name,
                     data_size=data_size,
                     cores=1,
-                    stats=sequential_stats
+                    stats=sequential_stats,
+                    leaf_backend=describe_leaf_backend() if algorithm["name"] in LEAF_SORT_ALGORITHMS else None,
+                    implementation=describe_implementation(algorithm["name"])
                 )
 
                 if sequential_stats["status"] != "OK":
@@ -106,24 +111,26 @@ def run_auto_benchmarks():
                         max_depth = int(math.log2(cores))
 
                         parallel_stats = profile_function(
-                            algorithm["parallel"],
+                            bind_process_count(bind_options(algorithm["parallel"], algorithm.get("parallel_options")), cores),
                             data,
                             max_depth,
                             label=f"{algorithm['name']} - Parallel",
                             sequential_time=sequential_stats["avg_time"],
                             cores=cores,
-                            sample_interval=sample_interval # tests sx
+                            sample_interval=sample_interval, # tests sx
+                            fingerprint=fingerprint
                         )
 
-                    elif algorithm["name"] in ("Bucket Sort", "Sample Sort"):
+                    elif algorithm["name"] in ("Bucket Sort", "Sample Sort", "Radix Sort"):
                         parallel_stats = profile_function(
-                            algorithm["parallel"],
+                            bind_options(algorithm["parallel"], algorithm.get("parallel_options")),
                             data,
                             cores,
                             label=f"{algorithm['name']} - Parallel",
                             sequential_time=sequential_stats["avg_time"],
                             cores=cores,
-                            sample_interval=sample_interval # tests sx
+                            sample_interval=sample_interval, # tests sx
+                            fingerprint=fingerprint
                         )
 
                     else:
@@ -137,7 +144,12 @@ def run_auto_benchmarks():
                         dataset=table_name,
                         data_size=data_size,
                         cores=cores,
-                        stats=parallel_stats
+                        stats=parallel_stats,
+                        leaf_backend=(
+                            describe_leaf_backend(algorithm.get("parallel_options"))
+                            if algorithm["name"] in LEAF_SORT_ALGORITHMS else None
+                        ),
+                        implementation=describe_implementation(algorithm["name"])
                     )
 
                     if parallel_stats["status"] != "OK":
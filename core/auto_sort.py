@@ -0,0 +1,374 @@
+import importlib
+import inspect
+import math
+import os
+import random
+import sqlite3
+from functools import lru_cache
+
+import psutil
+
+from core.config import IMPLEMENTATION_VERSION, SHARED_MEMORY_ONLY_ALGORITHMS
+from core.database import get_data_from_db, DB_PATH as DATA_DB_PATH
+from core.results_database import DB_PATH
+
+
+# elements compared when classifying the input
+SAMPLE_SIZE = 1024
+SAMPLE_SEED = 42
+
+# size of the stored datasets classified to get their features
+FEATURE_DATA_SIZE = 10_000
+
+# above this sortedness / duplicate ratio the rules without a model pick a specialised variant
+PRESORTED_THRESHOLD = 0.5
+DUPLICATES_THRESHOLD = 0.5
+
+# name in the results -> (package, sequential function, parallel function)
+ALGORITHM_MODULES = {
+    "Quick Sort": ("quicksort", "quicksort", "parallel_quicksort"),
+    "Merge Sort": ("mergesort", "merge_sort", "parallel_merge_sort"),
+    "Bucket Sort": ("bucketsort", "bucket_sort", "parallel_bucket_sort"),
+    "Sample Sort": ("samplesort", "sample_sort", "parallel_sample_sort"),
+    "Radix Sort": ("radixsort", "radix_sort", "parallel_radix_sort"),
+}
+
+# parallel functions that take max_depth instead of the process count
+DEPTH_ALGORITHMS = ("Quick Sort", "Merge Sort")
+
+# variant names saved by the duplicate ratio and skew benchmarks -> options
+ALGORITHM_VARIANT_OPTIONS = {
+    "Quick Sort (two_way)": {"partition_scheme": "two_way"},
+    "Quick Sort (three_way)": {"partition_scheme": "three_way"},
+    "Bucket Sort (equal_width)": {"bucket_ranges": "equal_width", "grouping": "buckets"},
+    "Bucket Sort (quantile)": {"bucket_ranges": "quantile", "grouping": "count"},
+}
+
+# fitted model - read once per process
+_model = None
+
+
+def get_dtype(data):
+    if not data:
+        return "int"
+
+    value = data[0]
+
+    if isinstance(value, float) or type(value).__name__.startswith("float"):
+        return "float"
+
+    return "int"
+
+
+def sample_positions(length, count, rng):
+    if length <= count:
+        return list(range(length))
+
+    return sorted(rng.sample(range(length), count))
+
+
+# 1 - sorted, 0 - random, negative pairs count as random too
+def estimate_sortedness(data, rng):
+    if len(data) < 2:
+        return 1.0
+
+    positions = sample_positions(len(data) - 1, SAMPLE_SIZE, rng)
+    ordered = sum(1 for i in positions if data[i] <= data[i + 1])
+
+    return max(0.0, 2 * ordered / len(positions) - 1)
+
+
+def estimate_duplicate_ratio(data, rng):
+    if not data:
+        return 0.0
+
+    sample = [data[i] for i in sample_positions(len(data), SAMPLE_SIZE, rng)]
+
+    return 1 - len(set(sample)) / len(sample)
+
+
+def classify_input(data):
+    rng = random.Random(SAMPLE_SEED)
+
+    return {
+        "size": len(data),
+        "dtype": get_dtype(data),
+        "sortedness": estimate_sortedness(data, rng),
+        "duplicate_ratio": estimate_duplicate_ratio(data, rng),
+    }
+
+
+def get_base_algorithm(algorithm_name):
+    return algorithm_name.split(" (")[0]
+
+
+def get_algorithm_implementation(algorithm_name, implementation):
+    if get_base_algorithm(algorithm_name) in SHARED_MEMORY_ONLY_ALGORITHMS:
+        return "shared_memory"
+
+    return implementation
+
+
+def load_sort_function(algorithm_name, implementation, mode):
+    base_name = get_base_algorithm(algorithm_name)
+
+    if base_name not in ALGORITHM_MODULES:
+        raise ValueError(f"Nieznany algorytm: {algorithm_name}")
+
+    package, sequential_name, parallel_name = ALGORITHM_MODULES[base_name]
+    implementation = get_algorithm_implementation(algorithm_name, implementation)
+
+    if mode == "Sequential":
+        module = importlib.import_module(f"algorithms.{implementation}.{package}.sequential")
+        return getattr(module, sequential_name)
+
+    module = importlib.import_module(f"algorithms.{implementation}.{package}.parallel")
+    return getattr(module, parallel_name)
+
+
+# options the function does not take are left out (sequential versions, process_pool, queue)
+def filter_options(func, options):
+    parameters = inspect.signature(func).parameters
+
+    return {name: value for name, value in options.items() if name in parameters}
+
+
+def read_benchmark_rows(db_path):
+    if not os.path.exists(db_path):
+        return []
+
+    try:
+        conn = sqlite3.connect(db_path)
+
+        try:
+            return conn.execute(
+                """
+                SELECT algorithm, mode, dataset, data_size, cores, median_time, implementation
+                FROM benchmark_results
+                WHERE status = 'OK' AND correctness = 'CORRECT' AND median_time > 0
+                """
+            ).fetchall()
+        finally:
+            conn.close()
+
+    except sqlite3.Error:
+        return []
+
+
+# log(time) = log(a) + b * log(size) - least squares over the measured sizes
+def fit_power_law(points):
+    sizes = {size for size, _ in points}
+
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(time) for _, time in points]
+
+    if len(sizes) < 2:
+        # one size only - assume linear growth
+        return sum(ys) / len(ys) - sum(xs) / len(xs), 1.0
+
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+
+    slope = (
+        sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+        / sum((x - mean_x) ** 2 for x in xs)
+    )
+
+    return mean_y - slope * mean_x, slope
+
+
+def predict_time(curve, size):
+    log_a, slope = curve
+
+    return math.exp(log_a + slope * math.log(max(size, 1)))
+
+
+def classify_dataset(dataset, data_db_path):
+    try:
+        data = get_data_from_db(dataset, FEATURE_DATA_SIZE, data_db_path)
+    except sqlite3.Error:
+        return None
+
+    if not data:
+        return None
+
+    return classify_input(data)
+
+
+def build_model(db_path=DB_PATH, data_db_path=DATA_DB_PATH):
+    points = {}
+
+    for algorithm, mode, dataset, data_size, cores, median_time, implementation in read_benchmark_rows(db_path):
+        if get_base_algorithm(algorithm) not in ALGORITHM_MODULES:
+            continue
+
+        # rows saved before the implementation column
+        implementation = get_algorithm_implementation(algorithm, implementation or IMPLEMENTATION_VERSION)
+
+        key = (dataset, implementation, algorithm, mode, cores)
+        points.setdefault(key, []).append((data_size, median_time))
+
+    curves = {}
+    datasets = {}
+
+    for (dataset, implementation, algorithm, mode, cores), dataset_points in points.items():
+        if dataset not in datasets:
+            datasets[dataset] = classify_dataset(dataset, data_db_path)
+
+        if datasets[dataset] is None:
+            continue
+
+        curves.setdefault(dataset, {})[(implementation, algorithm, mode, cores)] = fit_power_law(dataset_points)
+
+    return {
+        "datasets": {dataset: features for dataset, features in datasets.items() if dataset in curves},
+        "curves": curves,
+    }
+
+
+def get_model():
+    global _model
+
+    if _model is None:
+        _model = build_model()
+
+    return _model
+
+
+def reset_auto_sort_model(model=None):
+    global _model
+
+    _model = model
+    decide_strategy.cache_clear()
+
+
+def dataset_distance(features, dataset_features):
+    distance = (
+        (features["sortedness"] - dataset_features["sortedness"]) ** 2
+        + (features["duplicate_ratio"] - dataset_features["duplicate_ratio"]) ** 2
+    )
+
+    if features["dtype"] != dataset_features["dtype"]:
+        # other dtype only if nothing of the same type was measured
+        distance += 10
+
+    return distance
+
+
+def choose_nearest_dataset(features, datasets):
+    if not datasets:
+        return None
+
+    return min(datasets, key=lambda dataset: dataset_distance(features, datasets[dataset]))
+
+
+def make_strategy(algorithm, implementation, mode, cores, predicted_time=None, dataset=None):
+    return {
+        "algorithm": algorithm,
+        "implementation": get_algorithm_implementation(algorithm, implementation),
+        "mode": mode,
+        "cores": cores,
+        "options": dict(ALGORITHM_VARIANT_OPTIONS.get(algorithm, {})),
+        "predicted_time": predicted_time,
+        "dataset": dataset,
+    }
+
+
+# without measurements - the variants that handle the input shape best
+def choose_default_strategy(features):
+    if features["sortedness"] >= PRESORTED_THRESHOLD:
+        strategy = make_strategy("Merge Sort", "shared_memory", "Sequential", 1)
+        strategy["options"] = {"variant": "natural"}
+    elif features["duplicate_ratio"] >= DUPLICATES_THRESHOLD:
+        strategy = make_strategy("Quick Sort (three_way)", "shared_memory", "Sequential", 1)
+    else:
+        strategy = make_strategy("Quick Sort", "shared_memory", "Sequential", 1)
+        strategy["options"] = {"variant": "introsort"}
+
+    return strategy
+
+
+@lru_cache(maxsize=None)
+def decide_strategy(size_bucket, dtype, sortedness, duplicate_ratio, max_cores):
+    features = {
+        "size": 2 ** size_bucket,
+        "dtype": dtype,
+        "sortedness": sortedness,
+        "duplicate_ratio": duplicate_ratio,
+    }
+
+    model = get_model()
+    dataset = choose_nearest_dataset(features, model["datasets"])
+
+    if dataset is None:
+        return choose_default_strategy(features)
+
+    best = None
+
+    for (implementation, algorithm, mode, cores), curve in model["curves"][dataset].items():
+        if cores > max_cores:
+            continue
+
+        predicted = predict_time(curve, features["size"])
+
+        if best is None or predicted < best[0]:
+            best = (predicted, implementation, algorithm, mode, cores)
+
+    if best is None:
+        return choose_default_strategy(features)
+
+    predicted, implementation, algorithm, mode, cores = best
+
+    return make_strategy(algorithm, implementation, mode, cores, predicted, dataset)
+
+
+# inputs in the same bucket share one decision
+def get_decision_key(features, max_cores):
+    return (
+        max(0, round(math.log2(max(features["size"], 1)))),
+        features["dtype"],
+        round(features["sortedness"], 1),
+        round(features["duplicate_ratio"], 1),
+        max_cores,
+    )
+
+
+def choose_sort_strategy(data, max_cores=None):
+    if max_cores is None:
+        max_cores = psutil.cpu_count(logical=True) or 1
+
+    features = classify_input(data)
+    strategy = dict(decide_strategy(*get_decision_key(features, max_cores)))
+    strategy["features"] = features
+
+    return strategy
+
+
+def run_strategy(strategy, data):
+    func = load_sort_function(strategy["algorithm"], strategy["implementation"], strategy["mode"])
+    options = filter_options(func, strategy["options"])
+
+    if strategy["mode"] == "Sequential":
+        return func(data, **options)
+
+    if get_base_algorithm(strategy["algorithm"]) in DEPTH_ALGORITHMS:
+        options = filter_options(func, {"process_count": strategy["cores"], **options})
+        return func(data, int(math.log2(strategy["cores"])), **options)
+
+    return func(data, strategy["cores"], **options)
+
+
+# picks the algorithm, implementation and cores from the benchmark results and sorts data
+# returns a new list - data is left unchanged whichever strategy is chosen
+def auto_sort(data, max_cores=None):
+    values = list(data)
+
+    if len(values) <= 1:
+        return values
+
+    strategy = choose_sort_strategy(values, max_cores)
+    # sequential versions sort in place, the parallel ones return a copy
+    result = run_strategy(strategy, values)
+
+    # in-place sequential versions return None
+    return values if result is None else result
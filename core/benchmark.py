@@ -10,19 +10,169 @@ import os
 import subprocess
 import shutil
 import platform
+import inspect
+import queue
+import itertools
+import numpy as np
+from functools import partial
 
-from core.monitoring import measure_usage, get_exact_children_cpu_time, HAS_RESOURCE
+from core.monitoring import (measure_usage, get_exact_children_cpu_time, start_process_sampler, stop_process_sampler,
+                             summarize_usage, get_sampler_overhead, get_monitor_mode, HAS_RESOURCE, DEFAULT_MONITOR)
+from core.verification import compute_fingerprint, verify_result, get_verification_mode, DEFAULT_VERIFICATION
+from algorithms.metrics import reset_metrics, collect_metrics
+from algorithms.tracing import enable_tracing, reset_phases, collect_phases
+from algorithms.process_pool.pool import shutdown_executors, get_pool_cpu_time
 
 
 DEFAULT_TIMEOUT = 900
 DEFAULT_SAMPLE_INTERVAL = 0.05
 PYSPY_PATH = shutil.which("py-spy")
 
+# "persistent" - one worker process gets the data once and runs every repeat on a fresh copy
+# "per_run" - new mp.Process (and a new copy of the data) for every repeat
+WORKER_MODES = ("persistent", "per_run")
+DEFAULT_WORKER_MODE = "persistent"
+# how often the parent checks if the persistent worker is still alive
+WORKER_POLL_INTERVAL = 0.5
+
+# "fixed" - exactly `repeat` measured runs
+# "adaptive" - repeat until the CI of the median is narrow enough or the time budget is used up (`repeat` ignored)
+REPEAT_MODES = ("fixed", "adaptive")
+DEFAULT_REPEAT_MODE = "fixed"
+MIN_REPEATS = 5
+MAX_REPEATS = 200
+# CI half-width / median
+TARGET_CI_HALF_WIDTH = 0.02
+# seconds of measured runs (the warm-up not included) after which no new run is started,
+# but only after MIN_REPEATS runs - unless one run alone takes longer than the budget
+REPEAT_TIME_BUDGET = 60
+CI_CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_SEED = 42
+
+# (table, size) -> fingerprint of the unsorted data, filled by get_dataset_fingerprint
+_dataset_fingerprints = {}
+
+
+def bind_options(func, options=None):
+    if not options:
+        return func
+
+    return partial(func, **options)
+
+
+# parallel versions that take process_count next to max_depth (shared_memory quicksort) get the real core count,
+# so it does not have to be a power of two - a process_count from parallel_options is kept
+def bind_process_count(func, cores):
+    target = func.func if isinstance(func, partial) else func
+
+    if "process_count" not in inspect.signature(target).parameters:
+        return func
+
+    if isinstance(func, partial) and "process_count" in func.keywords:
+        return func
+
+    return partial(func, process_count=cores)
+
+
 def execute_algorithm(func, args):
     return func(*args)
 
 
-def benchmark_worker(func, args, result_queue, sample_interval, profile_enabled, sort_by):
+def get_worker_mode(worker_mode):
+    if worker_mode not in WORKER_MODES:
+        raise ValueError(f"Nieznany tryb procesu testowego: {worker_mode}")
+
+    return worker_mode
+
+
+def get_repeat_mode(repeat_mode):
+    if repeat_mode not in REPEAT_MODES:
+        raise ValueError(f"Nieznany tryb powtórzeń: {repeat_mode}")
+
+    return repeat_mode
+
+
+# percentile bootstrap of the median - (low, high)
+def bootstrap_median_ci(times, confidence=CI_CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES):
+    if len(times) < 2:
+        return None, None
+
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    samples = rng.choice(np.asarray(times), size=(resamples, len(times)), replace=True)
+    medians = np.median(samples, axis=1)
+
+    tail = (1 - confidence) / 2 * 100
+
+    return float(np.percentile(medians, tail)), float(np.percentile(medians, 100 - tail))
+
+
+def is_median_stable(times, target=TARGET_CI_HALF_WIDTH):
+    ci_low, ci_high = bootstrap_median_ci(times)
+
+    if ci_low is None:
+        return False
+
+    median = statistics.median(times)
+
+    return median > 0 and (ci_high - ci_low) / 2 <= target * median
+
+
+def should_stop_repeating(times, repeat, repeat_mode, measured_time):
+    if repeat_mode == "fixed":
+        return len(times) >= repeat
+
+    if len(times) >= MAX_REPEATS:
+        return True
+
+    if times and max(times) >= REPEAT_TIME_BUDGET:
+        return True
+
+    if len(times) < MIN_REPEATS:
+        return False
+
+    return measured_time >= REPEAT_TIME_BUDGET or is_median_stable(times)
+
+
+def benchmark_worker(func, args, result_queue, sample_interval, profile_enabled, sort_by,
+        verification=DEFAULT_VERIFICATION, fingerprint=None, monitor=DEFAULT_MONITOR, trace_phases=True):
+    try:
+        result_queue.put(measure_run(func, args, sample_interval, profile_enabled, sort_by, verification, fingerprint,
+                                     monitor=monitor, trace_phases=trace_phases))
+    finally:
+        # process_pool sorts leave their executors in this process - the child exit does not join them
+        shutdown_executors()
+
+
+# one process for all repeats - args are pickled once, every task sorts a fresh copy of args[0]
+def persistent_benchmark_worker(func, args, task_queue, result_queue, sample_interval, sort_by,
+        verification=DEFAULT_VERIFICATION, fingerprint=None, monitor=DEFAULT_MONITOR, trace_phases=True):
+    source = args[0]
+
+    try:
+        while True:
+            task = task_queue.get()
+
+            if task is None:
+                break
+
+            run_args = (list(source),) + tuple(args[1:])
+
+            result_queue.put(measure_run(
+                func, run_args, sample_interval, task["profile_enabled"], sort_by, verification, fingerprint,
+                original=source, monitor=monitor, trace_phases=trace_phases
+            ))
+    finally:
+        # the executors are reused by every repeat and closed once, after the last one
+        shutdown_executors()
+
+
+# fingerprint - of the unsorted input, given by profile_function (None - computed here from args[0])
+def measure_run(func, args, sample_interval, profile_enabled, sort_by, verification=DEFAULT_VERIFICATION,
+        fingerprint=None, original=None, monitor=DEFAULT_MONITOR, trace_phases=True):
+    monitor = get_monitor_mode(monitor)
+    sampler = None
+
     cpu_samples = []
     mem_samples = []
     states = []
@@ -42,68 +192,89 @@ def benchmark_worker(func, args, result_queue, sample_interval, profile_enabled,
         if profile_enabled:
             profiler.enable()
 
-        original = list(args[0])
+        if verification == "full" and original is None:
+            original = list(args[0])
+
+        if verification == "fingerprint" and fingerprint is None:
+            fingerprint = compute_fingerprint(args[0])
 
+        reset_metrics()
+        reset_phases()
+        enable_tracing(trace_phases)
         cpu_time_before = get_exact_children_cpu_time()
+        pool_cpu_time_before = get_pool_cpu_time()
+
+        if monitor == "process":
+            # started before the clock - spawning it is not part of the measured time
+            sampler = start_process_sampler(os.getpid(), sample_interval)
 
         start_time = time.perf_counter()
-        monitor_thread.start()
+
+        if monitor == "thread":
+            monitor_thread.start()
 
         result = execute_algorithm(func, args)
 
         end_time = time.perf_counter()
-        stop_flag.set()
-        monitor_thread.join()
-
-        execution_time = end_time - start_time
+        enable_tracing(False)
 
+        # before the sampler is joined - a reaped sampler would count in RUSAGE_CHILDREN
         cpu_time_after = get_exact_children_cpu_time()
+        pool_cpu_time_after = get_pool_cpu_time()
+
+        if monitor == "process":
+            usage = stop_process_sampler(sampler)
+            sampler = None
+        else:
+            stop_flag.set()
+            monitor_thread.join()
+            usage = summarize_usage(cpu_samples, mem_samples, states, sample_interval)
+
+        execution_time = end_time - start_time
 
         exact_children_cpu_time = None
         if cpu_time_before is not None and cpu_time_after is not None:
-            exact_children_cpu_time = cpu_time_after - cpu_time_before
+            # + the process_pool workers, still alive after the run
+            exact_children_cpu_time = cpu_time_after - cpu_time_before + pool_cpu_time_after - pool_cpu_time_before
 
         if profile_enabled:
             profiler.disable()
 
-        expected = sorted(original)
+        # numpy shared_memory backend returns np.ndarray - the fingerprint check reads it as it is, without a copy
+        if hasattr(result, "tolist") and verification == "full":
+            result = result.tolist()
 
-        if result is None:
-            correctness = "CORRECT" if args[0] == expected else "INCORRECT"
-        else:
-            correctness = "CORRECT" if result == expected else "INCORRECT"
+        # in-place versions return None
+        output = args[0] if result is None else result
+
+        correctness = "CORRECT" if verify_result(output, verification, fingerprint, original) else "INCORRECT"
 
         error_message = None
 
         if correctness == "INCORRECT":
             error_message = "Algorytm zwrócił niepoprawnie posortowane dane."
 
+        sample_count = usage["sample_count"]
+
         avg_cpu = (
-            statistics.mean(cpu_samples)
-            if cpu_samples else 0
+            usage["cpu_sum"] / sample_count
+            if sample_count else 0
         )
 
         avg_mem = (
-            statistics.mean(mem_samples)
-            if mem_samples else 0
+            usage["mem_sum"] / sample_count
+            if sample_count else 0
         )
 
-        max_mem = (
-            max(mem_samples)
-            if mem_samples else 0
-        )
-
-        active_time = (
-            states.count("active")
-            * sample_interval
-        )
+        max_mem = usage["max_mem"]
+        active_time = usage["active_time"]
+        idle_time = usage["idle_time"]
 
-        idle_time = (
-            states.count("idle")
-            * sample_interval
-        )
+        metrics = collect_metrics()
+        sampler_overhead = get_sampler_overhead(usage)
 
-        sample_count = len(cpu_samples)
+        if sampler_overhead is not None:
+            metrics["sampler_overhead"] = sampler_overhead
 
         profile_output = ""
 
@@ -119,7 +290,7 @@ def benchmark_worker(func, args, result_queue, sample_interval, profile_enabled,
 
             profile_output = profile_stream.getvalue()
 
-        result_queue.put({
+        return {
             "status": "OK",
             "execution_time": execution_time,
             "avg_cpu": avg_cpu,
@@ -132,19 +303,25 @@ def benchmark_worker(func, args, result_queue, sample_interval, profile_enabled,
             "error_message": error_message,
             "exact_children_cpu_time": exact_children_cpu_time,
             "sample_count": sample_count,
-        })
+            "metrics": metrics,
+            "phases": collect_phases(),
+        }
 
     except Exception as exception:
+        enable_tracing(False)
         stop_flag.set()
 
         if monitor_thread.is_alive():
             monitor_thread.join()
 
-        result_queue.put({
+        if sampler is not None:
+            stop_process_sampler(sampler)
+
+        return {
             "status": "ERROR",
             "correctness": "UNKNOWN",
             "error_message": str(exception)
-        })
+        }
 
 
 def launch_pyspy(pid, output_path, timeout):
@@ -221,7 +398,8 @@ def stop_pyspy(pyspy_process, output_path, elapsed_hint=None):
 
 
 def run_single_benchmark(func, args, timeout=DEFAULT_TIMEOUT,
-        sample_interval=DEFAULT_SAMPLE_INTERVAL, profile_enabled=False, sort_by="cumulative", pyspy_output=None):
+        sample_interval=DEFAULT_SAMPLE_INTERVAL, profile_enabled=False, sort_by="cumulative", pyspy_output=None,
+        verification=DEFAULT_VERIFICATION, fingerprint=None, monitor=DEFAULT_MONITOR, trace_phases=True):
 
     result_queue = mp.Queue()
 
@@ -233,7 +411,11 @@ def run_single_benchmark(func, args, timeout=DEFAULT_TIMEOUT,
             result_queue,
             sample_interval,
             profile_enabled,
-            sort_by
+            sort_by,
+            verification,
+            fingerprint,
+            monitor,
+            trace_phases
         )
     )
 
@@ -276,8 +458,106 @@ def run_single_benchmark(func, args, timeout=DEFAULT_TIMEOUT,
     return result
 
 
+def start_persistent_worker(func, args, sample_interval, sort_by, verification=DEFAULT_VERIFICATION, fingerprint=None,
+        monitor=DEFAULT_MONITOR, trace_phases=True):
+    task_queue = mp.Queue()
+    result_queue = mp.Queue()
+
+    worker = mp.Process(
+        target=persistent_benchmark_worker,
+        args=(
+            func,
+            args,
+            task_queue,
+            result_queue,
+            sample_interval,
+            sort_by,
+            verification,
+            fingerprint,
+            monitor,
+            trace_phases
+        )
+    )
+
+    worker.start()
+
+    return worker, task_queue, result_queue
+
+
+def stop_persistent_worker(worker, task_queue):
+    if worker.is_alive():
+        task_queue.put(None)
+        worker.join(WORKER_POLL_INTERVAL)
+
+    if worker.is_alive():
+        worker.terminate()
+        worker.join()
+
+
+# the same statuses as run_single_benchmark - the caller stops the worker after TIMEOUT / ERROR
+def run_persistent_benchmark(worker, task_queue, result_queue, timeout=DEFAULT_TIMEOUT, profile_enabled=False):
+    task_queue.put({"profile_enabled": profile_enabled})
+
+    deadline = time.perf_counter() + timeout
+
+    while True:
+        try:
+            return result_queue.get(timeout=min(WORKER_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+        except queue.Empty:
+            pass
+
+        if not worker.is_alive():
+            # the result could have arrived right before the exit
+            try:
+                return result_queue.get(timeout=WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                return {
+                    "status": "ERROR",
+                    "correctness": "UNKNOWN",
+                    "error_message": f"Proces zakończył się bez zwrócenia wyniku (kod wyjścia {worker.exitcode}).",
+                }
+
+        if time.perf_counter() >= deadline:
+            worker.terminate()
+            worker.join()
+
+            return {
+                "status": "TIMEOUT",
+                "correctness": "UNKNOWN",
+                "error_message": f"Przekroczono limit czasu ({timeout} s)",
+            }
+
+
+# one O(n) pass per (table, size) - the runners load the same data for every algorithm and core count
+def get_dataset_fingerprint(table_name, data_size, data):
+    key = (table_name, data_size)
+
+    if key not in _dataset_fingerprints:
+        _dataset_fingerprints[key] = compute_fingerprint(data)
+
+    return _dataset_fingerprints[key]
+
+
 def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", repeat=10, sample_interval=DEFAULT_SAMPLE_INTERVAL,
-        sequential_time=None, cores=1, timeout=DEFAULT_TIMEOUT, profile_subprocesses=True, profile_dir="profiles"):
+        sequential_time=None, cores=1, timeout=DEFAULT_TIMEOUT, profile_subprocesses=True, profile_dir="profiles",
+        worker_mode=DEFAULT_WORKER_MODE, verification=DEFAULT_VERIFICATION, monitor=DEFAULT_MONITOR, trace_phases=True,
+        repeat_mode=DEFAULT_REPEAT_MODE, warmup=1, fingerprint=None):
+
+    get_repeat_mode(repeat_mode)
+
+    # the first warm-up run is the profiled one
+    if warmup < 1:
+        raise ValueError(f"Liczba przebiegów rozgrzewających musi być dodatnia: {warmup}")
+
+    get_worker_mode(worker_mode)
+    get_verification_mode(verification)
+    monitor = get_monitor_mode(monitor)
+
+    # the runners pass the one from get_dataset_fingerprint, the workers only compare against it
+    if verification != "fingerprint":
+        fingerprint = None
+    elif fingerprint is None:
+        fingerprint = compute_fingerprint(args[0])
 
     times = []
     cpu_results = []
@@ -285,6 +565,8 @@ def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", re
     max_mem_results = []
     exact_cpu_results = []
     sample_counts = []
+    metric_results = {}
+    phase_results = {}
 
     correctness = "CORRECT"
     profile_output = ""
@@ -297,65 +579,107 @@ def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", re
         safe_label = label.replace(" ", "_").replace("/", "_")
         pyspy_output = os.path.join(profile_dir, f"{safe_label}.svg")
 
-    for run in range(repeat + 1):
-        run_data = run_single_benchmark(
-            func=func,
-            args=args,
-            timeout=timeout,
-            sample_interval=sample_interval,
-            profile_enabled=(run == 0),
-            sort_by=sort_by,
-            pyspy_output=(pyspy_output if run == 0 else None)
-        )
+    persistent_worker = None
+    measured_start = None
 
-        run_status = run_data["status"]
-
-        if run_status != "OK":
-            status = run_data["status"]
-            error_message = run_data["error_message"]
-            print( f"Run {run + 1}: {run_status} - {error_message}" )
-            break
-
-        if run_data["correctness"] != "CORRECT":
-            correctness = "INCORRECT"
-            error_message = run_data["error_message"]
-
-        execution_time = run_data["execution_time"]
-        avg_cpu_run = run_data["avg_cpu"]
-        avg_mem_run = run_data["avg_mem"]
-        max_mem_run = run_data["max_mem"]
-        active_time = run_data["active_time"]
-        idle_time = run_data["idle_time"]
-
-        exact_cpu_run = run_data.get("exact_children_cpu_time")
-        sample_count_run = run_data.get("sample_count", 0)
-
-        exact_cpu_str = f"{exact_cpu_run:.4f}s" if exact_cpu_run is not None else "N/A (Windows)"
-        low_confidence_note = " [UWAGA: mało próbek]" if sample_count_run < 3 else ""
-
-        # print(
-        #     f"Run {run + 1}: "
-        #     f"CPU avg={avg_cpu_run:.2f}%, "
-        #     f"RAM avg={avg_mem_run:.2f} MB, "
-        #     f"RAM max={max_mem_run:.2f} MB, "
-        #     f"Active time={active_time:.2f}s, "
-        #     f"Idle time={idle_time:.2f}s, "
-        #     f"Total time={execution_time:.4f}s, "
-        #     f"Próbki={sample_count_run}{low_confidence_note}"
-        # )
-
-        if run == 0:
-            # print("Pierwsze uruchomienie pominięte\n")
-            profile_output = run_data["profile"]
-            continue
-
-        times.append(execution_time)
-        cpu_results.append(avg_cpu_run)
-        mem_results.append(avg_mem_run)
-        max_mem_results.append(max_mem_run)
-        sample_counts.append(sample_count_run)
-        if exact_cpu_run is not None:
-            exact_cpu_results.append(exact_cpu_run)
+    try:
+        for run in itertools.count():
+            if run == warmup:
+                measured_start = time.perf_counter()
+
+            if run >= warmup and should_stop_repeating(times, repeat, repeat_mode, time.perf_counter() - measured_start):
+                break
+
+            # py-spy records the whole process - the profiled run keeps its own short-lived process
+            if worker_mode == "per_run" or (run == 0 and pyspy_output is not None):
+                run_data = run_single_benchmark(
+                    func=func,
+                    args=args,
+                    timeout=timeout,
+                    sample_interval=sample_interval,
+                    profile_enabled=(run == 0),
+                    sort_by=sort_by,
+                    pyspy_output=(pyspy_output if run == 0 else None),
+                    verification=verification,
+                    fingerprint=fingerprint,
+                    monitor=monitor,
+                    trace_phases=trace_phases
+                )
+            else:
+                if persistent_worker is None:
+                    persistent_worker = start_persistent_worker(
+                        func, args, sample_interval, sort_by, verification, fingerprint, monitor, trace_phases
+                    )
+
+                worker, task_queue, result_queue = persistent_worker
+
+                run_data = run_persistent_benchmark(
+                    worker,
+                    task_queue,
+                    result_queue,
+                    timeout=timeout,
+                    profile_enabled=(run == 0)
+                )
+
+            run_status = run_data["status"]
+
+            if run_status != "OK":
+                status = run_data["status"]
+                error_message = run_data["error_message"]
+                print( f"Run {run + 1}: {run_status} - {error_message}" )
+                break
+
+            if run_data["correctness"] != "CORRECT":
+                correctness = "INCORRECT"
+                error_message = run_data["error_message"]
+
+            execution_time = run_data["execution_time"]
+            avg_cpu_run = run_data["avg_cpu"]
+            avg_mem_run = run_data["avg_mem"]
+            max_mem_run = run_data["max_mem"]
+            active_time = run_data["active_time"]
+            idle_time = run_data["idle_time"]
+
+            exact_cpu_run = run_data.get("exact_children_cpu_time")
+            sample_count_run = run_data.get("sample_count", 0)
+
+            exact_cpu_str = f"{exact_cpu_run:.4f}s" if exact_cpu_run is not None else "N/A (Windows)"
+            low_confidence_note = " [UWAGA: mało próbek]" if sample_count_run < 3 else ""
+
+            # print(
+            #     f"Run {run + 1}: "
+            #     f"CPU avg={avg_cpu_run:.2f}%, "
+            #     f"RAM avg={avg_mem_run:.2f} MB, "
+            #     f"RAM max={max_mem_run:.2f} MB, "
+            #     f"Active time={active_time:.2f}s, "
+            #     f"Idle time={idle_time:.2f}s, "
+            #     f"Total time={execution_time:.4f}s, "
+            #     f"Próbki={sample_count_run}{low_confidence_note}"
+            # )
+
+            if run < warmup:
+                # print("Pierwsze uruchomienie pominięte\n")
+                if run == 0:
+                    profile_output = run_data["profile"]
+                continue
+
+            times.append(execution_time)
+            cpu_results.append(avg_cpu_run)
+            mem_results.append(avg_mem_run)
+            max_mem_results.append(max_mem_run)
+            sample_counts.append(sample_count_run)
+            if exact_cpu_run is not None:
+                exact_cpu_results.append(exact_cpu_run)
+
+            for name, value in run_data.get("metrics", {}).items():
+                metric_results.setdefault(name, []).append(value)
+
+            for name, value in run_data.get("phases", {}).items():
+                phase_results.setdefault(name, []).append(value)
+
+    finally:
+        if persistent_worker is not None:
+            stop_persistent_worker(persistent_worker[0], persistent_worker[1])
 
     if status != "OK":
         print(f"\n--- {label} ---")
@@ -376,11 +700,17 @@ def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", re
             "error_message": error_message,
             "avg_exact_cpu_time": None,
             "min_sample_count": None,
+            "metrics": {},
+            "phases": {},
+            "repeat_count": None,
+            "median_ci_low": None,
+            "median_ci_high": None,
         }
 
     avg_time = statistics.mean(times) if times else None
     median_time = statistics.median(times) if times else None
     std_time = statistics.stdev(times) if len(times) > 1 else 0
+    median_ci_low, median_ci_high = bootstrap_median_ci(times)
 
     avg_cpu = statistics.mean(cpu_results) if cpu_results else None
     avg_mem = statistics.mean(mem_results) if mem_results else None
@@ -389,6 +719,11 @@ def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", re
     avg_exact_cpu_time = statistics.mean(exact_cpu_results) if exact_cpu_results else None
     min_sample_count = min(sample_counts) if sample_counts else None
 
+    # algorithm metrics (e.g. bucket_imbalance) averaged over the measured runs
+    metrics = {name: statistics.mean(values) for name, values in metric_results.items()}
+    # phase times (algorithms/tracing.py) - a phase missing in some runs counts as 0 there
+    phases = {name: sum(values) / len(times) for name, values in phase_results.items()} if times else {}
+
     speedup = None
     efficiency = None
 
@@ -435,4 +770,9 @@ def profile_function(func, *args, label="Profilowanie", sort_by="cumulative", re
         "error_message": error_message,
         "avg_exact_cpu_time": avg_exact_cpu_time,
         "min_sample_count": min_sample_count,
+        "metrics": metrics,
+        "phases": phases,
+        "repeat_count": len(times),
+        "median_ci_low": median_ci_low,
+        "median_ci_high": median_ci_high,
     }
\ No newline at end of file
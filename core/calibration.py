@@ -0,0 +1,266 @@
+import ctypes
+import math
+import random
+import statistics
+import time
+import multiprocessing as mp
+import psutil
+from multiprocessing import shared_memory
+
+from core.menu import print_separator
+from core.results_database import create_cutoffs_table, save_calibrated_cutoffs, DB_PATH
+from algorithms.cutoffs import reset_calibrated_cutoffs
+from algorithms.shared_memory.quicksort.sequential import quicksort
+from algorithms.shared_memory.mergesort.sequential import merge_sort
+from algorithms.shared_memory.mergesort.utils import merge
+from algorithms.shared_memory.bucketsort.sequential import bucket_sort
+from algorithms.shared_memory.bucketsort.utils import create_shared_array, shared_array_to_result, destroy_shared_memory
+from algorithms.shared_memory.samplesort.sequential import sample_sort
+from algorithms.shared_memory.radixsort.sequential import radix_sort
+
+
+CALIBRATION_SIZE = 50_000
+CALIBRATION_REPEATS = 5
+CALIBRATION_SCOPE = 1000_000
+
+CUTOFF_ROUNDING = 1000
+# the parallel version never pays off below this size
+MAX_CUTOFF = 100_000_000
+
+MAX_CALIBRATED_CORES = 128
+
+# algorithm -> (sequential sort, "n_log_n" | "linear")
+SORT_MODELS = {
+    "quicksort": (quicksort, "n_log_n"),
+    "mergesort": (merge_sort, "n_log_n"),
+    "bucketsort": (bucket_sort, "n_log_n"),
+    "samplesort": (sample_sort, "n_log_n"),
+    "radixsort": (radix_sort, "linear"),
+}
+
+
+def noop():
+    pass
+
+
+def measure(func, repeats=CALIBRATION_REPEATS):
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def spawn_process():
+    process = mp.Process(target=noop)
+    process.start()
+    process.join()
+
+
+def measure_spawn_cost():
+    return measure(spawn_process)
+
+
+def measure_attach_cost():
+    shm = shared_memory.SharedMemory(create=True, size=CALIBRATION_SIZE * ctypes.sizeof(ctypes.c_longlong))
+
+    def attach():
+        attached = shared_memory.SharedMemory(name=shm.name)
+        view = (ctypes.c_longlong * CALIBRATION_SIZE).from_buffer(attached.buf)
+        del view
+        attached.close()
+
+    try:
+        return measure(attach)
+    finally:
+        destroy_shared_memory(shm)
+
+
+# copy into a new segment and back - per element
+def measure_copy_cost(data):
+    def copy_through_segment():
+        shm, arr = create_shared_array(data, int)
+        shared_array_to_result(arr)
+        del arr
+        destroy_shared_memory(shm)
+
+    return measure(copy_through_segment) / len(data)
+
+
+# final merge of two sorted halves - per element
+def measure_merge_cost(data):
+    half = len(data) // 2
+    prepared = sorted(data[:half]) + sorted(data[half:])
+
+    def merge_halves():
+        merge(list(prepared), 0, half - 1, len(prepared) - 1)
+
+    return measure(merge_halves) / len(data)
+
+
+def get_work(size, model):
+    if size <= 1:
+        return size
+
+    if model == "linear":
+        return size
+
+    return size * math.log2(size)
+
+
+# sequential time / work unit of the model
+def measure_sort_cost(sort, data, model):
+    return measure(lambda: sort(list(data))) / get_work(len(data), model)
+
+
+def get_calibration_core_counts():
+    logical = psutil.cpu_count(logical=True) or 1
+
+    cores = []
+    current = 2
+
+    while current <= min(logical, MAX_CALIBRATED_CORES):
+        cores.append(current)
+        current *= 2
+
+    if logical > 1 and logical not in cores and logical <= MAX_CALIBRATED_CORES:
+        cores.append(logical)
+
+    # single core machine - the values only say when spawning could pay off at all
+    return cores or [2]
+
+
+# smallest size (rounded up) where sequential(size) > parallel(size)
+def find_break_even(sequential, parallel):
+    size = CUTOFF_ROUNDING
+
+    while size <= MAX_CUTOFF and sequential(size) <= parallel(size):
+        size *= 2
+
+    if size > MAX_CUTOFF:
+        return MAX_CUTOFF
+
+    low = max(CUTOFF_ROUNDING, size // 2)
+    high = size
+
+    while high - low > CUTOFF_ROUNDING:
+        mid = (low + high) // 2
+
+        if sequential(mid) > parallel(mid):
+            high = mid
+        else:
+            low = mid
+
+    return math.ceil(high / CUTOFF_ROUNDING) * CUTOFF_ROUNDING
+
+
+# work the parent does alone, per element
+def get_serial_cost(algorithm, cores, costs):
+    serial = costs["copy_per_element"]
+
+    if algorithm == "mergesort":
+        serial += costs["merge_per_element"]
+    elif algorithm == "quicksort":
+        # partitions above the depth where every core has its own range
+        serial += costs["sort_quicksort"] * math.log2(cores)
+
+    return serial
+
+
+def fit_cutoffs(costs, core_counts):
+    cutoffs = {}
+    process_cost = costs["spawn"] + costs["attach"]
+
+    for algorithm, (_, model) in SORT_MODELS.items():
+        sort_cost = costs[f"sort_{algorithm}"]
+
+        def sequential(size):
+            return sort_cost * get_work(size, model)
+
+        # one more process for a group of this size
+        group_size = find_break_even(sequential, lambda size: process_cost)
+
+        for cores in core_counts:
+            serial_cost = get_serial_cost(algorithm, cores, costs)
+
+            def parallel(size):
+                return sort_cost * get_work(size / cores, model) + cores * process_cost + size * serial_cost
+
+            break_even = find_break_even(sequential, parallel)
+
+            if algorithm in ("quicksort", "mergesort"):
+                cutoffs.setdefault((algorithm, "parallel_cutoff"), {})[cores] = break_even
+            elif algorithm == "samplesort":
+                # sample sort compares the size per core
+                cutoffs.setdefault((algorithm, "parallel_size"), {})[cores] = math.ceil(break_even / cores)
+                cutoffs.setdefault((algorithm, "group_size"), {})[cores] = group_size
+            elif algorithm == "bucketsort":
+                cutoffs.setdefault((algorithm, "parallel_size"), {})[cores] = break_even
+                cutoffs.setdefault((algorithm, "group_size"), {})[cores] = group_size
+            else:
+                cutoffs.setdefault((algorithm, "parallel_size"), {})[cores] = break_even
+
+    return cutoffs
+
+
+def measure_costs():
+    data = [random.randint(0, CALIBRATION_SCOPE) for _ in range(CALIBRATION_SIZE)]
+
+    costs = {
+        "spawn": measure_spawn_cost(),
+        "attach": measure_attach_cost(),
+        "copy_per_element": measure_copy_cost(data),
+        "merge_per_element": measure_merge_cost(data),
+    }
+
+    for algorithm, (sort, model) in SORT_MODELS.items():
+        costs[f"sort_{algorithm}"] = measure_sort_cost(sort, data, model)
+
+    return costs
+
+
+def print_calibration(costs, cutoffs):
+    print_separator()
+    print("Zmierzone koszty")
+    print_separator()
+
+    for name, value in costs.items():
+        print(f"{name}: {value:.3e} s")
+
+    print_separator()
+    print("Progi równoległości")
+    print_separator()
+
+    for (algorithm, cutoff), values in cutoffs.items():
+        line = ", ".join(f"{cores} rdzeni={value}" for cores, value in sorted(values.items()))
+        print(f"{algorithm} | {cutoff} | {line}")
+
+
+# measures the host and stores the break-even sizes read by get_calibrated_cutoff
+def run_calibration(db_path=DB_PATH):
+    print_separator()
+    print("Kalibracja progów równoległości")
+    print(f"Rozmiar pomiarowy: {CALIBRATION_SIZE}, powtórzenia: {CALIBRATION_REPEATS}")
+
+    costs = measure_costs()
+    cutoffs = fit_cutoffs(costs, get_calibration_core_counts())
+
+    print_calibration(costs, cutoffs)
+
+    create_cutoffs_table(db_path)
+    save_calibrated_cutoffs(cutoffs, costs, db_path)
+    reset_calibrated_cutoffs()
+
+    print_separator()
+    print("Progi zapisane w bazie")
+    print_separator()
+
+    return cutoffs
+
+
+if __name__ == "__main__":
+    mp.freeze_support()
+    run_calibration()
@@ -1,3 +1,4 @@
+# "shared_memory" | "process_pool" | "queue"
 IMPLEMENTATION_VERSION = "shared_memory"
 
 if IMPLEMENTATION_VERSION == "queue":
@@ -18,35 +19,96 @@ elif IMPLEMENTATION_VERSION == "shared_memory":
     from algorithms.shared_memory.bucketsort.parallel import parallel_bucket_sort
     from algorithms.shared_memory.samplesort.sequential import sample_sort
     from algorithms.shared_memory.samplesort.parallel import parallel_sample_sort
+elif IMPLEMENTATION_VERSION == "process_pool":
+    from algorithms.process_pool.quicksort.sequential import quicksort
+    from algorithms.process_pool.quicksort.parallel import parallel_quicksort
+    from algorithms.process_pool.mergesort.sequential import merge_sort
+    from algorithms.process_pool.mergesort.parallel import parallel_merge_sort
+    from algorithms.process_pool.bucketsort.sequential import bucket_sort
+    from algorithms.process_pool.bucketsort.parallel import parallel_bucket_sort
+    from algorithms.process_pool.samplesort.sequential import sample_sort
+    from algorithms.process_pool.samplesort.parallel import parallel_sample_sort
 elif IMPLEMENTATION_VERSION == "cpp":
     from algorithms.queue.quicksort.sequential import quicksort
 else:
     raise ValueError(f"Nieznana wersja implementacji: {IMPLEMENTATION_VERSION}")
 
+# radix sort has only the shared_memory version - used with every IMPLEMENTATION_VERSION
+from algorithms.shared_memory.radixsort.sequential import radix_sort
+from algorithms.shared_memory.radixsort.parallel import parallel_radix_sort
+
 # available algorithms
 ALGORITHMS = {
     "1": {
         "name": "Quick Sort",
         "sequential": quicksort,
-        "parallel": parallel_quicksort
+        "parallel": parallel_quicksort,
+        # shared_memory: {"mode": "pool"} - persistent worker pool instead of mp.Process per partition
+        # shared_memory: {"mode": "multi_pivot"} - sample-based splitters, one bucket per process
+        # shared_memory: {"process_count": 6} - pool/multi_pivot worker count, not limited to powers of two
+        # shared_memory: {"partition_scheme": "three_way"} - Dutch flag partition, equal keys left out of recursion
+        # shared_memory: {"variant": "introsort"} - leaf sorts with ninther pivot, heapsort fallback and explicit stack
+        # shared_memory: {"backend": "numpy"} - np.ndarray view over the segment instead of a ctypes array,
+        #     leaves sorted by ndarray.sort (three_way: after Dutch flag partitions), variant must stay "recursive"
+        "parallel_options": {}
     },
     "2": {
         "name": "Merge Sort",
         "sequential": merge_sort,
-        "parallel": parallel_merge_sort
+        "parallel": parallel_merge_sort,
+        # shared_memory: {"mode": "kway"} - parallel k-way merge of all leaf runs into a second shared buffer
+        # shared_memory: {"backend": "numpy"}
+        # shared_memory: {"variant": "pingpong"} - leaf sorts with one auxiliary buffer instead of per-merge lists
+        # shared_memory: {"variant": "natural"} - Timsort-style runs, cheaper on part_sorted datasets
+        "parallel_options": {}
     },
     "3": {
         "name": "Bucket Sort",
         "sequential": bucket_sort,
-        "parallel": parallel_bucket_sort
+        "parallel": parallel_bucket_sort,
+        # shared_memory: {"backend": "numpy"}
+        # shared_memory: {"variant": "natural"} - buckets sorted by the natural merge sort
+        # shared_memory: {"distribution": "serial"} - the parent distributes the data, "parallel" (default) - workers do
+        # shared_memory: {"bucket_ranges": "quantile"} - boundaries from sampled quantiles instead of equal-width ranges
+        # shared_memory: {"grouping": "count"} - buckets grouped greedily by element count instead of bucket count
+        # all versions: {"leaf_backend": "np_stable"} - "python" | "np_quicksort" | "np_mergesort" | "np_stable" | "radix"
+        "parallel_options": {}
     },
     "4": {
         "name": "Sample Sort",
         "sequential": sample_sort,
-        "parallel": parallel_sample_sort
+        "parallel": parallel_sample_sort,
+        # shared_memory: {"backend": "numpy"}
+        # shared_memory: {"variant": "natural"} - local chunks and buckets sorted by the natural merge sort
+        # shared_memory: {"exchange": "gather"} - the parent collects the buckets, "psrs" (default) - workers exchange in shm
+        # all versions: {"oversampling": 4} - samples per chunk = cores * oversampling, max/mean bucket size is recorded
+        # all versions: {"leaf_backend": "np_stable"} - "python" | "np_quicksort" | "np_mergesort" | "np_stable" | "radix"
+        "parallel_options": {}
+    },
+    "5": {
+        "name": "Radix Sort",
+        "sequential": radix_sort,
+        "parallel": parallel_radix_sort,
+        # shared_memory: {"digit_bits": 11} - 8 | 11 | 16 bits per LSD pass
+        # shared_memory: {"backend": "numpy", "digit_bits": 16} - vectorized histograms and scatter
+        "parallel_options": {}
     },
 }
 
+# algorithms whose buckets go through a leaf sorter (algorithms/leaf_sort.py) - the backend is saved with results
+LEAF_SORT_ALGORITHMS = ("Bucket Sort", "Sample Sort")
+
+# algorithms with only the shared_memory version, whatever IMPLEMENTATION_VERSION says
+SHARED_MEMORY_ONLY_ALGORITHMS = ("Radix Sort",)
+
+
+def describe_implementation(algorithm_name):
+    if algorithm_name in SHARED_MEMORY_ONLY_ALGORITHMS:
+        return "shared_memory"
+
+    return IMPLEMENTATION_VERSION
+
+
 # available tables of data
 DATA_TABLES = {
     "1": ("random_int", "Losowe liczby całkowite"),
@@ -63,6 +125,14 @@ DATA_TABLES = {
     "12": ("part_sorted80_float", "80% posortowanych liczb zmiennoprzecinkowych")
 }
 
+# skewed tables - used only by the skew benchmark
+SKEWED_TABLES = {
+    "1": ("zipf_int", "Liczby całkowite z rozkładu Zipfa"),
+    "2": ("zipf_float", "Liczby zmiennoprzecinkowe z rozkładu Zipfa"),
+    "3": ("normal_int", "Liczby całkowite z rozkładu normalnego"),
+    "4": ("normal_float", "Liczby zmiennoprzecinkowe z rozkładu normalnego")
+}
+
 # sizes of data
 DATA_SIZES = {
     "1": 1000,
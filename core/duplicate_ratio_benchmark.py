@@ -0,0 +1,170 @@
+import math
+
+from core.database import get_data_from_db
+from core.benchmark import profile_function, bind_options, bind_process_count, get_dataset_fingerprint
+from core.menu import print_separator
+from core.config import DATA_TABLES, DATA_SIZES
+from core.hardware import get_system_info, get_available_cores
+from core.results_database import create_results_table, create_system_info_table, save_system_info, save_benchmark_result
+from algorithms.shared_memory.quicksort.sequential import quicksort
+from algorithms.shared_memory.quicksort.parallel import parallel_quicksort
+from algorithms.shared_memory.quicksort.utils import PARTITION_SCHEMES
+
+
+USE_LOGICAL_CORES = True
+
+DUPLICATE_TABLES = {
+    "3": DATA_TABLES["3"], # Całkowite liczby z duplikatami
+    "4": DATA_TABLES["4"], # Zmienne liczby z duplikatami
+}
+
+
+def get_sample_interval(data_size):
+    if data_size <= 10_000:
+        return 0.01
+
+    return 0.05
+
+
+def get_duplicate_ratio(data):
+    if not data:
+        return 0.0
+
+    return 1 - len(set(data)) / len(data)
+
+
+def print_scheme_comparison(summary):
+    print_separator()
+    print("Porównanie schematów podziału (średni czas sekwencyjny)")
+    print_separator()
+
+    for (table_name, data_size, duplicate_ratio), times in summary.items():
+        two_way = times.get("two_way")
+        three_way = times.get("three_way")
+
+        line = f"{table_name} | n={data_size} | duplikaty={duplicate_ratio:.1%}"
+
+        for scheme in PARTITION_SCHEMES:
+            scheme_time = times.get(scheme)
+            line += f" | {scheme}=" + (f"{scheme_time:.4f}s" if scheme_time is not None else "N/A")
+
+        if two_way and three_way:
+            line += f" | przyspieszenie three_way={two_way / three_way:.2f}x"
+
+        print(line)
+
+
+# quicksort with every partition scheme on the duplicate datasets
+def run_duplicate_ratio_benchmarks():
+    create_results_table()
+    create_system_info_table()
+    save_system_info(get_system_info())
+
+    available_cores, physical, logical = get_available_cores(use_logical=USE_LOGICAL_CORES)
+
+    total_tests = (
+        len(PARTITION_SCHEMES)
+        * len(DUPLICATE_TABLES)
+        * len(DATA_SIZES)
+        * (1 + len(available_cores))
+    )
+
+    current_test = 0
+    summary = {}
+
+    print_separator()
+    print("Testy duplikatów")
+    print(f"Liczba wszystkich testów: {total_tests}")
+
+    for table_data in DUPLICATE_TABLES.values():
+        table_name = table_data[0]
+
+        for data_size in DATA_SIZES.values():
+            data = get_data_from_db(table_name, data_size)
+            fingerprint = get_dataset_fingerprint(table_name, data_size, data)
+            sample_interval = get_sample_interval(len(data))
+            duplicate_ratio = get_duplicate_ratio(data)
+
+            print_separator()
+            print(f"Tabela: {table_name}")
+            print(f"Rozmiar danych: {data_size}")
+            print(f"Udział duplikatów: {duplicate_ratio:.1%}")
+
+            times = summary.setdefault((table_name, data_size, duplicate_ratio), {})
+
+            for scheme in PARTITION_SCHEMES:
+                algorithm_name = f"Quick Sort ({scheme})"
+                options = {"partition_scheme": scheme}
+
+                # Sequential benchmark
+                current_test += 1
+
+                print_separator()
+                print(f"Test {current_test}/{total_tests}")
+                print(f"Schemat podziału: {scheme}")
+                print("Test sekwencyjny")
+                print_separator()
+
+                sequential_stats = profile_function(
+                    bind_options(quicksort, options),
+                    data,
+                    label=f"{algorithm_name} - Sequential",
+                    sample_interval=sample_interval,
+                    fingerprint=fingerprint
+                )
+
+                save_benchmark_result(
+                    algorithm=algorithm_name,
+                    mode="Sequential",
+                    dataset=table_name,
+                    data_size=data_size,
+                    cores=1,
+                    stats=sequential_stats,
+                    implementation="shared_memory"
+                )
+
+                if sequential_stats["status"] != "OK" or sequential_stats["correctness"] != "CORRECT":
+                    print(f"Błąd: {sequential_stats['error_message']} | Pomijanie tej konfiguracji")
+                    continue
+
+                times[scheme] = sequential_stats["avg_time"]
+
+                # Parallel benchmark
+                for cores in available_cores:
+                    current_test += 1
+
+                    print_separator()
+                    print(f"Test {current_test}/{total_tests}")
+                    print(f"Liczba rdzeni: {cores}")
+                    print("Test równoległy")
+                    print_separator()
+
+                    parallel_stats = profile_function(
+                        bind_process_count(bind_options(parallel_quicksort, options), cores),
+                        data,
+                        int(math.log2(cores)),
+                        label=f"{algorithm_name} - Parallel",
+                        sequential_time=sequential_stats["avg_time"],
+                        cores=cores,
+                        sample_interval=sample_interval,
+                        fingerprint=fingerprint
+                    )
+
+                    save_benchmark_result(
+                        algorithm=algorithm_name,
+                        mode="Parallel",
+                        dataset=table_name,
+                        data_size=data_size,
+                        cores=cores,
+                        stats=parallel_stats,
+                        implementation="shared_memory"
+                    )
+
+                    if parallel_stats["status"] != "OK" or parallel_stats["correctness"] != "CORRECT":
+                        print(f"Błąd: {parallel_stats['error_message']}")
+
+    print_scheme_comparison(summary)
+
+    print_separator()
+    print("Wszystkie testy zakończone")
+    print_separator()
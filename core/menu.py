@@ -111,5 +111,8 @@ def choose_cores():
 def choose_program_mode():
     print("1. Benchmark automatyczny pełny")
     # print("2. Benchmark automatyczny demo")
+    print("3. Benchmark duplikatów (quicksort two_way / three_way)")
+    print("4. Benchmark rozkładów skośnych (bucket sort equal_width / quantile)")
+    print("5. Kalibracja progów równoległości")
 
     return input("Wybierz tryb: ")
\ No newline at end of file
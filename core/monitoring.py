@@ -1,4 +1,7 @@
+import os
 import time
+import multiprocessing as mp
+
 import psutil
 
 
@@ -94,4 +97,247 @@ def get_exact_children_cpu_time():
         return None
 
     usage = resource.getrusage(resource.RUSAGE_CHILDREN)
-    return usage.ru_utime + usage.ru_stime
\ No newline at end of file
+    return usage.ru_utime + usage.ru_stime
+
+# out-of-process sampler reading /proc directly (Linux only) - no GIL shared with the algorithm
+
+HAS_PROC = os.path.exists(f"/proc/{os.getpid()}/stat")
+
+# "process" - /proc sampler in its own process, "thread" - measure_usage in the benchmark worker
+MONITOR_MODES = ("process", "thread")
+DEFAULT_MONITOR = "process" if HAS_PROC else "thread"
+
+# first samples are taken fast so short runs get enough of them, then the interval grows to sample_interval
+MIN_SAMPLE_INTERVAL = 0.002
+INTERVAL_GROWTH = 2
+# the interval is stretched when one sample costs more than this fraction of it
+MAX_SAMPLER_LOAD = 0.05
+SAMPLER_START_TIMEOUT = 10
+
+ACTIVE_CPU_PERCENT = 20
+
+if HAS_PROC:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+    HAS_SMAPS_ROLLUP = os.path.exists(f"/proc/{os.getpid()}/smaps_rollup")
+else:
+    CLOCK_TICKS = PAGE_SIZE = None
+    HAS_SMAPS_ROLLUP = False
+
+
+def get_monitor_mode(monitor):
+    if monitor not in MONITOR_MODES:
+        raise ValueError(f"Nieznany tryb monitorowania: {monitor}")
+
+    # no /proc (Windows, macOS) - only the thread works
+    if monitor == "process" and not HAS_PROC:
+        return "thread"
+
+    return monitor
+
+
+# (ppid, user + system seconds) from /proc/<pid>/stat
+def read_proc_stat(pid):
+    with open(f"/proc/{pid}/stat", "rb") as file:
+        data = file.read()
+
+    # the name in parentheses may contain spaces
+    fields = data[data.rindex(b")") + 2:].split()
+
+    return int(fields[1]), (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def read_proc_memory_mb(pid):
+    if HAS_SMAPS_ROLLUP:
+        with open(f"/proc/{pid}/smaps_rollup", "rb") as file:
+            for line in file:
+                if line.startswith(b"Pss:"):
+                    return int(line.split()[1]) / 1024
+
+    # Fallback: resident pages from statm
+    with open(f"/proc/{pid}/statm", "rb") as file:
+        return int(file.read().split()[1]) * PAGE_SIZE / (1024 ** 2)
+
+
+# {pid: cpu seconds} of root_pid and all its descendants, skip_pid left out
+# outside - pids already known to be outside the tree, their stat is not read again
+def read_proc_tree(root_pid, skip_pid, outside):
+    parents = {}
+    cpu_times = {}
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        pid = int(entry)
+
+        if pid in outside:
+            continue
+
+        try:
+            parents[pid], cpu_times[pid] = read_proc_stat(pid)
+        except (OSError, ValueError, IndexError):
+            continue
+
+    tree = {}
+    pending = [root_pid]
+    children = {}
+
+    for pid, ppid in parents.items():
+        children.setdefault(ppid, []).append(pid)
+
+    while pending:
+        pid = pending.pop()
+
+        if pid == skip_pid or pid not in cpu_times:
+            continue
+
+        tree[pid] = cpu_times[pid]
+        pending.extend(children.get(pid, []))
+
+    # the parent never changes into a process of the tree, so the rest can be skipped from now on
+    # (a pid reused by a new child during one run is not followed)
+    outside.update(pid for pid in cpu_times if pid not in tree)
+
+    return tree
+
+
+def new_usage_summary():
+    return {
+        "sample_count": 0,
+        "cpu_sum": 0.0,
+        "mem_sum": 0.0,
+        "max_mem": 0.0,
+        "active_time": 0.0,
+        "idle_time": 0.0,
+        "sampler_cpu_time": 0.0,
+        "sampler_wall_time": 0.0,
+    }
+
+
+def add_usage_sample(summary, cpu_percent, mem, elapsed):
+    summary["sample_count"] += 1
+    summary["cpu_sum"] += cpu_percent
+    summary["mem_sum"] += mem
+    summary["max_mem"] = max(summary["max_mem"], mem)
+
+    if cpu_percent < ACTIVE_CPU_PERCENT:
+        summary["idle_time"] += elapsed
+    else:
+        summary["active_time"] += elapsed
+
+
+def sampler_process(root_pid, interval, stop_event, ready_event, connection):
+    skip_pid = os.getpid()
+    # only running totals - the memory does not grow with the length of the run
+    summary = new_usage_summary()
+
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+
+    previous_wall = time.perf_counter()
+    outside = set()
+    previous_cpu_times = read_proc_tree(root_pid, skip_pid, outside)
+    current_interval = min(MIN_SAMPLE_INTERVAL, interval)
+
+    ready_event.set()
+
+    stopped = False
+
+    # the last sample is taken after the stop - it covers the end of the run
+    while not stopped:
+        stopped = stop_event.wait(current_interval)
+        sample_start = time.perf_counter()
+
+        cpu_times = read_proc_tree(root_pid, skip_pid, outside)
+        delta_wall = sample_start - previous_wall
+
+        total_cpu = 0.0
+        total_mem = 0.0
+
+        for pid, cpu_time in cpu_times.items():
+            # a process started after the previous sample - all its CPU time is new
+            total_cpu += cpu_time - previous_cpu_times.get(pid, 0.0)
+
+            try:
+                total_mem += read_proc_memory_mb(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+
+        cpu_percent = (total_cpu / delta_wall) * 100 if delta_wall > 0 else 0.0
+
+        add_usage_sample(summary, cpu_percent, total_mem, delta_wall)
+
+        previous_wall = sample_start
+        previous_cpu_times = cpu_times
+
+        sample_cost = time.perf_counter() - sample_start
+        current_interval = max(
+            min(current_interval * INTERVAL_GROWTH, interval),
+            sample_cost / MAX_SAMPLER_LOAD
+        )
+
+    summary["sampler_cpu_time"] = time.process_time() - start_cpu
+    summary["sampler_wall_time"] = time.perf_counter() - start_wall
+
+    connection.send(summary)
+    connection.close()
+
+
+def start_process_sampler(root_pid, interval):
+    receiver, sender = mp.Pipe(duplex=False)
+    stop_event = mp.Event()
+    ready_event = mp.Event()
+
+    process = mp.Process(
+        target=sampler_process,
+        args=(root_pid, interval, stop_event, ready_event, sender),
+        daemon=True
+    )
+
+    process.start()
+    sender.close()
+
+    if not ready_event.wait(SAMPLER_START_TIMEOUT):
+        process.terminate()
+        process.join()
+        raise RuntimeError("Proces próbkujący nie wystartował.")
+
+    return process, stop_event, receiver
+
+
+def stop_process_sampler(sampler):
+    process, stop_event, receiver = sampler
+
+    stop_event.set()
+
+    try:
+        summary = receiver.recv()
+    except EOFError:
+        summary = new_usage_summary()
+
+    process.join()
+    receiver.close()
+
+    return summary
+
+
+# the thread samples as lists - same shape as the process sampler summary
+def summarize_usage(cpu_samples, mem_samples, states, interval):
+    summary = new_usage_summary()
+
+    for cpu_percent, mem in zip(cpu_samples, mem_samples):
+        add_usage_sample(summary, cpu_percent, mem, interval)
+
+    summary["active_time"] = states.count("active") * interval
+    summary["idle_time"] = states.count("idle") * interval
+
+    return summary
+
+
+# share of one core used by the sampler itself
+def get_sampler_overhead(summary):
+    if summary["sampler_wall_time"] <= 0:
+        return None
+
+    return summary["sampler_cpu_time"] / summary["sampler_wall_time"]
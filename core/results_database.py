@@ -1,9 +1,23 @@
 import sqlite3
 import os
 
+from algorithms.cutoffs import CUTOFFS_TABLE
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "dane.db")
 
+# columns added after the first version of benchmark_results - {column: type}
+RESULTS_TABLE_MIGRATIONS = {
+    "leaf_backend": "TEXT",
+    "oversampling": "INTEGER",
+    "bucket_imbalance": "REAL",
+    "implementation": "TEXT",
+    "sampler_overhead": "REAL",
+    "repeat_count": "INTEGER",
+    "median_ci_low": "REAL",
+    "median_ci_high": "REAL",
+}
+
 
 def get_connection(db_path=DB_PATH):
     conn = sqlite3.connect(db_path)
@@ -121,6 +135,65 @@ def show_system_info(db_path=DB_PATH):
     )
 
 
+def create_cutoffs_table(db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CUTOFFS_TABLE}
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            algorithm TEXT NOT NULL,
+            cutoff TEXT NOT NULL,
+            cores INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS calibration_costs
+        (
+            name TEXT PRIMARY KEY,
+            value REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# a new calibration replaces the previous one - {(algorithm, cutoff): {cores: value}}, {name: seconds}
+def save_calibrated_cutoffs(cutoffs, costs, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute(f"DELETE FROM {CUTOFFS_TABLE}")
+    cursor.execute("DELETE FROM calibration_costs")
+
+    cursor.executemany(
+        f"INSERT INTO {CUTOFFS_TABLE} (algorithm, cutoff, cores, value) VALUES (?, ?, ?, ?)",
+        [
+            (algorithm, cutoff, cores, value)
+            for (algorithm, cutoff), values in cutoffs.items()
+            for cores, value in values.items()
+        ]
+    )
+
+    cursor.executemany(
+        "INSERT INTO calibration_costs (name, value) VALUES (?, ?)",
+        list(costs.items())
+    )
+
+    conn.commit()
+    conn.close()
+
+
 def create_results_table(db_path=DB_PATH):
     conn = get_connection(db_path)
     cursor = conn.cursor()
@@ -146,11 +219,34 @@ def create_results_table(db_path=DB_PATH):
             status TEXT NOT NULL DEFAULT 'OK',
             correctness TEXT NOT NULL DEFAULT 'UNKNOWN',
             error_message TEXT,
+            leaf_backend TEXT,
+            oversampling INTEGER,
+            bucket_imbalance REAL,
+            implementation TEXT,
+            sampler_overhead REAL,
+            repeat_count INTEGER,
+            median_ci_low REAL,
+            median_ci_high REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
     )
 
+    migrate_results_table(cursor)
+
+    # phase times of one result (algorithms/tracing.py) - worker_* phases are the slowest worker
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS benchmark_phases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER NOT NULL REFERENCES benchmark_results(id),
+            phase TEXT NOT NULL,
+            avg_time REAL NOT NULL,
+            share REAL
+        )
+        """
+    )
+
     cursor.execute(
         """
         CREATE INDEX IF NOT EXISTS idx_benchmark_lookup
@@ -168,7 +264,19 @@ def create_results_table(db_path=DB_PATH):
     conn.close()
 
 
-def save_benchmark_result(algorithm, mode, dataset, data_size, cores, stats, db_path=DB_PATH):
+# older databases lack the newer columns - CREATE TABLE IF NOT EXISTS does not add them
+def migrate_results_table(cursor):
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(benchmark_results)")}
+
+    for column, column_type in RESULTS_TABLE_MIGRATIONS.items():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE benchmark_results ADD COLUMN {column} {column_type}")
+
+
+def save_benchmark_result(algorithm, mode, dataset, data_size, cores, stats, leaf_backend=None, implementation=None,
+                          db_path=DB_PATH):
+    metrics = stats.get("metrics") or {}
+
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
@@ -192,8 +300,16 @@ def save_benchmark_result(algorithm, mode, dataset, data_size, cores, stats, db_
                 min_sample_count,
                 status,
                 correctness,
-                error_message
-            )VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                error_message,
+                leaf_backend,
+                oversampling,
+                bucket_imbalance,
+                implementation,
+                sampler_overhead,
+                repeat_count,
+                median_ci_low,
+                median_ci_high
+            )VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
             algorithm,
             mode,
@@ -213,11 +329,33 @@ def save_benchmark_result(algorithm, mode, dataset, data_size, cores, stats, db_
             stats["status"],
             stats["correctness"],
             stats["error_message"],
+            leaf_backend,
+            metrics.get("oversampling"),
+            metrics.get("bucket_imbalance"),
+            implementation,
+            metrics.get("sampler_overhead"),
+            stats.get("repeat_count"),
+            stats.get("median_ci_low"),
+            stats.get("median_ci_high"),
         ))
+
+    save_benchmark_phases(cursor, cursor.lastrowid, stats.get("phases") or {}, stats["avg_time"])
+
     conn.commit()
     conn.close()
 
 
+def save_benchmark_phases(cursor, result_id, phases, avg_time):
+    for phase, phase_time in phases.items():
+        share = phase_time / avg_time if avg_time else None
+
+        cursor.execute(
+            """
+            INSERT INTO benchmark_phases (result_id, phase, avg_time, share) VALUES (?, ?, ?, ?)
+            """, (result_id, phase, phase_time, share)
+        )
+
+
 def format_result_row(row, include_status=True) -> str:
     text = f"""
             ----------------------------------------
@@ -240,6 +378,24 @@ def format_result_row(row, include_status=True) -> str:
             Efficiency:    {"-" if row["efficiency"] is None else f'{row["efficiency"]:.4f}'}
     """
 
+    if "median_ci_low" in row.keys() and row["median_ci_low"] is not None:
+        text += f"""
+            Powtórzenia:       {"-" if row["repeat_count"] is None else row["repeat_count"]}
+            Mediana 95% CI:    {row["median_ci_low"]:.6f} - {row["median_ci_high"]:.6f} s
+    """
+
+    if "sampler_overhead" in row.keys() and row["sampler_overhead"] is not None:
+        text += f"""
+            Koszt próbkowania: {row["sampler_overhead"] * 100:.2f} % rdzenia
+    """
+
+    # sample sort only - splitter quality
+    if "bucket_imbalance" in row.keys() and row["bucket_imbalance"] is not None:
+        text += f"""
+            Nadpróbkowanie:     {"-" if row["oversampling"] is None else row["oversampling"]}
+            Max/średni kubełek: {row["bucket_imbalance"]:.4f}
+    """
+
     if include_status:
         text += f"""
             Status:        {row["status"]}
@@ -274,7 +430,13 @@ def show_results(limit=20, db_path=DB_PATH):
                 min_sample_count,
                 status,
                 correctness,
-                error_message
+                error_message,
+                oversampling,
+                bucket_imbalance,
+                sampler_overhead,
+                repeat_count,
+                median_ci_low,
+                median_ci_high
             FROM benchmark_results ORDER BY id DESC LIMIT ?
             """, (limit,)
     )
@@ -462,12 +624,44 @@ def show_algorithm_summary(db_path=DB_PATH):
         print(f"{row['algorithm']} | {row['mode']} : {row['count']}")
 
 
+def show_phase_summary(db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        SELECT
+            r.algorithm,
+            r.cores,
+            p.phase,
+            AVG(p.avg_time) as avg_time,
+            AVG(p.share) as share
+        FROM benchmark_phases p
+        JOIN benchmark_results r ON r.id = p.result_id
+        GROUP BY r.algorithm, r.cores, p.phase
+        ORDER BY r.algorithm, r.cores, share DESC
+        """
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    print("\n===== Fazy algorytmów =====")
+
+    for row in rows:
+        share = "-" if row["share"] is None else f'{row["share"] * 100:.1f} %'
+        print(f"{row['algorithm']} | {row['cores']} rdzeni | {row['phase']}: {row['avg_time']:.6f} s ({share})")
+
+
 def clear_results(db_path=DB_PATH):
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM benchmark_results")
 
+    if cursor.execute("SELECT name FROM sqlite_master WHERE name = 'benchmark_phases'").fetchone():
+        cursor.execute("DELETE FROM benchmark_phases")
+
     conn.commit()
     conn.close()
 
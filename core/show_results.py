@@ -1,5 +1,5 @@
 from core.results_database import (show_system_info, show_results, show_problem_results, show_failed_tests, show_timeout_tests,
-    show_status_summary, show_algorithm_summary, clear_results, count_results, show_dataset_results)
+    show_status_summary, show_algorithm_summary, clear_results, count_results, show_dataset_results, show_phase_summary)
 
 
 if __name__ == "__main__":
@@ -13,3 +13,4 @@ if __name__ == "__main__":
     # show_failed_tests()
     # show_problem_results()
     # count_results()
+    # show_phase_summary()
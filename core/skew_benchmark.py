@@ -0,0 +1,129 @@
+from core.database import get_data_from_db
+from core.benchmark import profile_function, bind_options
+from core.menu import print_separator
+from core.config import SKEWED_TABLES, DATA_SIZES
+from core.hardware import get_system_info, get_available_cores
+from core.results_database import create_results_table, create_system_info_table, save_system_info, save_benchmark_result
+from algorithms.shared_memory.bucketsort.parallel import parallel_bucket_sort
+from algorithms.shared_memory.bucketsort.utils import measure_group_balance
+from algorithms.leaf_sort import describe_leaf_backend
+
+
+USE_LOGICAL_CORES = True
+
+# name in the results -> options of parallel_bucket_sort
+BUCKET_RANGE_CONFIGS = {
+    "equal_width": {"bucket_ranges": "equal_width", "grouping": "buckets"},
+    "quantile": {"bucket_ranges": "quantile", "grouping": "count"},
+}
+
+
+def get_sample_interval(data_size):
+    if data_size <= 10_000:
+        return 0.01
+
+    return 0.05
+
+
+def print_balance_comparison(summary):
+    print_separator()
+    print("Porównanie zakresów kubełków (największa grupa / idealny udział procesu)")
+    print_separator()
+
+    for (table_name, data_size, cores), results in summary.items():
+        line = f"{table_name} | n={data_size} | rdzenie={cores}"
+
+        for config_name in BUCKET_RANGE_CONFIGS:
+            balance, parallel_time = results.get(config_name, (None, None))
+
+            if balance is None:
+                line += f" | {config_name}=N/A"
+                continue
+
+            line += f" | {config_name}: balans={balance:.2f}"
+            line += ", czas=" + (f"{parallel_time:.4f}s" if parallel_time is not None else "N/A")
+
+        print(line)
+
+
+# parallel bucket sort with equal-width and quantile bucket ranges on the skewed datasets
+def run_skew_benchmarks():
+    create_results_table()
+    create_system_info_table()
+    save_system_info(get_system_info())
+
+    available_cores, physical, logical = get_available_cores(use_logical=USE_LOGICAL_CORES)
+
+    total_tests = (
+        len(BUCKET_RANGE_CONFIGS)
+        * len(SKEWED_TABLES)
+        * len(DATA_SIZES)
+        * len(available_cores)
+    )
+
+    current_test = 0
+    summary = {}
+
+    print_separator()
+    print("Testy rozkładów skośnych")
+    print(f"Liczba wszystkich testów: {total_tests}")
+
+    for table_data in SKEWED_TABLES.values():
+        table_name = table_data[0]
+
+        for data_size in DATA_SIZES.values():
+            data = get_data_from_db(table_name, data_size)
+            sample_interval = get_sample_interval(len(data))
+
+            print_separator()
+            print(f"Tabela: {table_name}")
+            print(f"Rozmiar danych: {data_size}")
+
+            for cores in available_cores:
+                results = summary.setdefault((table_name, data_size, cores), {})
+
+                for config_name, options in BUCKET_RANGE_CONFIGS.items():
+                    algorithm_name = f"Bucket Sort ({config_name})"
+                    balance = measure_group_balance(data, cores, options["bucket_ranges"], options["grouping"])
+
+                    current_test += 1
+
+                    print_separator()
+                    print(f"Test {current_test}/{total_tests}")
+                    print(f"Zakresy kubełków: {config_name}")
+                    print(f"Liczba rdzeni: {cores}")
+                    print(f"Balans grup: {balance:.2f}")
+                    print_separator()
+
+                    parallel_stats = profile_function(
+                        bind_options(parallel_bucket_sort, options),
+                        data,
+                        cores,
+                        label=f"{algorithm_name} - Parallel",
+                        cores=cores,
+                        sample_interval=sample_interval
+                    )
+
+                    save_benchmark_result(
+                        algorithm=algorithm_name,
+                        mode="Parallel",
+                        dataset=table_name,
+                        data_size=data_size,
+                        cores=cores,
+                        stats=parallel_stats,
+                        leaf_backend=describe_leaf_backend(options),
+                        implementation="shared_memory"
+                    )
+
+                    if parallel_stats["status"] != "OK" or parallel_stats["correctness"] != "CORRECT":
+                        print(f"Błąd: {parallel_stats['error_message']}")
+                        results[config_name] = (balance, None)
+                        continue
+
+                    results[config_name] = (balance, parallel_stats["avg_time"])
+
+    print_balance_comparison(summary)
+
+    print_separator()
+    print("Wszystkie testy zakończone")
+    print_separator()
@@ -0,0 +1,139 @@
+import struct
+from itertools import islice
+
+import numpy as np
+
+
+# "fingerprint" - one pass over the result: order + multiset fingerprint of the input
+# "full" - copy of the input, sorted() and list equality (the old check)
+VERIFICATION_MODES = ("fingerprint", "full")
+DEFAULT_VERIFICATION = "fingerprint"
+
+HASH_MASK = (1 << 64) - 1
+# two independent streams - (seed of the first sum, seed of the second sum)
+FINGERPRINT_SEEDS = (0x9E3779B97F4A7C15, 0xD1B54A32D192ED03)
+
+
+def get_verification_mode(verification):
+    if verification not in VERIFICATION_MODES:
+        raise ValueError(f"Nieznany tryb weryfikacji: {verification}")
+
+    return verification
+
+
+# splitmix64 finalizer - sums and xors of raw values collide for pairs like [0, 3] and [1, 2]
+def mix64(value, seed):
+    value = (value + seed) & HASH_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & HASH_MASK
+
+    return value ^ (value >> 31)
+
+
+# the same mixing on a uint64 array - multiplication wraps modulo 2**64
+def mix64_ndarray(values, seed):
+    values = values + np.uint64(seed)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+
+    return values ^ (values >> np.uint64(31))
+
+
+# ints - two's complement, floats - IEEE bits (-0.0 as 0.0), anything else - hash()
+def get_value_key(value):
+    if isinstance(value, int):
+        return value & HASH_MASK
+
+    if isinstance(value, float):
+        return struct.unpack("<Q", struct.pack("<d", value + 0.0))[0]
+
+    return hash(value) & HASH_MASK
+
+
+def get_ndarray_keys(array):
+    if array.dtype.kind == "f":
+        return (array.astype(np.float64) + 0.0).view(np.uint64)
+
+    return array.astype(np.int64).view(np.uint64)
+
+
+# None for lists numpy cannot hold as int / float (big ints, strings, mixed types)
+def as_numeric_ndarray(values):
+    if not len(values):
+        return None
+
+    array = np.asarray(values)
+
+    if array.ndim != 1 or array.dtype.kind not in "iuf":
+        return None
+
+    return array
+
+
+# vectorized, gives the same result as fingerprint_values
+def fingerprint_ndarray(array):
+    first_seed, second_seed = FINGERPRINT_SEEDS
+
+    keys = get_ndarray_keys(array)
+    mixed = mix64_ndarray(keys, first_seed)
+
+    return (
+        len(array),
+        int(np.bitwise_xor.reduce(mixed)),
+        int(mixed.sum(dtype=np.uint64)),
+        int(mix64_ndarray(keys, second_seed).sum(dtype=np.uint64)),
+    )
+
+
+def fingerprint_values(values):
+    first_seed, second_seed = FINGERPRINT_SEEDS
+
+    hash_xor = 0
+    first_sum = 0
+    second_sum = 0
+
+    for value in values:
+        key = get_value_key(value)
+        mixed = mix64(key, first_seed)
+
+        hash_xor ^= mixed
+        first_sum += mixed
+        second_sum += mix64(key, second_seed)
+
+    return len(values), hash_xor, first_sum & HASH_MASK, second_sum & HASH_MASK
+
+
+# order-independent - the same for every permutation of values
+def compute_fingerprint(values):
+    array = as_numeric_ndarray(values)
+
+    if array is None:
+        return fingerprint_values(values)
+
+    return fingerprint_ndarray(array)
+
+
+def is_non_decreasing(values):
+    array = as_numeric_ndarray(values)
+
+    if array is None:
+        return all(left <= right for left, right in zip(values, islice(values, 1, None)))
+
+    return bool(np.all(array[:-1] <= array[1:]))
+
+
+# a list is converted to an array once for both checks, an np.ndarray result is used as it is
+def verify_sorted(output, fingerprint):
+    array = as_numeric_ndarray(output)
+
+    if array is None:
+        return is_non_decreasing(output) and fingerprint_values(output) == fingerprint
+
+    return bool(np.all(array[:-1] <= array[1:])) and fingerprint_ndarray(array) == fingerprint
+
+
+def verify_result(output, verification, fingerprint=None, original=None):
+    if verification == "full":
+        return output == sorted(original)
+
+    return verify_sorted(output, fingerprint)
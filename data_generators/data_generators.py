@@ -1,6 +1,9 @@
 import sqlite3
 import random
 
+ZIPF_EXPONENT = 1.2
+NORMAL_SPREAD = 0.05
+
 def create_table(conn, table_name):
     try:
         cursor = conn.cursor()
@@ -67,6 +70,25 @@ def generate_part_sorted_values(table_name, count, scope, sorted_ratio):
 
     return values
 
+# Zipf-like: Pareto variable capped at scope (floored for int tables), most values land close to 1
+def generate_zipf_values(table_name, count, scope):
+    values = [min(float(scope), random.paretovariate(ZIPF_EXPONENT)) for _ in range(count)]
+
+    if "int" in table_name:
+        return [(int(val), count) for val in values]
+    else:
+        return [(float(val), count) for val in values]
+
+def generate_normal_values(table_name, count, scope):
+    mean = scope / 2
+    deviation = scope * NORMAL_SPREAD
+    values = [min(scope, max(0, random.gauss(mean, deviation))) for _ in range(count)]
+
+    if "int" in table_name:
+        return [(int(round(val)), count) for val in values]
+    else:
+        return [(float(val), count) for val in values]
+
 def insert_values(conn, table_name, count):
     try:
         cursor = conn.cursor()
@@ -87,6 +109,10 @@ def insert_values(conn, table_name, count):
             values = generate_part_sorted_values(table_name, count, scope, 0.6)
         elif table_name.startswith("part_sorted80_"):
             values = generate_part_sorted_values(table_name, count, scope, 0.8)
+        elif table_name.startswith("zipf_"):
+            values = generate_zipf_values(table_name, count, scope)
+        elif table_name.startswith("normal_"):
+            values = generate_normal_values(table_name, count, scope)
         else:
             raise ValueError(f"Nieobsługiwana tabela: {table_name}")
 
@@ -106,7 +132,9 @@ def generate_data(table_name, db_path="../dane.db"):
             "part_sorted20_int", "part_sorted20_float",
             "part_sorted40_int", "part_sorted40_float",
             "part_sorted60_int", "part_sorted60_float",
-            "part_sorted80_int", "part_sorted80_float"
+            "part_sorted80_int", "part_sorted80_float",
+            "zipf_int", "zipf_float",
+            "normal_int", "normal_float"
         }
         if table_name not in allowed_table_name:
             raise ValueError(f"Niepoprawna nazwa tabeli: '{table_name}'. Dozwolone nazwy: {allowed_table_name}")
@@ -139,3 +167,7 @@ if __name__ == "__main__":
     generate_data("part_sorted60_float")
     generate_data("part_sorted80_int")
     generate_data("part_sorted80_float")
+    generate_data("zipf_int")
+    generate_data("zipf_float")
+    generate_data("normal_int")
+    generate_data("normal_float")
@@ -3,6 +3,9 @@ import multiprocessing as mp
 from core.menu import choose_program_mode
 from core.auto_benchmark_runner import run_auto_benchmarks
 # from core.quick_auto_benchmark_runner import run_quick_auto_benchmarks
+from core.duplicate_ratio_benchmark import run_duplicate_ratio_benchmarks
+from core.skew_benchmark import run_skew_benchmarks
+from core.calibration import run_calibration
 
 def main():
     mode = choose_program_mode()
@@ -11,6 +14,12 @@ def main():
         run_auto_benchmarks()
     # elif mode == "2":
     #     run_quick_auto_benchmarks()
+    elif mode == "3":
+        run_duplicate_ratio_benchmarks()
+    elif mode == "4":
+        run_skew_benchmarks()
+    elif mode == "5":
+        run_calibration()
     else:
         print("Niepoprawny wybór")
 
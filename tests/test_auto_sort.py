@@ -0,0 +1,117 @@
+import unittest
+import math
+import random
+
+from core.auto_sort import (
+    auto_sort,
+    classify_input,
+    fit_power_law,
+    predict_time,
+    choose_sort_strategy,
+    reset_auto_sort_model
+)
+
+
+# log(time) = log(a) + slope * log(size)
+def make_curve(a, slope):
+    return math.log(a), slope
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.random_data = [rng.randint(0, 1_000_000) for _ in range(5000)]
+        self.duplicate_data = [rng.randint(0, 3) for _ in range(5000)]
+        self.sorted_data = list(range(5000))
+
+    def tearDown(self):
+        reset_auto_sort_model()
+
+    def use_model(self, datasets, curves):
+        reset_auto_sort_model({"datasets": datasets, "curves": curves})
+
+    def test_classify_input(self):
+        features = classify_input(self.sorted_data)
+        self.assertEqual(features["size"], 5000)
+        self.assertEqual(features["dtype"], "int")
+        self.assertEqual(features["sortedness"], 1.0)
+        self.assertEqual(features["duplicate_ratio"], 0.0)
+
+        features = classify_input(self.duplicate_data)
+        self.assertLess(features["sortedness"], 0.5)
+        self.assertGreater(features["duplicate_ratio"], 0.9)
+
+        self.assertEqual(classify_input([0.5, 1.5])["dtype"], "float")
+
+    def test_fit_power_law(self):
+        points = [(size, 2e-6 * size ** 1.1) for size in (1000, 10_000, 100_000)]
+        log_a, slope = fit_power_law(points)
+
+        self.assertAlmostEqual(slope, 1.1)
+        self.assertAlmostEqual(math.exp(log_a), 2e-6)
+        self.assertAlmostEqual(predict_time((log_a, slope), 1_000_000), 2e-6 * 1_000_000 ** 1.1)
+
+        # one measured size - linear growth through that point
+        log_a, slope = fit_power_law([(1000, 0.5)])
+        self.assertEqual(slope, 1.0)
+        self.assertAlmostEqual(predict_time((log_a, slope), 1000), 0.5)
+
+    def test_decide_strategy_picks_fastest_curve(self):
+        self.use_model(
+            {
+                "random_int": {"dtype": "int", "sortedness": 0.0, "duplicate_ratio": 0.0},
+                "sorted_int": {"dtype": "int", "sortedness": 1.0, "duplicate_ratio": 0.0},
+            },
+            {
+                "random_int": {
+                    ("shared_memory", "Merge Sort", "Sequential", 1): make_curve(2e-6, 1.0),
+                    ("shared_memory", "Quick Sort", "Sequential", 1): make_curve(1e-6, 1.0),
+                    # fastest, but needs more cores than allowed below
+                    ("shared_memory", "Quick Sort", "Parallel", 4): make_curve(1e-8, 1.0),
+                },
+                "sorted_int": {
+                    ("shared_memory", "Merge Sort", "Sequential", 1): make_curve(1e-7, 1.0),
+                    ("shared_memory", "Quick Sort", "Sequential", 1): make_curve(1e-6, 1.0),
+                },
+            }
+        )
+
+        strategy = choose_sort_strategy(self.random_data, max_cores=2)
+        self.assertEqual(strategy["dataset"], "random_int")
+        self.assertEqual((strategy["algorithm"], strategy["mode"], strategy["cores"]), ("Quick Sort", "Sequential", 1))
+
+        strategy = choose_sort_strategy(self.random_data, max_cores=4)
+        self.assertEqual((strategy["algorithm"], strategy["mode"], strategy["cores"]), ("Quick Sort", "Parallel", 4))
+
+        strategy = choose_sort_strategy(self.sorted_data, max_cores=2)
+        self.assertEqual(strategy["dataset"], "sorted_int")
+        self.assertEqual(strategy["algorithm"], "Merge Sort")
+
+    def test_default_strategy_without_model(self):
+        self.use_model({}, {})
+
+        strategy = choose_sort_strategy(self.sorted_data, max_cores=1)
+        self.assertEqual((strategy["algorithm"], strategy["options"]), ("Merge Sort", {"variant": "natural"}))
+
+        strategy = choose_sort_strategy(self.duplicate_data, max_cores=1)
+        self.assertEqual(strategy["algorithm"], "Quick Sort (three_way)")
+        self.assertEqual(strategy["options"], {"partition_scheme": "three_way"})
+
+        strategy = choose_sort_strategy(self.random_data, max_cores=1)
+        self.assertEqual((strategy["algorithm"], strategy["options"]), ("Quick Sort", {"variant": "introsort"}))
+
+    def test_auto_sort_leaves_input_unchanged(self):
+        self.use_model({}, {})
+
+        for data in (self.random_data, self.duplicate_data, self.sorted_data, [0.5, -1.5, 0.0], [7], []):
+            with self.subTest(data=data[:3]):
+                original = list(data)
+                result = auto_sort(data, max_cores=1)
+
+                self.assertEqual(result, sorted(original))
+                self.assertEqual(data, original)
+                self.assertIsNot(result, data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import random
+from unittest import mock
+
+import numpy as np
+
+from algorithms.leaf_sort import sort_ndarray_in_place
+from algorithms.shared_memory.radixsort import parallel
+from algorithms.shared_memory.radixsort.sequential import radix_sort, radix_sort_ndarray
+from algorithms.shared_memory.radixsort.utils import DIGIT_BITS, get_digits_ndarray, to_keys_ndarray
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.inputs = {
+            "int": [rng.randint(0, 1_000_000) for _ in range(5000)],
+            "negative_int": [rng.randint(-2 ** 62, 2 ** 62) for _ in range(5000)],
+            "float": [rng.uniform(-1e6, 1e6) for _ in range(5000)] + [0.0, -0.0, 1e-300, -1e-300],
+        }
+
+    def test_radix_sort_list(self):
+        for name, data in self.inputs.items():
+            for digit_bits in DIGIT_BITS:
+                with self.subTest(data=name, digit_bits=digit_bits):
+                    self.assertEqual(radix_sort(list(data), digit_bits), sorted(data))
+
+    def test_radix_sort_ndarray(self):
+        for name, data in self.inputs.items():
+            for digit_bits in DIGIT_BITS:
+                with self.subTest(data=name, digit_bits=digit_bits):
+                    arr = np.array(data)
+                    radix_sort_ndarray(arr, digit_bits)
+                    self.assertEqual(arr.tolist(), sorted(data))
+
+    def test_radix_leaf_backend(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                arr = np.array(data)
+                sort_ndarray_in_place(arr, "radix")
+                self.assertEqual(arr.tolist(), sorted(data))
+
+    def test_digits_are_small_unsigned(self):
+        keys = to_keys_ndarray(np.array(self.inputs["negative_int"]))
+
+        # uint8 / uint16 digits are what makes numpy's stable argsort a counting pass
+        self.assertEqual(get_digits_ndarray(keys, 0, 8).dtype, np.uint8)
+        self.assertEqual(get_digits_ndarray(keys, 0, 11).dtype, np.uint16)
+        self.assertEqual(get_digits_ndarray(keys, 48, 16).dtype, np.uint16)
+
+    def test_parallel_radix_sort(self):
+        with mock.patch.object(parallel, "should_run_parallel", return_value=True):
+            for name, data in self.inputs.items():
+                for backend in ("ctypes", "numpy"):
+                    with self.subTest(data=name, backend=backend):
+                        result = parallel.parallel_radix_sort(data, 2, digit_bits=11, backend=backend)
+                        self.assertEqual(list(result), sorted(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sqlite3
+import os
+from unittest import mock
+
+from algorithms.shared_memory.bucketsort import parallel, utils
+from algorithms.shared_memory.bucketsort.utils import measure_group_balance
+from data_generators.data_generators import (
+    create_table,
+    insert_values,
+    generate_data,
+    generate_zipf_values,
+    generate_normal_values
+)
+
+class MyTestCase(unittest.TestCase):
+    test_db = "test_dane.db"
+
+    def setUp(self):
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+        self.conn = sqlite3.connect(self.test_db)
+
+    def tearDown(self):
+        self.conn.close()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def test_insert_zipf_int(self):
+        create_table(self.conn, "zipf_int")
+        insert_values(self.conn, "zipf_int", 1000)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM zipf_int")
+        count = cursor.fetchone()[0]
+        self.assertEqual(count, 1000)
+
+    def test_insert_normal_float(self):
+        create_table(self.conn, "normal_float")
+        insert_values(self.conn, "normal_float", 1000)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM normal_float")
+        count = cursor.fetchone()[0]
+        self.assertEqual(count, 1000)
+
+    def test_generate_zipf_values_int(self):
+        count = 1000
+        scope = 5000
+
+        values_int = generate_zipf_values("zipf_int", count, scope)
+        self.assertEqual(len(values_int), count)
+        for val, set_size in values_int:
+            self.assertIsInstance(val, int)
+            self.assertGreaterEqual(val, 1)
+            self.assertLessEqual(val, scope)
+            self.assertEqual(set_size, count)
+
+        # most of the values are small
+        small = sum(1 for val, _ in values_int if val < 10)
+        self.assertGreater(small, count // 2)
+
+    def test_generate_zipf_values_float(self):
+        count = 1000
+        scope = 5000
+
+        values_float = generate_zipf_values("zipf_float", count, scope)
+        self.assertEqual(len(values_float), count)
+        for val, set_size in values_float:
+            self.assertIsInstance(val, float)
+            self.assertGreaterEqual(val, 1)
+            self.assertLessEqual(val, scope)
+
+    def test_generate_normal_values_int(self):
+        count = 1000
+        scope = 5000
+
+        values_int = generate_normal_values("normal_int", count, scope)
+        self.assertEqual(len(values_int), count)
+        for val, set_size in values_int:
+            self.assertIsInstance(val, int)
+            self.assertGreaterEqual(val, 0)
+            self.assertLessEqual(val, scope)
+
+        mean = sum(val for val, _ in values_int) / count
+        self.assertAlmostEqual(mean, scope / 2, delta=scope * 0.02)
+
+    def test_generate_normal_values_float(self):
+        count = 1000
+        scope = 5000
+
+        values_float = generate_normal_values("normal_float", count, scope)
+        self.assertEqual(len(values_float), count)
+        for val, set_size in values_float:
+            self.assertIsInstance(val, float)
+            self.assertGreaterEqual(val, 0)
+            self.assertLessEqual(val, scope)
+
+    def test_generate_data_skewed_tables(self):
+        generate_data("zipf_int", db_path=self.test_db)
+        generate_data("normal_float", db_path=self.test_db)
+
+        conn = sqlite3.connect(self.test_db)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COUNT(*) FROM zipf_int")
+        count_zipf = cursor.fetchone()[0]
+
+        cursor.execute("SELECT COUNT(*) FROM normal_float")
+        count_normal = cursor.fetchone()[0]
+
+        self.assertEqual(count_zipf, 1_111_000)
+        self.assertEqual(count_normal, 1_111_000)
+
+        conn.close()
+
+    def test_quantile_count_balances_zipf(self):
+        process_count = 4
+
+        for table in ("zipf_int", "zipf_float"):
+            with self.subTest(table=table):
+                data = [val for val, _ in generate_zipf_values(table, 20000, 5000)]
+
+                # 1.0 - every process gets the same number of values
+                quantile = measure_group_balance(data, process_count, "quantile", "count")
+                equal_width = measure_group_balance(data, process_count, "equal_width", "buckets")
+
+                self.assertLess(quantile, equal_width)
+                self.assertGreaterEqual(quantile, 1.0)
+
+    def test_parallel_bucket_sort_quantile_count(self):
+        # small input, but the parallel path with every group in its own process
+        with mock.patch.object(parallel, "should_run_parallel", return_value=True), \
+                mock.patch.object(parallel, "get_group_size_cutoff", return_value=0), \
+                mock.patch.object(utils, "get_group_size_cutoff", return_value=0):
+            for table in ("zipf_int", "zipf_float", "normal_float"):
+                generate = generate_zipf_values if table.startswith("zipf") else generate_normal_values
+                data = [val for val, _ in generate(table, 20000, 5000)]
+
+                for backend in ("ctypes", "numpy"):
+                    with self.subTest(table=table, backend=backend):
+                        result = parallel.parallel_bucket_sort(
+                            data, 4, backend=backend, bucket_ranges="quantile", grouping="count"
+                        )
+                        self.assertEqual(list(result), sorted(data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import random
+
+import numpy as np
+
+from core.verification import compute_fingerprint, fingerprint_values, verify_result, verify_sorted
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.inputs = {
+            "int": [rng.randint(-1000, 1000) for _ in range(2000)],
+            "float": [rng.uniform(-1000, 1000) for _ in range(2000)] + [0.0, -0.0],
+        }
+
+    def check(self, data, output):
+        return verify_result(output, "fingerprint", compute_fingerprint(data))
+
+    def test_accepts_correct_sort(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                self.assertTrue(self.check(data, sorted(data)))
+                self.assertTrue(self.check(data, np.array(sorted(data))))
+                self.assertTrue(verify_result(sorted(data), "full", original=data))
+
+    def test_rejects_changed_element(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                output = sorted(data)
+                # still sorted, one value replaced by a neighbour-sized one
+                output[100] = (output[99] + output[100]) / 2 if name == "float" else output[99]
+                self.assertEqual(output, sorted(output))
+                self.assertFalse(self.check(data, output))
+
+    def test_rejects_duplicated_and_dropped_element(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                output = sorted(data)
+                self.assertFalse(self.check(data, sorted(output + [output[0]])))
+                self.assertFalse(self.check(data, output[1:]))
+
+                # one element dropped, another one duplicated - the length stays the same
+                self.assertFalse(self.check(data, sorted(output[1:] + [output[-1]])))
+
+    def test_rejects_unsorted_output(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                output = sorted(data)
+                output[10], output[20] = output[20], output[10]
+                self.assertFalse(self.check(data, output))
+                self.assertFalse(self.check(data, list(data)))
+
+    def test_rejects_pairs_with_equal_sums(self):
+        # the same length, sum and xor of raw values
+        self.assertFalse(self.check([0, 3], [1, 2]))
+        self.assertFalse(self.check([0, 3, 5, 6], [1, 2, 4, 7]))
+
+    def test_ndarray_and_list_fingerprints_match(self):
+        for name, data in self.inputs.items():
+            with self.subTest(data=name):
+                self.assertEqual(compute_fingerprint(data), fingerprint_values(data))
+                self.assertTrue(verify_sorted(np.array(sorted(data)), fingerprint_values(data)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,6 +28,10 @@ THEORETICAL_COMPLEXITY = {
         "description": "O(n log n) średnio",
         "expected_range": (1.0, 1.3),
     },
+    "Radix Sort": {
+        "description": "O(d * (n + 2^b)) - liniowo względem n przy stałej liczbie cyfr",
+        "expected_range": (0.9, 1.1),
+    },
 }
 
 
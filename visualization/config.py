@@ -125,6 +125,7 @@ ALGORITHM_COLORS = {
     "Merge Sort": "tab:orange",
     "Bucket Sort": "tab:green",
     "Sample Sort": "tab:red",
+    "Radix Sort": "tab:purple",
 }
 
 # Algorithm markers
@@ -133,6 +134,7 @@ ALGORITHM_MARKERS = {
     "Merge Sort": "s",
     "Bucket Sort": "^",
     "Sample Sort": "D",
+    "Radix Sort": "v",
 }
 
 # Metric labels
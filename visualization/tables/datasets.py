@@ -46,6 +46,7 @@ def build_dataset_impact_table(
         "Merge Sort",
         "Bucket Sort",
         "Sample Sort",
+        "Radix Sort",
     ]
 
     available = [
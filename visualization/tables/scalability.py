@@ -41,6 +41,7 @@ def build_metric_pivot(df: pd.DataFrame, metric: str) -> pd.DataFrame:
         "Merge Sort",
         "Bucket Sort",
         "Sample Sort",
+        "Radix Sort",
     ]
 
     available = [